@@ -0,0 +1,125 @@
+"""Login throughput against the bcrypt process pool at increasing worker counts.
+
+    python -m benchmarks.login --requests 400 --concurrency 64
+
+Each worker count gets a fresh uvicorn server on localhost with its own SQLite database,
+so the numbers include the whole request path. Throughput should grow with the pool
+until it reaches the number of cores.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREDENTIALS = {"email": "bench@example.com", "password": "benchmark-password"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    workdir = tempfile.mkdtemp(prefix="auth-bench-")
+    env = {
+        **os.environ,
+        "PYTHONPATH": SERVICE_DIR,
+        "SECRET_KEY": "benchmark",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        **env,
+    }
+    subprocess.run([sys.executable, "-m", "src.init_db"], cwd=workdir, env=env, check=True)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def login_storm(base_url: str, requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_until_ready(client)
+        await client.post("/api/register", json={"name": "Bench User", **CREDENTIALS})
+        await client.post("/api/login", json=CREDENTIALS)
+
+        statuses: dict[int, int] = {}
+        latencies = []
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.post("/api/login", json=CREDENTIALS)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": round(statuses.get(200, 0) / elapsed, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS for the server under test")
+    parser.add_argument("--workers", type=int, nargs="*", help="pool sizes to try (default: 1, 2, 4 ... cores)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    pool_sizes = args.workers or sorted({1, *(2 ** n for n in range(1, cores.bit_length()) if 2 ** n <= cores), cores})
+
+    results = {"cores": cores, "rounds": args.rounds, "requests": args.requests, "runs": {}}
+    for workers in pool_sizes:
+        port = free_port()
+        server = start_server(port, {
+            "BCRYPT_ROUNDS": str(args.rounds),
+            "PASSWORD_HASH_WORKERS": str(workers),
+            "PASSWORD_HASH_QUEUE_LIMIT": str(args.concurrency),
+            # Measures the bcrypt pool, so repeated logins must not be throttled.
+            "LOGIN_RATE_LIMIT_BACKEND": "none",
+        })
+        try:
+            results["runs"][str(workers)] = asyncio.run(
+                login_storm(f"http://127.0.0.1:{port}", args.requests, args.concurrency)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
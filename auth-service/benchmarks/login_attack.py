@@ -0,0 +1,100 @@
+"""CPU spent by auth-service under a password-guessing attack, with and without the login rate limiter.
+
+    python -m benchmarks.login_attack --attempts 100 400 --concurrency 32
+
+For each limiter backend and attack size, a fresh server receives ``attempts`` logins with
+wrong passwords for one account from one IP. The script reports the CPU seconds the server and
+its bcrypt workers used (read from ``/proc``, so Linux only) and the response statuses. Without
+the limiter CPU grows with the attack; with it, only the first attempts in the window reach
+bcrypt, so CPU stays flat.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.login import CREDENTIALS, free_port, start_server, wait_until_ready
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def process_tree_cpu_seconds(root_pid: int) -> float:
+    """User + system CPU of ``root_pid`` and its direct children (the bcrypt pool)."""
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name may contain spaces; the fields after it are space separated.
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(entry) == root_pid or int(fields[1]) == root_pid:
+            total += int(fields[11]) + int(fields[12])
+    return total / CLOCK_TICKS
+
+
+async def attack(base_url: str, server_pid: int, attempts: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await wait_until_ready(client)
+        await client.post("/api/register", json={"name": "Bench User", **CREDENTIALS})
+
+        statuses: dict[int, int] = {}
+        remaining = iter(range(attempts))
+        guess = {"email": CREDENTIALS["email"], "password": "wrong-password"}
+
+        async def worker():
+            for _ in remaining:
+                response = await client.post("/api/login", json=guess)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        cpu_before = process_tree_cpu_seconds(server_pid)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        cpu_seconds = process_tree_cpu_seconds(server_pid) - cpu_before
+
+    return {
+        "cpu_seconds": round(cpu_seconds, 2),
+        "cpu_ms_per_attempt": round(cpu_seconds / attempts * 1000, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_ROUNDS for the server under test")
+    parser.add_argument("--backends", nargs="+", default=["none", "memory"])
+    args = parser.parse_args()
+
+    results = {"rounds": args.rounds, "concurrency": args.concurrency, "runs": {}}
+    for backend in args.backends:
+        runs = results["runs"][backend] = {}
+        for attempts in args.attempts:
+            port = free_port()
+            server = start_server(port, {
+                "BCRYPT_ROUNDS": str(args.rounds),
+                "PASSWORD_HASH_QUEUE_LIMIT": str(args.concurrency),
+                "LOGIN_RATE_LIMIT_BACKEND": backend,
+            })
+            try:
+                runs[str(attempts)] = asyncio.run(
+                    attack(f"http://127.0.0.1:{port}", server.pid, attempts, args.concurrency)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Counts the SQL statements login and register execute, with a cold and a warm user cache.
+
+    python -m benchmarks.user_queries
+
+Runs AuthService in process against a throwaway SQLite database, with bcrypt at its minimum
+cost. A statement is one executed SQL statement or one COMMIT. The script exits with status 1
+if a path makes more statements than ``EXPECTED`` allows, so it doubles as a regression check.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+# The settings module requires these, and the numbers do not depend on bcrypt's cost.
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from src.config.database import Base  # noqa: E402
+from src.repositories.user_cache import user_cache  # noqa: E402
+from src.schemas.auth import LoginRequest, RegisterRequest  # noqa: E402
+from src.services.auth_service import AuthService, password_hasher  # noqa: E402
+
+EXPECTED = {
+    "register_new": 2,
+    "register_duplicate_cached": 0,
+    "register_duplicate_uncached": 1,
+    "login_cold_cache": 1,
+    "login_warm_cache": 0,
+    "login_unknown_email": 1,
+    "login_unknown_email_again": 0,
+}
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "commit", self._statement)
+
+    def _statement(self, *args, **kwargs):
+        self.count += 1
+
+
+async def run(Session, counter: StatementCounter) -> dict:
+    user = {"name": "Query Count", "email": "queries@example.com", "password": "query-password"}
+
+    async def measure(call) -> int:
+        before = counter.count
+        with Session() as db:
+            try:
+                await call(AuthService(db))
+            except HTTPException:
+                pass
+        return counter.count - before
+
+    results = {}
+    results["register_new"] = await measure(lambda service: service.register(RegisterRequest(**user)))
+    results["register_duplicate_cached"] = await measure(lambda service: service.register(RegisterRequest(**user)))
+    user_cache.clear()
+    results["register_duplicate_uncached"] = await measure(lambda service: service.register(RegisterRequest(**user)))
+    user_cache.clear()
+    login = LoginRequest(email=user["email"], password=user["password"])
+    results["login_cold_cache"] = await measure(lambda service: service.login(login))
+    results["login_warm_cache"] = await measure(lambda service: service.login(login))
+    unknown = LoginRequest(email="nobody@example.com", password="query-password")
+    results["login_unknown_email"] = await measure(lambda service: service.login(unknown))
+    results["login_unknown_email_again"] = await measure(lambda service: service.login(unknown))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="users-bench-"), "users.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    counter = StatementCounter(engine)
+    try:
+        results = asyncio.run(run(sessionmaker(autocommit=False, autoflush=False, bind=engine), counter))
+    finally:
+        password_hasher.shutdown()
+
+    over = {name: count for name, count in results.items() if count > EXPECTED[name]}
+    print(json.dumps({"statements": results, "expected_at_most": EXPECTED}, indent=2))
+    if over:
+        print(f"More statements than expected: {over}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,64 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from src.config.settings import settings
+
+
+def _is_file_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _engine_options(url: URL) -> dict:
+    if url.get_backend_name() == "sqlite" and not _is_file_sqlite(url):
+        # In-memory databases live on a single connection; pool sizing does not apply.
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
 
-DATABASE_URL = "sqlite:///./users.db"
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer, and NORMAL only syncs at checkpoints,
+    # which stays durable in WAL mode. busy_timeout makes a writer wait for the lock instead of failing.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def create_database_engine(url: str) -> Engine:
+    url = make_url(url)
+    engine = create_engine(url, **_engine_options(url))
+    if _is_file_sqlite(url):
+        event.listen(engine, "connect", _configure_sqlite_connection)
+    return engine
+
+
+engine = create_database_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _discard_inherited_connections():
+    # A forked worker (e.g. gunicorn --preload) must not reuse the parent's pooled sockets or file
+    # handles; close=False drops them without closing what the parent still uses.
+    engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_discard_inherited_connections)
+
+
 def get_db():
     db = SessionLocal()
     try:
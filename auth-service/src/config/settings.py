@@ -1,13 +1,44 @@
-from pydantic_settings import BaseSettings
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env")
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+
+    DATABASE_URL: str = "sqlite:///./users.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_NEGATIVE_CACHE_TTL_SECONDS: int = 5
+
+    LOGIN_RATE_LIMIT_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 10
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100000
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Proxies whose X-Forwarded-For is believed (IPs or CIDRs, comma-separated, or "*"); uvicorn's own default.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
 
-    class Config:
-        env_file = ".env"
+    METRICS_ENABLED: bool = False
 
 
 settings = Settings()
@@ -0,0 +1,17 @@
+"""Creates auth-service's tables. Run it once per deployment, before the workers start:
+
+    python -m src.init_db
+
+``python -m src.serve`` does this itself. ``create_all`` only adds missing tables, so running it
+against an existing database is harmless.
+"""
+from src.config.database import Base, engine
+from src.models import user  # noqa: F401  (registers the table on Base.metadata)
+
+
+def init_db():
+    Base.metadata.create_all(bind=engine)
+
+
+if __name__ == "__main__":
+    init_db()
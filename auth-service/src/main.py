@@ -1,14 +1,53 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from src.routers import auth_router
-from src.config.database import engine, Base
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from src.routers import auth_router, jwks_router
+from src.config.database import engine
+from src.config.settings import settings
+from src.metrics import register_cache_stats, setup_metrics, shutdown_metrics
+from src.repositories.user_cache import user_cache
+from src.services.auth_service import password_hasher
+from src.services.token_service import get_signing_keys
+from src.warmup import warmup
+
+
+def ping_database():
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup.start({
+        "signing_keys": get_signing_keys,
+        "database": ping_database,
+        "password_hasher": password_hasher.warm_up,
+    })
+    yield
+    await warmup.stop()
+    password_hasher.shutdown()
+    shutdown_metrics()
 
-Base.metadata.create_all(bind=engine)
+
+app = FastAPI(lifespan=lifespan)
+# request.client, which the login rate limiter keys on, becomes the address X-Forwarded-For names,
+# but only on connections from FORWARDED_ALLOW_IPS. src.serve hands uvicorn the same list.
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS)
 
 app.include_router(auth_router.router, prefix="/api")
+app.include_router(jwks_router.router)
+
+if settings.METRICS_ENABLED:
+    setup_metrics(app, engine)
+    register_cache_stats("users", user_cache.stats)
 
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Auth Service!"}
+
+
+@app.get("/ready", include_in_schema=False)
+def ready():
+    return warmup.response()
@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from src.config.settings import settings
+
+
+class UserCredentials(NamedTuple):
+    """What login and register need from a user row."""
+    id: int
+    email: str
+    hashed_password: str
+
+
+class UserCache:
+    """Bounded LRU of ``email -> UserCredentials``, plus short-lived entries for unknown emails.
+
+    Users are never updated or deleted here, so positive entries only expire to bound staleness
+    across workers. Negative entries use a much shorter TTL: another worker may register the
+    email at any time, and this worker's ``create_user`` only replaces its own entries.
+    """
+
+    MISSING = object()
+
+    def __init__(self, max_size: int, ttl_seconds: int, negative_ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Optional[UserCredentials]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, email: str):
+        """The cached credentials, None for a known-unknown email, or ``MISSING`` if not cached."""
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[email]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return self.MISSING
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, email: str, credentials: Optional[UserCredentials]):
+        ttl = self.ttl_seconds if credentials is not None else self.negative_ttl_seconds
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[email] = (time.monotonic() + ttl, credentials)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(
+    settings.USER_CACHE_SIZE,
+    settings.USER_CACHE_TTL_SECONDS,
+    settings.USER_NEGATIVE_CACHE_TTL_SECONDS,
+)
@@ -1,16 +1,43 @@
+from typing import Optional
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from src.models.user import User
+from src.repositories.user_cache import UserCredentials, user_cache
 
 
 class UserRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache=user_cache):
         self.db = db
+        self.cache = cache
+
+    def get_user_by_email(self, email: str) -> Optional[UserCredentials]:
+        cached = self.cache.get(email)
+        if cached is not self.cache.MISSING:
+            return cached
+
+        row = self.db.execute(
+            select(User.id, User.email, User.hashed_password).where(User.email == email)
+        ).first()
+        credentials = UserCredentials(*row) if row else None
+        self.cache.put(email, credentials)
+        return credentials
 
-    def get_user_by_email(self, email: str):
-        return self.db.query(User).filter(User.email == email).first()
+    def get_cached_user_by_email(self, email: str) -> Optional[UserCredentials]:
+        """The cached credentials for ``email``, without querying the database."""
+        cached = self.cache.get(email)
+        return None if cached is self.cache.MISSING else cached
 
-    def create_user(self, user: User):
+    def create_user(self, user: User) -> UserCredentials:
+        """Inserts ``user``; raises IntegrityError (after rolling back) if the email is taken."""
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        try:
+            # Flushing assigns the id, so nothing has to be re-read after the commit.
+            self.db.flush()
+            credentials = UserCredentials(user.id, user.email, user.hashed_password)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.cache.put(credentials.email, credentials)
+        return credentials
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends
 from src.schemas.auth import RegisterRequest, LoginRequest, Token
 from src.services.auth_service import AuthService, get_auth_service
+from src.services.login_rate_limiter import enforce_login_rate_limit
 
 router = APIRouter()
 
 
 @router.post("/register")
-def register(request: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)):
-    return auth_service.register(request)
+async def register(request: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)):
+    return await auth_service.register(request)
 
 
-@router.post("/login", response_model=Token)
-def login(request: LoginRequest, auth_service: AuthService = Depends(get_auth_service)):
-    return auth_service.login(request)
+@router.post("/login", response_model=Token, dependencies=[Depends(enforce_login_rate_limit)])
+async def login(request: LoginRequest, auth_service: AuthService = Depends(get_auth_service)):
+    return await auth_service.login(request)
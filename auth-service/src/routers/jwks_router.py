@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from src.services.token_service import get_signing_keys
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json")
+def jwks(response: Response):
+    # Verifiers refresh on their own schedule; a short max-age lets rotations propagate quickly.
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_signing_keys().jwks
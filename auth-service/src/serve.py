@@ -0,0 +1,79 @@
+"""Production entry point: creates the tables once, then serves the app on one or more worker processes.
+
+    python -m src.serve --host 0.0.0.0 --port 8000 --workers 4
+
+Each worker is a fresh process that imports the app, and with it its own engine, caches and bcrypt
+pool, so no worker runs DDL. Workers default to ``WEB_CONCURRENCY``, or to one per CPU when no
+setting keeps state that several workers would disagree on, and to 1 otherwise. Asking for several
+workers with such a setting is refused. The workers split **PASSWORD_HASH_WORKERS** between them,
+and with **METRICS_ENABLED** they share a prometheus_client multiprocess directory, so ``/metrics``
+covers all of them.
+"""
+import argparse
+import glob
+import os
+import tempfile
+
+import uvicorn
+
+
+def per_process_state() -> list[str]:
+    """Settings whose state lives in each worker and would diverge across several of them."""
+    from src.config.settings import settings
+
+    problems = []
+    if settings.LOGIN_RATE_LIMIT_BACKEND == "memory":
+        problems.append(
+            "LOGIN_RATE_LIMIT_BACKEND=memory: every worker counts attempts on its own, so clients get "
+            "N times the configured login limits; use redis"
+        )
+    return problems
+
+
+def default_workers() -> int:
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    return 1 if per_process_state() else os.cpu_count() or 1
+
+
+def prepare_metrics_dir():
+    """Points every worker at one empty prometheus_client multiprocess directory."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        # Files left by a previous run would be summed with this one's.
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+    else:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="auth-service-metrics-")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--skip-init", action="store_true", help="the schema is managed separately")
+    args = parser.parse_args()
+    from src.config.settings import settings
+
+    if args.workers > 1:
+        problems = per_process_state()
+        if problems:
+            parser.error(f"--workers {args.workers} needs state shared between workers:\n  " + "\n  ".join(problems))
+        if settings.METRICS_ENABLED:
+            prepare_metrics_dir()
+    # Inherited by the workers; the bcrypt pool takes its share of PASSWORD_HASH_WORKERS from it.
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    if not args.skip_init:
+        from src.init_db import init_db
+        init_db()
+    uvicorn.run(
+        "src.main:app", host=args.host, port=args.port, workers=args.workers,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
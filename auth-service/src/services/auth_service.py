@@ -1,34 +1,54 @@
-from passlib.hash import bcrypt
+from starlette.concurrency import run_in_threadpool
 from src.repositories.user_repository import UserRepository
 from src.models.user import User
 from src.schemas.auth import RegisterRequest, LoginRequest
+from src.services.password_hasher import PasswordHasher
 from src.services.token_service import create_access_token
+from src.config.settings import settings
+from src.metrics import timed_section
 from fastapi import HTTPException, status, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from src.config.database import get_db
 
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    rounds=settings.BCRYPT_ROUNDS,
+    retry_after_seconds=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
         self.user_repo = UserRepository(db)
 
-    def register(self, request: RegisterRequest):
-        if self.user_repo.get_user_by_email(request.email):
+    async def register(self, request: RegisterRequest):
+        # A cached user is rejected before bcrypt; otherwise the unique index on email decides.
+        if self.user_repo.get_cached_user_by_email(request.email):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-        hashed_password = bcrypt.hash(request.password)
+        with timed_section("bcrypt_hash"):
+            hashed_password = await password_hasher.hash(request.password)
         new_user = User(name=request.name, email=request.email, hashed_password=hashed_password)
-        self.user_repo.create_user(new_user)
+        try:
+            await run_in_threadpool(self.user_repo.create_user, new_user)
+        except IntegrityError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
         return {"message": "User registered successfully"}
 
-    def login(self, request: LoginRequest):
-        user = self.user_repo.get_user_by_email(request.email)
-        if not user or not bcrypt.verify(request.password, user.hashed_password):
+    async def login(self, request: LoginRequest):
+        user = await run_in_threadpool(self.user_repo.get_user_by_email, request.email)
+        if user:
+            with timed_section("bcrypt_verify"):
+                password_matches = await password_hasher.verify(request.password, user.hashed_password)
+        if not user or not password_matches:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        token = create_access_token(data={"sub": user.email})
+        with timed_section("jwt_encode"):
+            token = create_access_token(data={"sub": user.email})
         return {"access_token": token, "token_type": "bearer"}
 
 
@@ -0,0 +1,111 @@
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from src.config.settings import settings
+from src.schemas.auth import LoginRequest
+
+
+def sliding_window_count(previous: int, current: int, elapsed_fraction: float) -> float:
+    """Requests in the last window, assuming the previous window's were spread evenly."""
+    return previous * (1 - elapsed_fraction) + current
+
+
+class MemoryRateLimitBackend:
+    """Per-process sliding-window counters, bounded to ``max_keys`` (least recently hit dropped first)."""
+
+    def __init__(self, window_seconds: int, max_keys: int):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._windows: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+        self._lock = Lock()
+
+    async def hit(self, key: str) -> tuple[float, float]:
+        """Counts one request for ``key``; returns its sliding-window count and the seconds left in the window."""
+        now = time.time()
+        window, offset = divmod(now, self.window_seconds)
+        window = int(window)
+        with self._lock:
+            start, previous, current = self._windows.get(key, (window, 0, 0))
+            if start != window:
+                previous = current if start == window - 1 else 0
+                current = 0
+            current += 1
+            self._windows[key] = (window, previous, current)
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        fraction = offset / self.window_seconds
+        return sliding_window_count(previous, current, fraction), self.window_seconds - offset
+
+
+class RedisRateLimitBackend:
+    """Counters shared by every worker and replica through a Redis-protocol server.
+
+    Each key uses one counter per fixed window, which expires after two windows. A hit is a
+    single pipelined round trip: increment this window's counter and read the previous one.
+    """
+
+    def __init__(self, url: str, window_seconds: int):
+        import redis.asyncio
+
+        self.window_seconds = window_seconds
+        self._client = redis.asyncio.Redis.from_url(url)
+
+    async def hit(self, key: str) -> tuple[float, float]:
+        now = time.time()
+        window, offset = divmod(now, self.window_seconds)
+        window = int(window)
+        current_key = f"login-rate:{key}:{window}"
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, 2 * self.window_seconds)
+            pipe.get(f"login-rate:{key}:{window - 1}")
+            current, _, previous = await pipe.execute()
+        fraction = offset / self.window_seconds
+        return sliding_window_count(int(previous or 0), current, fraction), self.window_seconds - offset
+
+
+class LoginRateLimiter:
+    """Caps login attempts per client IP and per email over a sliding window.
+
+    Every attempt counts, successful or not, and the check runs before the user lookup and
+    bcrypt, so a throttled client costs one counter update instead of a password verification.
+    """
+
+    def __init__(self, backend, per_ip: int, per_email: int):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_email = per_email
+
+    async def check(self, client_ip: str, email: str):
+        for key, limit in ((f"ip:{client_ip}", self.per_ip), (f"email:{email.lower()}", self.per_email)):
+            count, retry_after = await self.backend.hit(key)
+            if count > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, try again later.",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+
+def create_login_rate_limiter(backend: str) -> Optional[LoginRateLimiter]:
+    if backend == "memory":
+        store = MemoryRateLimitBackend(settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS, settings.LOGIN_RATE_LIMIT_MAX_KEYS)
+    elif backend == "redis":
+        store = RedisRateLimitBackend(settings.REDIS_URL, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
+    else:
+        return None
+    return LoginRateLimiter(store, settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_PER_EMAIL)
+
+
+login_rate_limiter = create_login_rate_limiter(settings.LOGIN_RATE_LIMIT_BACKEND)
+
+
+async def enforce_login_rate_limit(request: LoginRequest, http_request: Request):
+    if login_rate_limiter is not None:
+        await login_rate_limiter.check(http_request.client.host if http_request.client else "", request.email)
@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+# These run in the pool's processes; only they import passlib, the server process never does.
+
+
+def hash_password(password: str, rounds: int) -> str:
+    from passlib.hash import bcrypt
+
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    from passlib.hash import bcrypt
+
+    return bcrypt.verify(password, hashed_password)
+
+
+def load_bcrypt() -> None:
+    from passlib.hash import bcrypt
+
+    bcrypt.get_backend()
+
+
+def pool_share(total: Optional[int]) -> int:
+    """This server worker's share of ``total`` bcrypt processes (default: one per CPU).
+
+    ``src.serve`` exports its worker count as ``WEB_CONCURRENCY``, so several workers split one
+    pool's worth of processes instead of each starting a full pool.
+    """
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    return max(1, (total or os.cpu_count() or 1) // workers)
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated process pool so hashing neither blocks the event loop nor holds the GIL.
+
+    At most ``workers + queue_limit`` calls are accepted at once; beyond that callers get a 503
+    with ``Retry-After`` instead of piling up behind the pool. A pool whose process died (OOM kill,
+    segfault) fails the calls it held with the same 503 and is replaced on the next call.
+    """
+
+    def __init__(self, workers: Optional[int], queue_limit: int, rounds: int, retry_after_seconds: int = 1):
+        self.workers = pool_share(workers)
+        self.queue_limit = queue_limit
+        self.rounds = rounds
+        self.retry_after_seconds = retry_after_seconds
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps the workers free of the server's threads and open database handles.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _unavailable(self, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+    def _discard_broken(self, executor: ProcessPoolExecutor):
+        # Every call that was on the broken pool lands here; only the first one replaces it.
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, function, *args):
+        if self.pending >= self.workers + self.queue_limit:
+            raise self._unavailable("Too many password operations in progress, try again shortly.")
+
+        self.pending += 1
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            self._discard_broken(executor)
+            raise self._unavailable("Password hashing is restarting, try again shortly.")
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    async def warm_up(self):
+        """Starts every pool process and loads bcrypt in it, so no login waits for a process to spawn."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, load_bcrypt) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
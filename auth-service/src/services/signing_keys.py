@@ -0,0 +1,89 @@
+"""JWT signing keys.
+
+With an ``HS*`` algorithm tokens are signed with ``SECRET_KEY``, as before. With ``RS*``/``ES*``,
+the private keys are ``<kid>.pem`` files in ``JWT_KEYS_DIR``. The active kid signs, and every
+key in the directory is published at ``/.well-known/jwks.json``. To rotate, add a key, make it
+active, and remove the old one once the tokens it signed have expired. New keys are made with:
+
+    python -m src.services.signing_keys generate keys/ --algorithm RS256
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from jose import jwk, jwt
+
+KEY_SUFFIX = ".pem"
+
+
+def load_private_keys(keys_dir: str, algorithm: str) -> dict:
+    """``kid -> jose key``, parsed once so signing never re-reads PEM material."""
+    keys = {}
+    for filename in sorted(os.listdir(keys_dir)):
+        if filename.endswith(KEY_SUFFIX):
+            with open(os.path.join(keys_dir, filename)) as pem:
+                keys[filename[:-len(KEY_SUFFIX)]] = jwk.construct(pem.read(), algorithm)
+    return keys
+
+
+class SigningKeys:
+    def __init__(self, algorithm: str, secret_key: str, keys_dir: Optional[str] = None,
+                 active_kid: Optional[str] = None):
+        self.algorithm = algorithm
+        if algorithm.startswith("HS"):
+            self.keys = {}
+            self.active_kid = None
+            self._signing_key = jwk.construct(secret_key, algorithm)
+        else:
+            if not keys_dir:
+                raise RuntimeError(f"JWT_KEYS_DIR must be set to sign tokens with {algorithm}.")
+            self.keys = load_private_keys(keys_dir, algorithm)
+            if not self.keys:
+                raise RuntimeError(f"No {KEY_SUFFIX} signing keys found in {keys_dir}.")
+            # Kids made by ``generate`` are timestamps, so the newest key sorts last.
+            self.active_kid = active_kid or max(self.keys)
+            self._signing_key = self.keys[self.active_kid]
+        self.jwks = {"keys": [
+            {**key.public_key().to_dict(), "kid": kid, "use": "sig", "alg": algorithm}
+            for kid, key in self.keys.items()
+        ]}
+
+    def sign(self, claims: dict) -> str:
+        headers = {"kid": self.active_kid} if self.active_kid else None
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=headers)
+
+
+def generate_private_key(algorithm: str) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+        private_key = ec.generate_private_key(curves[algorithm])
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    generate = subcommands.add_parser("generate", help="write a new <kid>.pem private key")
+    generate.add_argument("keys_dir")
+    generate.add_argument("--algorithm", default="RS256",
+                          choices=["RS256", "RS384", "RS512", "ES256", "ES384", "ES512"])
+    args = parser.parse_args()
+
+    os.makedirs(args.keys_dir, exist_ok=True)
+    kid = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(args.keys_dir, kid + KEY_SUFFIX)
+    with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as pem:
+        pem.write(generate_private_key(args.algorithm))
+    print(kid)
+
+
+if __name__ == "__main__":
+    main()
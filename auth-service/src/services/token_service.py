@@ -1,11 +1,25 @@
 from datetime import datetime, timedelta
-from jose import jwt
+from functools import lru_cache
+
 from src.config.settings import settings
 
 
+@lru_cache(maxsize=None)
+def get_signing_keys():
+    # Built on first use (or by warm-up): it imports python-jose's crypto backend and parses the PEM keys.
+    from src.services.signing_keys import SigningKeys
+
+    return SigningKeys(
+        settings.ALGORITHM,
+        settings.SECRET_KEY,
+        keys_dir=settings.JWT_KEYS_DIR,
+        active_kid=settings.JWT_ACTIVE_KID,
+    )
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = get_signing_keys().sign(to_encode)
     return encoded_jwt
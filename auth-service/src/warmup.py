@@ -0,0 +1,69 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Callable, Optional
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs slow first-use work in the background once the server is accepting connections.
+
+    ``GET /ready`` answers 503 until every step has succeeded, so a load balancer can hold traffic
+    back from a cold worker, or from one that could not fetch the JWKS. Requests that arrive
+    earlier are still served; they simply pay for whatever is not warm yet. A failing step is
+    logged and retried in the background, with the wait doubling up to RETRY_MAX_SECONDS.
+    """
+
+    RETRY_FIRST_SECONDS = 1.0
+    RETRY_MAX_SECONDS = 30.0
+
+    def __init__(self):
+        self.seconds: Optional[float] = None
+        self.failed_steps: list[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, steps: dict[str, Callable]):
+        self._task = asyncio.get_running_loop().create_task(self._run(steps))
+
+    async def _run_step(self, name: str, step: Callable) -> bool:
+        try:
+            if inspect.iscoroutinefunction(step):
+                await step()
+            else:
+                await asyncio.to_thread(step)
+        except Exception:
+            logger.exception("Warm-up step %r failed.", name)
+            return False
+        return True
+
+    async def _run(self, steps: dict[str, Callable]):
+        started = time.perf_counter()
+        for name, step in steps.items():
+            if not await self._run_step(name, step):
+                self.failed_steps.append(name)
+        self.seconds = time.perf_counter() - started
+
+        delay = self.RETRY_FIRST_SECONDS
+        while self.failed_steps:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RETRY_MAX_SECONDS)
+            self.failed_steps = [name for name in self.failed_steps if not await self._run_step(name, steps[name])]
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def response(self) -> JSONResponse:
+        if self.seconds is None:
+            return JSONResponse({"status": "warming_up"}, status_code=503)
+        if self.failed_steps:
+            return JSONResponse({"status": "retrying", "failed_steps": self.failed_steps}, status_code=503)
+        return JSONResponse({"status": "ready", "warmup_seconds": round(self.seconds, 3)})
+
+
+warmup = Warmup()
@@ -0,0 +1,63 @@
+import os
+
+# The settings module requires these, and no test depends on bcrypt's cost.
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from src.config.database import Base  # noqa: E402
+from src.repositories.user_cache import user_cache  # noqa: E402
+from src.services.auth_service import password_hasher  # noqa: E402
+
+
+class QueryCounter:
+    """Counts the statements an engine sends to the database, from ``before_cursor_execute``."""
+
+    def __init__(self, engine):
+        self.statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, connection, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def engine():
+    # One shared connection, so the threadpool the service runs queries on sees the same database.
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def queries(engine) -> QueryCounter:
+    return QueryCounter(engine)
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bcrypt_pool():
+    yield
+    password_hasher.shutdown()
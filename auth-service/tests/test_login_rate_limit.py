@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.config.database import get_db
+from src.main import app
+from src.services import login_rate_limiter as limiter_module
+from src.services.login_rate_limiter import LoginRateLimiter, MemoryRateLimitBackend
+
+PER_IP = 2
+
+
+@pytest.fixture
+def limited(session_factory, monkeypatch):
+    limiter = LoginRateLimiter(MemoryRateLimitBackend(60, 1000), per_ip=PER_IP, per_email=100)
+    monkeypatch.setattr(limiter_module, "login_rate_limiter", limiter)
+
+    def db():
+        with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+    yield
+    app.dependency_overrides.clear()
+
+
+def login_statuses(peer: str, forwarded_for: list[str]) -> list[int]:
+    """Status of one failed login per ``forwarded_for`` entry, all sent from ``peer``."""
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=(peer, 40000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://auth") as client:
+            return [
+                (await client.post(
+                    "/api/login", json={"email": f"user{number}@example.com", "password": "wrong-password"},
+                    headers={"X-Forwarded-For": forwarded},
+                )).status_code
+                for number, forwarded in enumerate(forwarded_for)
+            ]
+
+    return asyncio.run(run())
+
+
+def test_clients_behind_a_trusted_proxy_are_limited_separately(limited):
+    # The default FORWARDED_ALLOW_IPS trusts 127.0.0.1; the proxy appends the address it saw last.
+    statuses = login_statuses("127.0.0.1", ["203.0.113.1", "203.0.113.2", "203.0.113.3", "203.0.113.1"])
+
+    assert statuses == [401, 401, 401, 401]
+
+
+def test_forwarded_for_is_ignored_from_an_untrusted_peer(limited):
+    statuses = login_statuses("198.51.100.7", ["203.0.113.1", "203.0.113.2", "203.0.113.3"])
+
+    assert statuses == [401, 401, 429]
+
+
+def test_a_client_cannot_spoof_its_way_past_the_proxy(limited):
+    # Whatever the client puts in front, the trusted proxy's own entry is the one that counts.
+    statuses = login_statuses("127.0.0.1", [f"10.0.0.{number}, 203.0.113.9" for number in range(3)])
+
+    assert statuses == [401, 401, 429]
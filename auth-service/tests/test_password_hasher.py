@@ -0,0 +1,37 @@
+import asyncio
+import os
+import signal
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.password_hasher import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_limit=4, rounds=4, retry_after_seconds=3)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_a_dead_pool_worker_fails_its_calls_with_503_and_the_pool_is_replaced(hasher):
+    async def scenario():
+        hashed = await hasher.hash("password")
+        broken = hasher._executor
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+
+        with pytest.raises(HTTPException) as raised:
+            await hasher.verify("password", hashed)
+        assert hasher._executor is None
+
+        return raised.value, broken, await hasher.verify("password", hashed)
+
+    error, broken, verified = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "3"}
+    assert verified is True
+    assert hasher._executor is not broken
+    assert hasher.pending == 0
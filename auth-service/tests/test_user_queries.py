@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.repositories.user_cache import user_cache
+from src.schemas.auth import LoginRequest, RegisterRequest
+from src.services.auth_service import AuthService
+
+USER = {"name": "Query Count", "email": "queries@example.com", "password": "query-password"}
+LOGIN = LoginRequest(email=USER["email"], password=USER["password"])
+UNKNOWN = LoginRequest(email="nobody@example.com", password="query-password")
+
+
+@pytest.fixture
+def call(session_factory, queries):
+    """Runs one AuthService call in a fresh session; returns the queries it made and any HTTPException."""
+    def run(method: str, request):
+        async def in_session():
+            with session_factory() as db:
+                try:
+                    await getattr(AuthService(db), method)(request)
+                except HTTPException as exc:
+                    return exc
+            return None
+
+        before = queries.count
+        error = asyncio.run(in_session())
+        return queries.count - before, error
+
+    return run
+
+
+@pytest.fixture
+def registered(call):
+    call("register", RegisterRequest(**USER))
+
+
+def test_register_makes_one_insert(call, queries):
+    count, error = call("register", RegisterRequest(**USER))
+
+    assert error is None
+    assert count == 1
+    assert queries.statements[-1].startswith("INSERT INTO users")
+
+
+def test_duplicate_register_of_a_cached_user_makes_no_query(call, registered):
+    count, error = call("register", RegisterRequest(**USER))
+
+    assert error.status_code == 400
+    assert count == 0
+
+
+def test_duplicate_register_of_an_uncached_user_makes_only_the_failed_insert(call, registered):
+    user_cache.clear()
+
+    count, error = call("register", RegisterRequest(**USER))
+
+    assert error.status_code == 400
+    assert count == 1
+
+
+def test_cold_login_makes_one_select_and_warm_login_none(call, registered):
+    user_cache.clear()
+
+    cold, error = call("login", LOGIN)
+    assert error is None
+    assert cold == 1
+
+    warm, error = call("login", LOGIN)
+    assert error is None
+    assert warm == 0
+
+
+def test_unknown_email_is_cached_as_missing(call):
+    first, error = call("login", UNKNOWN)
+    assert error.status_code == 401
+    assert first == 1
+
+    again, error = call("login", UNKNOWN)
+    assert error.status_code == 401
+    assert again == 0
+
+
+def test_registering_replaces_a_cached_unknown_email(call):
+    call("login", LOGIN)
+
+    call("register", RegisterRequest(**USER))
+    count, error = call("login", LOGIN)
+
+    assert error is None
+    assert count == 0
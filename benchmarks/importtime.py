@@ -0,0 +1,80 @@
+"""Import-time profile of each service's ``src.main`` with ``python -X importtime``.
+
+    python benchmarks/importtime.py --repeat 5 --top 15
+
+Every run is a new interpreter, so the numbers are what a freshly started worker pays before
+it can serve. The script reports the median total import time of ``src.main`` and the modules
+with the largest cumulative import time in the median run. It also lists which ``DEFERRED``
+modules were imported anyway; these should only load on first use or during warm-up, so the
+script exits with status 1 if any of them appears.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from load import SERVICES, SHARED_ENV
+
+# Heavy modules neither app needs just to start serving.
+DEFERRED = (
+    "jose",
+    "passlib",
+    "redis",
+    "httpx",
+    "prometheus_client",
+    "sqlalchemy.dialects.postgresql",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(name: str) -> dict:
+    """{module: (self_us, cumulative_us, depth)} for one cold import of ``src.main``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", "import src.main"],
+        cwd=SERVICES[name], env={**os.environ, "PYTHONPATH": SERVICES[name], **SHARED_ENV},
+        capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules[module] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def measure(name: str, repeat: int, top: int) -> dict:
+    runs = sorted((profile(name) for _ in range(repeat)), key=lambda modules: modules["src.main"][1])
+    median = runs[len(runs) // 2]
+    heaviest = sorted(
+        ((module, cumulative) for module, (_, cumulative, depth) in median.items() if module != "src.main"),
+        key=lambda item: item[1], reverse=True,
+    )[:top]
+    return {
+        "src_main_ms": round(statistics.median(run["src.main"][1] for run in runs) / 1000, 1),
+        "modules_imported": len(median),
+        "heaviest_cumulative_ms": {module: round(cumulative / 1000, 1) for module, cumulative in heaviest},
+        "deferred_but_imported": sorted(
+            module for module in median if module in DEFERRED
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = {name: measure(name, args.repeat, args.top) for name in SERVICES}
+    print(json.dumps(results, indent=2))
+    if any(result["deferred_but_imported"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""Load benchmark for auth-service and patient-service.
+
+    python benchmarks/load.py --patients 20000 --output results.json
+    python benchmarks/load.py --baseline benchmarks/baseline.json
+
+Both services are started with uvicorn on localhost ports. Each gets its own temporary
+working directory and SQLite database, so the run needs no network, Docker or existing
+data. The harness seeds synthetic users and patients, then runs each scenario with
+``--concurrency`` concurrent clients. It prints requests per second and p50/p95/p99
+latency as JSON. With ``--baseline`` it also compares the run against a saved result and
+exits with status 1 when a scenario regressed by more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = {
+    "auth": os.path.join(ROOT, "auth-service"),
+    "patient": os.path.join(ROOT, "patient-service"),
+}
+SHARED_ENV = {
+    "SECRET_KEY": "benchmark-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+}
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor", "Iara", "Joao"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Almeida", "Ribeiro", "Barbosa"]
+STREETS = ["Rua das Flores", "Avenida Boa Viagem", "Rua do Sol", "Travessa Recife", "Avenida Norte"]
+CONDITIONS = ["Hypertension", "Diabetes", "Asthma", "None", "Migraine", "Arrhythmia", "Obesity"]
+
+
+def synthetic_patient(rng: random.Random, number: int) -> dict:
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}",
+        "birth_date": (date(1940, 1, 1) + timedelta(days=rng.randrange(30000))).isoformat(),
+        "health_conditions": rng.choice(CONDITIONS),
+        "gender": rng.choice(["Masculine", "Feminine"]),
+        "address": f"{rng.choice(STREETS)}, {rng.randrange(1, 3000)}",
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# Schema setup each service needs before it can serve; the apps no longer create tables on import.
+INIT_COMMANDS = {
+    "auth": ["-m", "src.init_db"],
+    "patient": ["-m", "alembic", "-c", os.path.join(SERVICES["patient"], "alembic.ini"), "upgrade", "head"],
+}
+
+
+def start_service(name: str, port: int, extra_env: dict, workers: int = 1) -> subprocess.Popen:
+    workdir = tempfile.mkdtemp(prefix=f"{name}-bench-")
+    env = {**os.environ, "PYTHONPATH": SERVICES[name], **SHARED_ENV, **extra_env}
+    subprocess.run([sys.executable, *INIT_COMMANDS[name]], cwd=workdir, env=env, check=True, capture_output=True)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers),
+         # Longer than any scenario, so pooled client connections are never closed mid-run.
+         "--timeout-keep-alive", "300"],
+        cwd=workdir,
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, path: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get(path)).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{client.base_url} did not become ready")
+        await asyncio.sleep(0.1)
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000, 3)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+async def run_scenario(request_factory, requests: int, concurrency: int) -> dict:
+    """Calls ``request_factory(i)`` ``requests`` times from ``concurrency`` workers.
+
+    The factory returns the awaitable for one operation (possibly several HTTP calls).
+    It resolves to True on success.
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for number in remaining:
+            started = time.perf_counter()
+            try:
+                ok = await request_factory(number)
+            except httpx.TransportError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def seed(auth: httpx.AsyncClient, patients: httpx.AsyncClient, args, rng: random.Random) -> tuple[list, dict]:
+    users = [{"name": f"Bench User {n}", "email": f"user{n}@example.com", "password": f"password-{n}"}
+             for n in range(args.users)]
+    for user in users:
+        response = await auth.post("/api/register", json=user)
+        response.raise_for_status()
+
+    login = await auth.post("/api/login", json={"email": users[0]["email"], "password": users[0]["password"]})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    batch_size = 5000
+    for start in range(0, args.patients, batch_size):
+        body = "\n".join(json.dumps(synthetic_patient(rng, number))
+                         for number in range(start, min(start + batch_size, args.patients)))
+        response = await patients.post(
+            "/api/patients/bulk", content=body,
+            headers={**headers, "content-type": "application/x-ndjson"}, params={"batch_size": batch_size},
+        )
+        response.raise_for_status()
+    return users, headers
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    auth_port, patient_port = free_port(), free_port()
+    servers = [
+        # Every request comes from one client IP, so the login rate limiter is off by default.
+        start_service("auth", auth_port, {
+            "BCRYPT_ROUNDS": str(args.bcrypt_rounds), "LOGIN_RATE_LIMIT_BACKEND": "none", **args.auth_env,
+        }, args.workers),
+        start_service("patient", patient_port, args.patient_env, args.workers),
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{auth_port}", limits=limits, timeout=120) as auth, \
+                httpx.AsyncClient(base_url=f"http://127.0.0.1:{patient_port}", limits=limits, timeout=120) as api:
+            await wait_until_ready(auth, "/")
+            await wait_until_ready(api, "/openapi.json")
+            users, headers = await seed(auth, api, args, rng)
+
+            deep_offset = max(args.patients - 100, 0)
+            deep_page = await api.get("/api/patients/", headers=headers, params={"skip": deep_offset, "limit": 50})
+            deep_cursor = deep_page.headers.get("x-next-cursor")
+
+            async def get(path, **params):
+                return (await api.get(path, headers=headers, params=params)).status_code == 200
+
+            async def login(number):
+                user = users[number % len(users)]
+                response = await auth.post("/api/login", json={"email": user["email"], "password": user["password"]})
+                return response.status_code == 200
+
+            async def batch_get(number):
+                ids = [rng.randrange(1, args.patients + 1) for _ in range(100)]
+                response = await api.post("/api/patients/batch-get", headers=headers, json={"ids": ids})
+                return response.status_code == 200
+
+            async def write_cycle(number):
+                patient = synthetic_patient(rng, args.patients + number)
+                created = await api.post("/api/patients/", headers=headers, json=patient)
+                if created.status_code != 200:
+                    return False
+                patient_id = created.json()["id"]
+                updated = await api.put(f"/api/patients/{patient_id}", headers=headers,
+                                        json={**patient, "address": "Rua Atualizada, 1"})
+                deleted = await api.delete(f"/api/patients/{patient_id}", headers=headers)
+                return updated.status_code == 200 and deleted.status_code == 200
+
+            scenarios = {
+                "login_storm": login,
+                "list_first_page": lambda n: get("/api/patients/", limit=50),
+                "list_deep_offset": lambda n: get("/api/patients/", skip=deep_offset, limit=50),
+                "list_deep_cursor": lambda n: get("/api/patients/", cursor=deep_cursor, limit=50),
+                "list_filter_name": lambda n: get("/api/patients/", name=rng.choice(LAST_NAMES), limit=20),
+                "search": lambda n: get("/api/patients/", search=rng.choice(LAST_NAMES), limit=20),
+                "get_patient": lambda n: get(f"/api/patients/{rng.randrange(1, args.patients + 1)}"),
+                "batch_get_100": batch_get,
+                "create_update_delete": write_cycle,
+            }
+            selected = args.scenarios or list(scenarios)
+            results = {}
+            for name in selected:
+                requests = args.login_requests if name == "login_storm" else args.requests
+                results[name] = await run_scenario(scenarios[name], requests, args.concurrency)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "patients": args.patients,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "workers": args.workers,
+            "auth_env": args.auth_env,
+            "patient_env": args.patient_env,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose RPS dropped, or p99 grew, by more than ``tolerance`` relative to the baseline."""
+    regressions = []
+    for name, current in result["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+    return regressions
+
+
+def parse_env(pairs: list) -> dict:
+    return dict(pair.split("=", 1) for pair in pairs or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="operations per scenario")
+    parser.add_argument("--login-requests", type=int, default=100, help="operations for login_storm")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes per service")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--auth-env", nargs="*", metavar="KEY=VALUE", help="extra auth-service settings")
+    parser.add_argument("--patient-env", nargs="*", metavar="KEY=VALUE",
+                        help="extra patient-service settings, e.g. DATABASE_ASYNC=true")
+    parser.add_argument("--output", help="write the JSON result here as well as to stdout")
+    parser.add_argument("--baseline", help="result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    args = parser.parse_args()
+    args.auth_env = parse_env(args.auth_env)
+    args.patient_env = parse_env(args.patient_env)
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Startup cost of auth-service and patient-service.
+
+    python benchmarks/startup.py --workers 1 4 --patients 10000
+
+For each service the script times, in a fresh temporary working directory:
+
+* ``init_fresh``: the schema step (``src.init_db`` / ``alembic upgrade head``) on an empty database;
+* ``init_noop``: the same step again, once the schema is current. Before the step was split out,
+  every worker paid roughly this on every boot;
+* ``import_app``: a new interpreter importing ``src.main``;
+* ``launch`` per worker count: from launching uvicorn until the first request is answered
+  (``first_response``) and until ``GET /ready`` reports that warm-up has finished (``ready``).
+
+``--patients`` seeds the patient database before the second init run, so ``init_noop`` also shows
+that an up-to-date schema costs nothing extra on a large table.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from load import INIT_COMMANDS, SERVICES, SHARED_ENV, free_port
+
+FIRST_PATHS = {"auth": "/", "patient": "/openapi.json"}
+
+
+def service_env(name: str) -> dict:
+    return {**os.environ, "PYTHONPATH": SERVICES[name], **SHARED_ENV}
+
+
+def timed_run(command: list, workdir: str, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *command], cwd=workdir, env=env, check=True, capture_output=True)
+    return round(time.perf_counter() - started, 3)
+
+
+def seed_patients(workdir: str, env: dict, count: int):
+    # Plain inserts into the migrated schema; the summary and search index are not needed here.
+    script = (
+        "from sqlalchemy import insert\n"
+        "from src.config.database import engine\n"
+        "from src.models.patient import Patient\n"
+        "import datetime\n"
+        "rows = [{'name': f'Patient {n}', 'birth_date': datetime.date(1980, 1, 1) + datetime.timedelta(days=n % 9000),"
+        " 'health_conditions': 'None', 'gender': 'Feminine', 'address': 'Rua do Sol, 1'}"
+        f" for n in range({count})]\n"
+        "with engine.begin() as connection:\n"
+        "    connection.execute(insert(Patient), rows)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env, check=True, capture_output=True)
+
+
+def launch_seconds(name: str, workdir: str, env: dict, workers: int, timeout: float = 60.0) -> dict:
+    """Seconds from launching uvicorn until the first answer, and until ``/ready`` reports warm-up done."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers)],
+        cwd=workdir, env=env,
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            for label, path in (("first_response", FIRST_PATHS[name]), ("ready", "/ready")):
+                while True:
+                    try:
+                        if client.get(path).status_code == 200:
+                            result[label] = round(time.perf_counter() - started, 3)
+                            break
+                    except httpx.TransportError:
+                        pass
+                    if time.perf_counter() - started > timeout:
+                        raise RuntimeError(f"{name} did not answer {path} within {timeout} seconds")
+                    time.sleep(0.02)
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(name: str, worker_counts: list, patients: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"{name}-startup-")
+    env = service_env(name)
+    result = {"init_fresh": timed_run(INIT_COMMANDS[name], workdir, env)}
+    if name == "patient" and patients:
+        seed_patients(workdir, env, patients)
+    result["init_noop"] = timed_run(INIT_COMMANDS[name], workdir, env)
+    result["import_app"] = timed_run(["-c", "import src.main"], workdir, env)
+    result["launch"] = {str(workers): launch_seconds(name, workdir, env, workers) for workers in worker_counts}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--patients", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = {"cpus": os.cpu_count(), "seconds": {
+        name: measure(name, args.workers, args.patients) for name in SERVICES
+    }}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
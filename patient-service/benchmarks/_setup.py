@@ -0,0 +1,76 @@
+"""Shared helpers for the patient-service microbenchmarks.
+
+Run every benchmark from the patient-service directory, e.g. ``python -m benchmarks.search``.
+Each one builds its own throwaway SQLite database and prints its results as JSON.
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+# The settings module requires these; benchmarks never issue or check real tokens.
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from src.config.database import Base  # noqa: E402
+from src.models.patient import Patient  # noqa: E402
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor", "Iara", "Joao"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Almeida", "Ribeiro", "Barbosa"]
+STREETS = ["Rua das Flores", "Avenida Boa Viagem", "Rua do Sol", "Travessa Recife", "Avenida Norte"]
+CONDITIONS = ["Hypertension", "Diabetes", "Asthma", "None", "Migraine", "Arrhythmia", "Obesity"]
+
+
+def synthetic_patients(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = date(1940, 1, 1)
+    for number in range(count):
+        yield {
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}",
+            "birth_date": start + timedelta(days=rng.randrange(30000)),
+            "health_conditions": rng.choice(CONDITIONS),
+            "gender": rng.choice(["Masculine", "Feminine"]),
+            "address": f"{rng.choice(STREETS)}, {rng.randrange(1, 3000)}",
+        }
+
+
+def seeded_engine(rows: int, batch_size: int = 10_000):
+    """Creates a temporary SQLite database holding ``rows`` synthetic patients."""
+    path = os.path.join(tempfile.mkdtemp(prefix="patients-bench-"), "patients.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    batch = []
+    with engine.begin() as connection:
+        for row in synthetic_patients(rows):
+            batch.append(row)
+            if len(batch) == batch_size:
+                connection.execute(insert(Patient), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(Patient), batch)
+    return engine
+
+
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def timed(function, repeat: int) -> dict:
+    """Runs ``function`` ``repeat`` times and reports latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "max_ms": round(samples[-1], 3),
+    }
@@ -0,0 +1,93 @@
+"""Cost of syncing a copy of the patients table: full re-download against ``GET /api/patients/changes``.
+
+    python -m benchmarks.change_feed --sizes 10000 100000 --churn 10 100 1000
+
+For each table size, the script seeds a database and puts every patient in the change feed, as
+migration 0002 does. It then records the feed head, makes ``churn`` writes through the repository
+(nine updates for each delete) and times two ways for a replica to catch up. ``full_download``
+streams every patient, as ``/api/patients/export`` does. ``changes_since`` pages through the
+feed from the recorded head, in batches of ``--batch-size``. Only ``changes_since`` should grow
+with churn instead of with the table.
+"""
+import argparse
+import json
+
+from sqlalchemy import func, insert, select
+
+from benchmarks._setup import seeded_engine, session_factory, timed
+from src.models.patient import Patient
+from src.models.patient_change import PatientChange
+from src.repositories.patient_repository import PatientRepository
+from src.repositories.patient_search import create_search_index
+from src.repositories.patient_summary import backfill_patient_summary
+from src.services.patient_change_feed import build_patient_changes
+
+
+def add_to_feed(engine):
+    with engine.begin() as connection:
+        connection.execute(insert(PatientChange).from_select(
+            ["patient_id", "deleted"], select(Patient.id, False).order_by(Patient.id),
+        ))
+
+
+def feed_head(db) -> int:
+    return db.scalar(select(func.coalesce(func.max(PatientChange.seq), 0)))
+
+
+def churn(repository: PatientRepository, writes: int, size: int):
+    step = max(size // writes, 1)
+    for number in range(writes):
+        patient_id = 1 + (number * step) % size
+        if number % 10 == 9:
+            repository.delete_patient_by_id(patient_id)
+        else:
+            repository.update_patient(patient_id, {"address": f"Rua Nova, {number}"})
+
+
+def full_download(repository: PatientRepository) -> int:
+    return sum(len(batch) for batch in repository.stream_patients())
+
+
+def changes_since(repository: PatientRepository, since: int, batch_size: int) -> int:
+    received = 0
+    while True:
+        page = build_patient_changes(repository.get_changes(since, batch_size), since, batch_size)
+        received += len(page["changes"])
+        since = page["next_since"]
+        if not page["has_more"]:
+            return received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--churn", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        engine = seeded_engine(size)
+        create_search_index(engine)
+        backfill_patient_summary(engine)
+        add_to_feed(engine)
+        db = session_factory(engine)()
+        repository = PatientRepository(db)
+        results[size] = {
+            "full_download": {"rows": full_download(repository),
+                              **timed(lambda: full_download(repository), args.repeat)},
+        }
+        for writes in args.churn:
+            since = feed_head(db)
+            churn(repository, writes, size)
+            results[size][f"changes_since_after_{writes}_writes"] = {
+                "rows": changes_since(repository, since, args.batch_size),
+                **timed(lambda: changes_since(repository, since, args.batch_size), args.repeat),
+            }
+        db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
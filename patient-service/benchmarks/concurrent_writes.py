@@ -0,0 +1,110 @@
+"""Concurrent write throughput on SQLite: the old plain engine against ``create_database_engine``.
+
+    python -m benchmarks.concurrent_writes --writers 8 --readers 4 --seconds 5
+
+Writer threads insert patients one transaction at a time while reader threads page through the
+table. Each engine gets its own copy of the seeded database. The old engine uses the default
+rollback journal and ``synchronous=FULL``. The configured one uses WAL, ``synchronous=NORMAL``
+and a busy timeout.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from benchmarks._setup import seeded_engine, session_factory, synthetic_patients
+from src.config.database import create_database_engine
+from src.repositories.patient_cache import NullCache
+from src.repositories.patient_repository import PatientRepository
+from src.repositories.patient_search import create_search_index
+from src.schemas.patient import PatientCreate
+
+
+def run_workload(engine, writers: int, readers: int, seconds: float, rows: int) -> dict:
+    Session = session_factory(engine)
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(number):
+        patients = synthetic_patients(10_000_000, seed=number)
+        with Session() as db:
+            repository = PatientRepository(db, cache=NullCache())
+            for index, data in enumerate(patients):
+                if time.perf_counter() > deadline:
+                    return
+                data["name"] = f"{data['name']} w{number}-{index}"
+                try:
+                    repository.create_patient(PatientCreate(**data))
+                    count("writes")
+                except OperationalError:
+                    db.rollback()
+                    count("errors")
+
+    def reader(number):
+        with Session() as db:
+            repository = PatientRepository(db, cache=NullCache())
+            page = 0
+            while time.perf_counter() < deadline:
+                try:
+                    repository.get_patients(skip=(page * 50) % rows, limit=50)
+                    db.rollback()
+                    count("reads")
+                except OperationalError:
+                    db.rollback()
+                    count("errors")
+                page += 1 + number
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        "writes_per_second": round(counts["writes"] / elapsed, 1),
+        "reads_per_second": round(counts["reads"] / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    seeded = seeded_engine(args.rows)
+    create_search_index(seeded)
+    source = seeded.url.database
+    seeded.dispose()
+
+    engines = {
+        "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "configured": create_database_engine,
+    }
+    results = {"rows": args.rows, "writers": args.writers, "readers": args.readers, "seconds": args.seconds}
+    for name, factory in engines.items():
+        path = os.path.join(os.path.dirname(source), f"{name}.db")
+        shutil.copyfile(source, path)
+        engine = factory(f"sqlite:///{path}")
+        results[name] = run_workload(engine, args.writers, args.readers, args.seconds, args.rows)
+        engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
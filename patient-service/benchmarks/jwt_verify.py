@@ -0,0 +1,68 @@
+"""Cost of verifying one access token with HS256 against RS256 and ES256.
+
+    python -m benchmarks.jwt_verify --repeat 2000
+
+For each algorithm a token is signed the way auth-service signs it. ``parse_per_call`` hands
+``jwt.decode`` the secret or PEM text, so the key is parsed on every verification.
+``prebuilt_key`` passes a key object built once, as ``services/auth.py`` does (for RS/ES keys
+it comes from ``JwksCache``). Timings are per verification and skip the token cache.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk, jwt
+
+ALGORITHMS = ("HS256", "RS256", "ES256")
+
+
+def key_pair(algorithm: str):
+    """(signing key, verification key) in the text form jose accepts."""
+    if algorithm.startswith("HS"):
+        return "benchmark-secret", "benchmark-secret"
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def per_call_us(verify, repeat: int) -> float:
+    verify()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        verify()
+    return round((time.perf_counter() - start) / repeat * 1_000_000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    claims = {"sub": "admin@admin.com", "exp": datetime.utcnow() + timedelta(hours=1)}
+    results = {}
+    for algorithm in ALGORITHMS:
+        signing_key, verification_key = key_pair(algorithm)
+        token = jwt.encode(claims, signing_key, algorithm=algorithm, headers={"kid": "benchmark"})
+        prebuilt = jwk.construct(verification_key, algorithm)
+        results[algorithm] = {
+            "parse_per_call_us": per_call_us(
+                lambda: jwt.decode(token, verification_key, algorithms=[algorithm]), args.repeat),
+            "prebuilt_key_us": per_call_us(
+                lambda: jwt.decode(token, prebuilt, algorithms=[algorithm]), args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
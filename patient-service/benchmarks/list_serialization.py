@@ -0,0 +1,59 @@
+"""Rows per second for rendering a patient list page, old path against the column-row path.
+
+    python -m benchmarks.list_serialization --limit 1000
+
+``orm_response_model`` is what ``list_patients`` used to do: load ORM objects, validate them
+through ``response_model=list[Patient]`` and encode with the stdlib JSON encoder.
+``column_rows`` selects plain rows and serializes them with ``patient_rows_json``. Both timings
+include the query. The script checks that the two paths produce identical bytes.
+"""
+import argparse
+import asyncio
+import json
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks._setup import seeded_engine, session_factory, timed
+from src.repositories.patient_repository import PatientRepository
+from src.schemas.patient import Patient
+from src.services.patient_serialization import patient_rows_json
+
+_response_field = create_model_field(name="Response", type_=list[Patient], mode="serialization")
+
+
+def orm_response_model(repository: PatientRepository, limit: int) -> bytes:
+    patients = repository.get_patients(limit=limit)
+    content = asyncio.run(serialize_response(field=_response_field, response_content=patients, is_coroutine=True))
+    repository.db.expunge_all()
+    # Same arguments as fastapi.responses.JSONResponse.render.
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def column_rows(repository: PatientRepository, limit: int) -> bytes:
+    return patient_rows_json(repository.get_patient_rows(limit=limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    engine = seeded_engine(args.rows)
+    db = session_factory(engine)()
+    repository = PatientRepository(db)
+    assert orm_response_model(repository, args.limit) == column_rows(repository, args.limit)
+
+    results = {"limit": args.limit, "paths": {}}
+    for path in (orm_response_model, column_rows):
+        timing = timed(lambda: path(repository, args.limit), args.repeat)
+        timing["rows_per_second"] = round(args.limit / (timing["mean_ms"] / 1000))
+        results["paths"][path.__name__] = timing
+    db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
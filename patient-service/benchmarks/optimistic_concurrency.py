@@ -0,0 +1,136 @@
+"""Concurrent read-modify-write edits on a few hot patients: last-writer-wins, locking and If-Match.
+
+    python -m benchmarks.optimistic_concurrency --editors 8 --hot 4 --seconds 5
+
+Every editor thread loops over the same ``--hot`` patients. It reads one, increments the counter
+kept in its address, and writes it back. The three strategies differ only in how the write is
+guarded:
+
+* ``last_writer_wins``: a plain update, as ``PUT`` without **If-Match**. It is fast, but
+  concurrent edits overwrite each other, which shows up as ``lost_updates``;
+* ``pessimistic``: editors hold a per-patient lock from the read until the commit, which is what
+  clients had to build themselves before;
+* ``optimistic``: the update carries the version that was read, as ``PUT`` with **If-Match**.
+  On a conflict the editor reads again and retries; ``retries`` counts those round trips.
+
+Every strategy gets its own copy of the seeded database and the engine the service configures
+(WAL, busy timeout).
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+
+from benchmarks._setup import seeded_engine, session_factory
+from src.config.database import create_database_engine
+from src.repositories.patient_cache import NullCache
+from src.repositories.patient_repository import PatientRepository, PatientVersionConflict
+from src.repositories.patient_search import create_search_index
+from src.repositories.patient_summary import backfill_patient_summary
+
+
+def read_counter(repository: PatientRepository, patient_id: int) -> tuple[int, int]:
+    patient = repository.get_patient_by_id(patient_id)
+    counter, version = int(patient.address), patient.version
+    repository.db.rollback()
+    return counter, version
+
+
+def last_writer_wins(repository: PatientRepository, patient_id: int, locks: dict) -> int:
+    counter, _ = read_counter(repository, patient_id)
+    repository.update_patient(patient_id, {"address": str(counter + 1)})
+    return 0
+
+
+def pessimistic(repository: PatientRepository, patient_id: int, locks: dict) -> int:
+    with locks[patient_id]:
+        counter, _ = read_counter(repository, patient_id)
+        repository.update_patient(patient_id, {"address": str(counter + 1)})
+    return 0
+
+
+def optimistic(repository: PatientRepository, patient_id: int, locks: dict) -> int:
+    retries = 0
+    while True:
+        counter, version = read_counter(repository, patient_id)
+        try:
+            repository.update_patient(patient_id, {"address": str(counter + 1)}, expected_version=version)
+            return retries
+        except PatientVersionConflict:
+            retries += 1
+
+
+STRATEGIES = {"last_writer_wins": last_writer_wins, "pessimistic": pessimistic, "optimistic": optimistic}
+
+
+def run_workload(engine, edit, editors: int, hot: int, seconds: float) -> dict:
+    Session = session_factory(engine)
+    hot_ids = list(range(1, hot + 1))
+    with Session() as db:
+        for patient_id in hot_ids:
+            PatientRepository(db, cache=NullCache()).update_patient(patient_id, {"address": "0"})
+
+    locks = {patient_id: threading.Lock() for patient_id in hot_ids}
+    counts = {"edits": 0, "retries": 0}
+    counts_lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def editor(number):
+        edits = retries = 0
+        with Session() as db:
+            repository = PatientRepository(db, cache=NullCache())
+            step = 0
+            while time.perf_counter() < deadline:
+                retries += edit(repository, hot_ids[(number + step) % hot], locks)
+                edits += 1
+                step += 1
+        with counts_lock:
+            counts["edits"] += edits
+            counts["retries"] += retries
+
+    threads = [threading.Thread(target=editor, args=(n,)) for n in range(editors)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with Session() as db:
+        repository = PatientRepository(db, cache=NullCache())
+        applied = sum(read_counter(repository, patient_id)[0] for patient_id in hot_ids)
+    return {
+        **counts,
+        "lost_updates": counts["edits"] - applied,
+        "edits_per_second": round(counts["edits"] / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--editors", type=int, default=8)
+    parser.add_argument("--hot", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    seeded = seeded_engine(args.rows)
+    create_search_index(seeded)
+    backfill_patient_summary(seeded)
+    source = seeded.url.database
+    seeded.dispose()
+
+    results = {"editors": args.editors, "hot_patients": args.hot, "seconds": args.seconds}
+    for name, edit in STRATEGIES.items():
+        path = os.path.join(os.path.dirname(source), f"{name}.db")
+        shutil.copyfile(source, path)
+        engine = create_database_engine(f"sqlite:///{path}")
+        results[name] = run_workload(engine, edit, args.editors, args.hot, args.seconds)
+        engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
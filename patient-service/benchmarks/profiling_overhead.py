@@ -0,0 +1,138 @@
+"""Per-request cost of the profiling hooks, for requests that are profiled and for those that are not.
+
+    python -m benchmarks.profiling_overhead --requests 2000 --rounds 3
+
+Requests go straight to an ASGI app serving one ``GET /api/patients/``-style route: a 50-row
+name filter through the threadpool PatientService, rendered with ``patient_rows_json``.
+``off`` has no profiling installed. ``unsampled`` installs it with a sample rate of 0, which
+is what every request not picked for profiling pays. ``sampled`` profiles every request but
+stays under the slow-request threshold, so nothing is written. ``logged`` asks for a profile
+with ``X-Profile`` on every request, so each one is also queued for the slow request log; at
+this rate the writer falls behind, and ``logged_entries_dropped`` counts what its bounded
+queue turned away.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI, Response
+
+from benchmarks._setup import seeded_engine, session_factory
+from src import profiling
+from src.config.database import create_database_engine, get_db
+from src.config.settings import settings
+from src.profiling import profiled_section, setup_profiling, stop_profiling
+from src.services.patient_serialization import patient_rows_json
+from src.services.patient_service import get_patient_service
+
+TOKEN = "benchmark"
+MODES = {
+    "off": None,
+    "unsampled": {"PROFILING_SAMPLE_RATE": 0.0},
+    "sampled": {"PROFILING_SAMPLE_RATE": 1.0, "SLOW_REQUEST_THRESHOLD_MS": 10 ** 9},
+    "logged": {"PROFILING_SAMPLE_RATE": 0.0},
+}
+
+
+def build_app(engine, profiled: bool) -> FastAPI:
+    Session = session_factory(engine)
+    app = FastAPI()
+
+    def db():
+        with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = db
+
+    @app.get("/api/patients/")
+    async def list_patients(patient_service=Depends(get_patient_service)):
+        patients = await patient_service.get_patients(name="Silva", limit=50)
+        with profiled_section("serialization"):
+            body = patient_rows_json(patients)
+        return Response(body, media_type="application/json")
+
+    if profiled:
+        setup_profiling(app, engine)
+    return app
+
+
+async def request(app, headers: list):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/patients/", "raw_path": b"/api/patients/", "query_string": b"",
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"status {message['status']}")
+
+    await app(scope, receive, send)
+
+
+def run(app, requests: int, headers: list) -> dict:
+    async def main():
+        for _ in range(50):
+            await request(app, headers)
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            await request(app, headers)
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    samples = sorted(asyncio.run(main()))
+    return {
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99)], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    seeded = seeded_engine(args.rows)
+    path = seeded.url.database
+    seeded.dispose()
+    settings.PROFILING_HEADER_TOKEN = TOKEN
+    settings.SLOW_REQUEST_LOG_PATH = os.path.join(tempfile.mkdtemp(prefix="profiling-bench-"), "slow.jsonl")
+
+    results = {"requests": args.requests, "rounds": args.rounds, "logged_entries_dropped": 0}
+    # Modes take turns, and each keeps its best round, so drift on the machine hits them alike.
+    for _ in range(args.rounds):
+        for mode, overrides in MODES.items():
+            for name, value in (overrides or {}).items():
+                setattr(settings, name, value)
+            engine = create_database_engine(f"sqlite:///{path}")
+            app = build_app(engine, profiled=overrides is not None)
+            headers = [(b"x-profile", TOKEN.encode())] if mode == "logged" else []
+            timing = run(app, args.requests, headers)
+            if mode not in results or timing["mean_ms"] < results[mode]["mean_ms"]:
+                results[mode] = timing
+            if overrides is not None:
+                results["logged_entries_dropped"] += profiling.slow_request_log.dropped
+                stop_profiling()
+            engine.dispose()
+
+    baseline = results["off"]["mean_ms"]
+    for mode in MODES:
+        results[mode]["overhead_pct"] = round((results[mode]["mean_ms"] / baseline - 1) * 100, 1)
+    log_files = glob.glob(settings.SLOW_REQUEST_LOG_PATH + "*")
+    results["logged_entries"] = sum(1 for log_file in log_files for _ in open(log_file))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
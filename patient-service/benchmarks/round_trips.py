@@ -0,0 +1,75 @@
+"""Counts the database round trips each write operation of PatientService makes.
+
+    python -m benchmarks.round_trips --rows 10000
+
+A round trip is one executed SQL statement or one COMMIT. The patient cache is disabled, so
+reads also reach the database.
+"""
+import argparse
+import json
+from datetime import date
+
+from sqlalchemy import event
+
+from benchmarks._setup import seeded_engine, session_factory
+from src.repositories.patient_cache import NullCache
+from src.repositories.patient_search import create_search_index
+from src.schemas.patient import PatientCreate, PatientUpdate
+from src.services.patient_service import PatientService
+
+
+class RoundTripCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "commit", self._statement)
+
+    def _statement(self, *args, **kwargs):
+        self.count += 1
+
+    def measure(self, operation) -> int:
+        before = self.count
+        operation()
+        return self.count - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = seeded_engine(args.rows)
+    create_search_index(engine)
+    counter = RoundTripCounter(engine)
+    Session = session_factory(engine)
+
+    patient = PatientCreate(
+        name="Round Trip", birth_date=date(1990, 1, 1), health_conditions="None",
+        gender="Feminine", address="Rua do Sol, 1",
+    )
+
+    def in_session(call):
+        def operation():
+            with Session() as db:
+                service = PatientService(db)
+                service.patient_repo.cache = NullCache()
+                call(service)
+        return operation
+
+    created = {}
+    operations = {
+        "create": lambda service: created.update(id=service.add_patient(patient).id),
+        "get": lambda service: service.get_patient_by_id(created["id"]).name,
+        "update": lambda service: service.update_patient(created["id"], patient.model_copy(
+            update={"address": "Rua do Sol, 2"})).address,
+        "patch": lambda service: service.patch_patient(created["id"], PatientUpdate(address="Rua do Sol, 3")).address,
+        "delete": lambda service: service.delete_patient_by_id(created["id"]),
+    }
+    results = {"rows": args.rows, "round_trips": {
+        name: counter.measure(in_session(call)) for name, call in operations.items()
+    }}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compares the full-text ``search`` path with the leading-wildcard ``ilike`` filters it replaces.
+
+    python -m benchmarks.search --rows 200000
+"""
+import argparse
+import json
+
+from benchmarks._setup import seeded_engine, session_factory, timed
+from src.repositories.patient_repository import PatientRepository
+from src.repositories.patient_search import create_search_index
+
+# Common terms match ~10% of rows, so ilike finds a page early; rare ones make it scan the table.
+TERMS = [
+    ("name", "Barbosa"),
+    ("address", "Viagem"),
+    ("health_conditions", "Arrhythmia"),
+    ("name", "77777"),
+    ("address", "Nowhere"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = seeded_engine(args.rows)
+    create_search_index(engine)
+    db = session_factory(engine)()
+    repository = PatientRepository(db)
+
+    results = {"rows": args.rows, "limit": args.limit, "queries": {}}
+    for field, term in TERMS:
+        results["queries"][f"{field}={term}"] = {
+            "ilike": timed(lambda: repository.get_patients(limit=args.limit, **{field: term}), args.repeat),
+            "search": timed(lambda: repository.get_patients(limit=args.limit, search=term), args.repeat),
+        }
+    db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
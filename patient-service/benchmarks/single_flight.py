@@ -0,0 +1,118 @@
+"""Thundering herd of identical patient reads, with and without single-flight coalescing.
+
+    python -m benchmarks.single_flight --concurrency 100 --waves 20
+
+Each wave fires ``--concurrency`` identical reads at once, as a dashboard refresh does.
+``list`` is ``GET /api/patients/?name=...`` and ``get`` is ``GET /api/patients/{id}`` with
+the record cache bypassed, so every read is a cold miss. Both service stacks are measured.
+``sync`` is PatientService on threads, as the threadpool runs it, and ``async`` is
+AsyncPatientService on aiosqlite. The script counts the SQL statements the engine actually
+executed and reports them per request, next to requests per second.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from benchmarks._setup import seeded_engine, session_factory
+from src.config.database import create_async_database_engine, create_database_engine
+from src.config.settings import settings
+from src.repositories.patient_cache import NullCache
+from src.services.patient_service import AsyncPatientService, PatientService
+
+READS = {
+    "list": lambda service: service.get_patients(name="Silva", limit=50),
+    "get": lambda service: service.get_patient_by_id(42),
+}
+
+
+def count_statements(engine) -> list:
+    executed = [0]
+
+    def count(*args):
+        executed[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    return executed
+
+
+def uncached(service):
+    service.patient_repo.cache = NullCache()
+    return service
+
+
+def run_sync(path: str, read, concurrency: int, waves: int) -> tuple[int, float]:
+    engine = create_database_engine(f"sqlite:///{path}")
+    executed = count_statements(engine)
+    Session = session_factory(engine)
+
+    def one(barrier):
+        barrier.wait()
+        with Session() as db:
+            read(uncached(PatientService(db)))
+
+    started = time.perf_counter()
+    for _ in range(waves):
+        barrier = threading.Barrier(concurrency)
+        threads = [threading.Thread(target=one, args=(barrier,)) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return executed[0], elapsed
+
+
+def run_async(path: str, read, concurrency: int, waves: int) -> tuple[int, float]:
+    async def main():
+        engine = create_async_database_engine(f"sqlite+aiosqlite:///{path}")
+        executed = count_statements(engine.sync_engine)
+        Session = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+        async def one():
+            async with Session() as db:
+                await read(uncached(AsyncPatientService(db)))
+
+        started = time.perf_counter()
+        for _ in range(waves):
+            await asyncio.gather(*(one() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+        return executed[0], elapsed
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--waves", type=int, default=20)
+    args = parser.parse_args()
+
+    seeded = seeded_engine(args.rows)
+    path = seeded.url.database
+    seeded.dispose()
+
+    requests = args.concurrency * args.waves
+    results = {"concurrency": args.concurrency, "waves": args.waves}
+    for stack, run in (("sync", run_sync), ("async", run_async)):
+        for name, read in READS.items():
+            for coalesce in (False, True):
+                settings.SINGLE_FLIGHT_ENABLED = coalesce
+                statements, elapsed = run(path, read, args.concurrency, args.waves)
+                results[f"{stack}_{name}_{'single_flight' if coalesce else 'direct'}"] = {
+                    "statements": statements,
+                    "statements_per_request": round(statements / requests, 3),
+                    "requests_per_second": round(requests / elapsed, 1),
+                }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
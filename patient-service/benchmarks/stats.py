@@ -0,0 +1,54 @@
+"""Cost of ``GET /api/patients/stats`` from the summary table against GROUP BY over ``patients``.
+
+    python -m benchmarks.stats --sizes 10000 100000 1000000
+
+For each table size, the script seeds a database, fills the summary with
+``backfill_patient_summary`` and times both ways of computing the same aggregates.
+"""
+import argparse
+import json
+
+from sqlalchemy import String, cast, extract, func, literal, select, union_all
+
+from benchmarks._setup import seeded_engine, session_factory, timed
+from src.models.patient import Patient
+from src.repositories.patient_repository import PatientRepository
+from src.repositories.patient_summary import backfill_patient_summary
+from src.services.patient_stats import build_patient_stats
+
+
+def live_stats_query():
+    def by(dimension: str, column):
+        return select(literal(dimension), cast(column, String), func.count()).group_by(column)
+
+    return union_all(
+        by("gender", Patient.gender),
+        by("birth_year", extract("year", Patient.birth_date)),
+        by("health_conditions", Patient.health_conditions),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        engine = seeded_engine(size)
+        backfill_patient_summary(engine)
+        db = session_factory(engine)()
+        repository = PatientRepository(db)
+        assert build_patient_stats(repository.get_patient_stats()) == \
+            build_patient_stats(db.execute(live_stats_query()).all())
+        results[size] = {
+            "summary_table": timed(repository.get_patient_stats, args.repeat),
+            "group_by_patients": timed(lambda: db.execute(live_stats_query()).all(), args.repeat),
+        }
+        db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
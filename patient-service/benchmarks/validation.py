@@ -0,0 +1,100 @@
+"""Cost of validating patient input: the old per-row Python checks against the PatientCreate schema.
+
+    python -m benchmarks.validation --rows 10000
+
+``legacy`` parses into a plain model and then runs the checks ``validate_patient`` used to
+make in Python: the date compared with ``date.today()``, the name split into words and a list
+of genders built for every row. ``schema`` is the current path. A single patient is validated
+by ``PatientCreate``, and a batch by ``validate_patient_rows``, which is one ``TypeAdapter``
+call over the whole list. In the ``*_with_errors`` runs one row in ten is invalid; the schema
+path validates those rows a second time to report why they failed.
+"""
+import argparse
+import json
+from datetime import date
+
+from pydantic import BaseModel, ValidationError
+
+from benchmarks._setup import synthetic_patients, timed
+from src.schemas.patient import PatientCreate
+from src.services.patient_validations import validate_patient_rows
+
+SINGLE_BLOCK = 1000
+
+
+class LegacyPatientCreate(BaseModel):
+    name: str
+    birth_date: date
+    health_conditions: str
+    gender: str
+    address: str
+
+
+def legacy_validate(data: dict) -> LegacyPatientCreate:
+    patient = LegacyPatientCreate(**data)
+    if patient.birth_date > date.today():
+        raise ValueError("The date of birth cannot be a future date.")
+    if len(patient.name.split()) < 2:
+        raise ValueError("The name must contain at least two words.")
+    valid_genders = ["Masculine", "Feminine"]
+    if patient.gender.capitalize() not in valid_genders:
+        raise ValueError(f"The gender must be one of the following: {', '.join(valid_genders)}.")
+    return patient
+
+
+def legacy_validate_rows(rows: list[tuple[int, dict]]) -> tuple[list, list]:
+    patients, errors = [], []
+    for row, data in rows:
+        try:
+            patients.append((row, legacy_validate(data)))
+        except (ValidationError, ValueError) as exc:
+            errors.append({"row": row, "detail": str(exc)})
+    return patients, errors
+
+
+def input_rows(count: int, invalid_every: int = 0) -> list[tuple[int, dict]]:
+    rows = []
+    for number, data in enumerate(synthetic_patients(count), start=1):
+        data["birth_date"] = data["birth_date"].isoformat()
+        if invalid_every and number % invalid_every == 0:
+            data["gender"] = "Unknown"
+        rows.append((number, data))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    single = input_rows(1)[0][1]
+    batch = input_rows(args.rows)
+    batch_with_errors = input_rows(args.rows, invalid_every=10)
+    assert len(validate_patient_rows(batch_with_errors)[1]) == len(legacy_validate_rows(batch_with_errors)[1])
+
+    def per_row_us(timing: dict, rows: int) -> dict:
+        return {**timing, "us_per_row": round(timing["mean_ms"] * 1000 / rows, 3)}
+
+    results = {
+        # Timed in blocks of SINGLE_BLOCK calls; one call is below the timer's resolution.
+        "single": {
+            "legacy": per_row_us(timed(lambda: [legacy_validate(single) for _ in range(SINGLE_BLOCK)],
+                                       args.repeat), SINGLE_BLOCK),
+            "schema": per_row_us(timed(lambda: [PatientCreate(**single) for _ in range(SINGLE_BLOCK)],
+                                       args.repeat), SINGLE_BLOCK),
+        },
+        f"batch_{args.rows}": {
+            "legacy": per_row_us(timed(lambda: legacy_validate_rows(batch), args.repeat), args.rows),
+            "schema": per_row_us(timed(lambda: validate_patient_rows(batch), args.repeat), args.rows),
+            "legacy_with_errors": per_row_us(
+                timed(lambda: legacy_validate_rows(batch_with_errors), args.repeat), args.rows),
+            "schema_with_errors": per_row_us(
+                timed(lambda: validate_patient_rows(batch_with_errors), args.repeat), args.rows),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from src.config.database import Base, create_database_engine
+from src.config.settings import settings
+from src.models import patient, patient_summary  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_online():
+    engine = create_database_engine(settings.DATABASE_URL)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+# Migrations inspect the live schema (see 0001), so there is no offline --sql mode.
+run_migrations_online()
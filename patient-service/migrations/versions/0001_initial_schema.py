@@ -0,0 +1,116 @@
+"""Initial schema: patients, its indexes, the search index and patient_summary.
+
+Databases created before migrations existed (by ``create_all`` at import time) may already
+hold any subset of these objects, so every step is skipped when its object is present.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ("name", "address", "health_conditions")
+PG_SEARCH_EXPRESSION = "(coalesce(name, '') || ' ' || coalesce(address, '') || ' ' || coalesce(health_conditions, ''))"
+# Duplicate groups named in the error; a database with more has a bigger problem than this message.
+MAX_REPORTED_DUPLICATES = 20
+
+
+def check_no_duplicate_patients(bind, patients: sa.Table):
+    """Fails with the conflicting ids if ``uq_patients_name_birth_date`` cannot be created.
+
+    Before this index existed nothing kept two patients from sharing a name and date of birth.
+    Which of them to keep is not something a migration can decide, so they are listed for an
+    operator to merge or fix before upgrading again.
+    """
+    key = (patients.c.name, patients.c.birth_date)
+    duplicated = (
+        sa.select(*key).group_by(*key).having(sa.func.count() > 1)
+        .order_by(*key).limit(MAX_REPORTED_DUPLICATES).subquery()
+    )
+    rows = bind.execute(
+        sa.select(patients.c.id, *key)
+        .join(duplicated, sa.and_(patients.c.name == duplicated.c.name, patients.c.birth_date == duplicated.c.birth_date))
+        .order_by(*key, patients.c.id)
+    ).all()
+    if not rows:
+        return
+    groups = {}
+    for patient_id, name, birth_date in rows:
+        groups.setdefault((name, birth_date), []).append(str(patient_id))
+    listed = "\n".join(f"  {name!r} born {birth_date}: ids {', '.join(ids)}" for (name, birth_date), ids in groups.items())
+    raise RuntimeError(
+        "Cannot create the unique index uq_patients_name_birth_date: these patients share a name and date "
+        f"of birth (first {MAX_REPORTED_DUPLICATES} groups at most). Merge, rename or delete them, then "
+        f"upgrade again.\n{listed}"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    patients = op.create_table(
+        "patients",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String),
+        sa.Column("birth_date", sa.Date),
+        sa.Column("health_conditions", sa.String),
+        sa.Column("gender", sa.String),
+        sa.Column("address", sa.String),
+        if_not_exists=True,
+    )
+    op.create_index("ix_patients_id", "patients", ["id"], if_not_exists=True)
+    op.create_index("ix_patients_name_id", "patients", ["name", "id"], if_not_exists=True)
+    op.create_index("ix_patients_birth_date_id", "patients", ["birth_date", "id"], if_not_exists=True)
+    if not any(index["name"] == "uq_patients_name_birth_date" for index in sa.inspect(bind).get_indexes("patients")):
+        check_no_duplicate_patients(bind, patients)
+    op.create_index("uq_patients_name_birth_date", "patients", ["name", "birth_date"], unique=True, if_not_exists=True)
+
+    summary_exists = sa.inspect(bind).has_table("patient_summary")
+    summary = op.create_table(
+        "patient_summary",
+        sa.Column("gender", sa.String, primary_key=True),
+        sa.Column("birth_year", sa.Integer, primary_key=True),
+        sa.Column("health_conditions", sa.String, primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False),
+        if_not_exists=True,
+    )
+    if not summary_exists:
+        birth_year = sa.extract("year", patients.c.birth_date)
+        op.execute(summary.insert().from_select(
+            ["gender", "birth_year", "health_conditions", "count"],
+            sa.select(patients.c.gender, birth_year, patients.c.health_conditions, sa.func.count())
+            .group_by(patients.c.gender, birth_year, patients.c.health_conditions),
+        ))
+
+    if bind.dialect.name == "sqlite":
+        if not sa.inspect(bind).has_table("patients_fts"):
+            op.execute(
+                f"CREATE VIRTUAL TABLE patients_fts USING fts5("
+                f"{', '.join(SEARCH_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            op.execute(
+                f"INSERT INTO patients_fts (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                f"SELECT id, {', '.join(SEARCH_COLUMNS)} FROM patients"
+            )
+    elif bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_patients_search_trgm ON patients "
+            f"USING gin ({PG_SEARCH_EXPRESSION} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS patients_fts")
+    op.drop_table("patient_summary")
+    op.drop_table("patients")
@@ -0,0 +1,43 @@
+"""Change feed: patient_changes, seeded with one row per existing patient.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    seq = sa.Sequence("patient_changes_seq_seq")
+    server_default = None
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(seq))
+        server_default = sa.text("nextval('patient_changes_seq_seq')")
+    changes = op.create_table(
+        "patient_changes",
+        sa.Column("seq", sa.Integer, seq, server_default=server_default, primary_key=True),
+        sa.Column("patient_id", sa.Integer, nullable=False, unique=True),
+        sa.Column("deleted", sa.Boolean, nullable=False),
+        sqlite_autoincrement=True,
+    )
+    # Existing patients enter the feed in id order, so a replica syncing from 0 receives all of them.
+    patients = sa.table("patients", sa.column("id"))
+    op.execute(changes.insert().from_select(
+        ["patient_id", "deleted"], sa.select(patients.c.id, sa.false()).order_by(patients.c.id),
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table("patient_changes")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence("patient_changes_seq_seq")))
@@ -1,17 +1,13 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from src.services.auth import SECRET_KEY, ALGORITHM
+from src.services.auth import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return username
-    except JWTError:
+    payload = decode_access_token(token)
+    username = payload.get("sub") if payload else None
+    if not username:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return username
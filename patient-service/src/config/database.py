@@ -1,12 +1,96 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.config.settings import settings
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly.
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> URL:
+    """``url`` with its driver swapped for the asyncio one, e.g. ``sqlite://`` -> ``sqlite+aiosqlite://``."""
+    url = make_url(url)
+    return url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+
+
+def _is_file_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _engine_options(url: URL) -> dict:
+    if url.get_backend_name() == "sqlite" and not _is_file_sqlite(url):
+        # In-memory databases live on a single connection; pool sizing does not apply.
+        return {"connect_args": {"check_same_thread": False}} if url.get_driver_name() == "pysqlite" else {}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "pysqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer, and NORMAL only syncs at checkpoints,
+    # which stays durable in WAL mode. busy_timeout makes a writer wait for the lock instead of failing.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
+def configure_engine(engine: Engine, url: URL):
+    """Applies the SQLite pragmas to every new connection of ``engine`` (the ``sync_engine`` of an async one)."""
+    if _is_file_sqlite(url):
+        event.listen(engine, "connect", _configure_sqlite_connection)
 
-DATABASE_URL = "sqlite:///./patients.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def create_database_engine(url: str) -> Engine:
+    url = make_url(url)
+    engine = create_engine(url, **_engine_options(url))
+    configure_engine(engine, url)
+    return engine
+
+
+def create_async_database_engine(url: str):
+    url = make_url(url)
+    options = _engine_options(url)
+    if "pool_size" in options:
+        # aiosqlite defaults to NullPool; reuse connections like every other configuration does.
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    configure_engine(engine.sync_engine, url)
+    return engine
+
+
+engine = create_database_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = create_async_database_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def _discard_inherited_connections():
+    # A forked worker (e.g. gunicorn --preload) must not reuse the parent's pooled sockets or file
+    # handles; close=False drops them without closing what the parent still uses.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_discard_inherited_connections)
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +98,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,13 +1,54 @@
-from pydantic_settings import BaseSettings
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env")
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
-    class Config:
-        env_file = ".env"
+    DATABASE_URL: str = "sqlite:///./patients.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    CHANGES_BATCH_SIZE: int = 1000
+    MAX_PAGE_SIZE: int = 1000
+
+    PATIENT_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    PATIENT_CACHE_SIZE: int = 10000
+    PATIENT_CACHE_TTL_SECONDS: int = 60
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_TTL_SECONDS: int = 300
+    JWKS_URL: Optional[str] = None
+    JWKS_REFRESH_SECONDS: int = 300
+
+    METRICS_ENABLED: bool = False
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_HEADER_TOKEN: Optional[str] = None
+    PROFILING_MAX_STATEMENTS: int = 200
+    PROFILING_TOP_FUNCTIONS: int = 30
+    SLOW_REQUEST_THRESHOLD_MS: int = 500
+    SLOW_REQUEST_LOG_PATH: str = "slow_requests.jsonl"
+    SLOW_REQUEST_LOG_MAX_BYTES: int = 10485760
+    SLOW_REQUEST_LOG_BACKUP_COUNT: int = 5
 
 
 settings = Settings()
@@ -1,10 +1,45 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from src.config.database import Base, engine
+from src.config.database import engine, async_engine
+from src.config.settings import settings
+from src.metrics import register_cache_stats, setup_metrics, shutdown_metrics
+from src.profiling import setup_profiling, stop_profiling
+from src.repositories.patient_cache import patient_cache
 from src.routers.patient_router import router as patient_router
+from src.services import auth
+from src.services.auth import jwks_cache, token_cache
+from src.services.patient_service import patient_read_flight
+from src.warmup import warmup
+
+
+def ping_database():
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+
+
+async def ping_async_database():
+    async with async_engine.connect() as connection:
+        await connection.exec_driver_sql("SELECT 1")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    steps = {"jwt": auth.warm_up}
+    if jwks_cache is not None:
+        steps["jwks"] = jwks_cache.start
+    steps["database"] = ping_async_database if settings.DATABASE_ASYNC else ping_database
+    warmup.start(steps)
+    yield
+    await warmup.stop()
+    if jwks_cache is not None:
+        jwks_cache.stop()
+    stop_profiling()
+    shutdown_metrics()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
+    lifespan=lifespan,
 title="API de Gestão de Pacientes",
     description=(
         "Esta API permite gerenciar pacientes com funcionalidades de autenticação e proteção de rotas."
@@ -22,3 +57,17 @@ title="API de Gestão de Pacientes",
 )
 
 app.include_router(patient_router, prefix="/api")
+
+if settings.METRICS_ENABLED:
+    setup_metrics(app, engine, async_engine.sync_engine)
+    register_cache_stats("patients", patient_cache.info)
+    register_cache_stats("tokens", token_cache.stats)
+    register_cache_stats("single_flight", patient_read_flight.metrics)
+
+if settings.PROFILING_ENABLED:
+    setup_profiling(app, engine, async_engine.sync_engine)
+
+
+@app.get("/ready", include_in_schema=False)
+def ready():
+    return warmup.response()
@@ -0,0 +1,274 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import FastAPI, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Created by setup_metrics, so prometheus_client is never imported while metrics are disabled.
+registry = None
+REQUEST_LATENCY = None
+REQUESTS_IN_FLIGHT = None
+DB_QUERIES_PER_REQUEST = None
+DB_TIME_PER_REQUEST = None
+DB_QUERY_DURATION = None
+DB_POOL_CHECKOUT_WAIT = None
+SECTION_DURATION = None
+
+# How often each worker copies its cache counters into the shared files in multiprocess mode.
+CACHE_STATS_PUBLISH_SECONDS = 5.0
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Directory shared by the workers of ``src.serve``; when set, /metrics sums all of them."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def _create_metrics():
+    global registry, REQUEST_LATENCY, REQUESTS_IN_FLIGHT, DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST
+    global DB_QUERY_DURATION, DB_POOL_CHECKOUT_WAIT, SECTION_DURATION
+    from prometheus_client import CollectorRegistry, Gauge, Histogram
+
+    registry = CollectorRegistry()
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds", "Request latency by route template.",
+        ["method", "route", "status"], registry=registry,
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        "http_requests_in_flight", "Requests currently being served.", registry=registry, multiprocess_mode="livesum",
+    )
+    DB_QUERIES_PER_REQUEST = Histogram(
+        "db_queries_per_request", "SQL statements executed per request.",
+        ["method", "route"], buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100), registry=registry,
+    )
+    DB_TIME_PER_REQUEST = Histogram(
+        "db_time_per_request_seconds", "Time spent executing SQL per request.", ["method", "route"], registry=registry,
+    )
+    DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Duration of each SQL statement.", registry=registry)
+    DB_POOL_CHECKOUT_WAIT = Histogram(
+        "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", registry=registry,
+    )
+    SECTION_DURATION = Histogram(
+        "app_section_duration_seconds", "Time spent in instrumented sections such as jwt_decode or bcrypt_verify.",
+        ["section"], registry=registry,
+    )
+    if multiprocess_dir():
+        threading.Thread(target=_publish_cache_stats, name="cache-stats", daemon=True).start()
+    else:
+        registry.register(_cache_stats)
+
+
+enabled = False
+
+
+class _RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Mutable holder so statements run on threadpool workers (which get a copy of the context) still count.
+_request_db: ContextVar[Optional[_RequestDbStats]] = ContextVar("request_db", default=None)
+
+
+@contextmanager
+def timed_section(section: str):
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SECTION_DURATION.labels(section).observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency per route template, in-flight gauge and per-request DB totals."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_stats = _RequestDbStats()
+        token = _request_db.set(db_stats)
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            _request_db.reset(token)
+            route = scope.get("route")
+            # Label by template, never the raw path, to keep cardinality bounded.
+            route_label = route.path if route is not None else "unmatched"
+            REQUEST_LATENCY.labels(scope["method"], route_label, str(status)).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(scope["method"], route_label).observe(db_stats.queries)
+            DB_TIME_PER_REQUEST.labels(scope["method"], route_label).observe(db_stats.seconds)
+
+
+class StatementTimer:
+    """Times SQL statements from ``before_cursor_execute`` to ``after_cursor_execute``.
+
+    The start time is kept on the statement's execution context, which is discarded with it. A
+    statement that fails never reaches ``after_cursor_execute``, so a start time kept on the
+    pooled connection would be picked up by the next statement run on it.
+    """
+
+    def __init__(self, name: str):
+        self.attribute = f"_{name}_started"
+
+    def start(self, context):
+        if context is not None:
+            setattr(context, self.attribute, time.perf_counter())
+
+    def elapsed(self, context) -> Optional[float]:
+        """Seconds since ``start``; None for a statement that was not started (or had no context)."""
+        started = getattr(context, self.attribute, None)
+        return None if started is None else time.perf_counter() - started
+
+
+_query_timer = StatementTimer("metrics")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _query_timer.start(context)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = _query_timer.elapsed(context)
+    if elapsed is None:
+        return
+    DB_QUERY_DURATION.observe(elapsed)
+    db_stats = _request_db.get()
+    if db_stats is not None:
+        db_stats.queries += 1
+        db_stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine):
+    """Hooks statement timing into ``engine`` (the ``sync_engine`` of an async engine) and times pool checkouts."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    # The pool has no "checkout requested" event, so time the call that blocks on it. Wrapping the
+    # engine rather than its pool keeps working after engine.dispose() swaps the pool out.
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    engine.raw_connection = timed_raw_connection
+
+
+class CacheStatsCollector:
+    """Reads cache counters at scrape time, so caches pay nothing extra for being exported."""
+
+    def __init__(self):
+        self.sources = {}
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that were served from the cache.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that fell through.", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently cached.", labels=["cache"])
+        for name, stats in self.sources.items():
+            values = stats()
+            if "hits" in values:
+                hits.add_metric([name], values["hits"])
+                misses.add_metric([name], values["misses"])
+            if "size" in values:
+                size.add_metric([name], values["size"])
+        yield hits
+        yield misses
+        yield size
+
+
+_cache_stats = CacheStatsCollector()
+
+
+def _publish_cache_stats():
+    """Multiprocess stand-in for CacheStatsCollector, which could only read the worker serving the scrape.
+
+    Each worker periodically writes its counters to gauges that /metrics sums over the live
+    workers. They keep the series names the collector exports, but are typed as gauges.
+    """
+    from prometheus_client import Gauge
+
+    hits = Gauge("cache_hits_total", "Cache lookups that were served from the cache.", ["cache"],
+                 registry=None, multiprocess_mode="livesum")
+    misses = Gauge("cache_misses_total", "Cache lookups that fell through.", ["cache"],
+                   registry=None, multiprocess_mode="livesum")
+    size = Gauge("cache_entries", "Entries currently cached.", ["cache"], registry=None, multiprocess_mode="livesum")
+    while True:
+        for name, stats in list(_cache_stats.sources.items()):
+            values = stats()
+            if "hits" in values:
+                hits.labels(name).set(values["hits"])
+                misses.labels(name).set(values["misses"])
+            if "size" in values:
+                size.labels(name).set(values["size"])
+        time.sleep(CACHE_STATS_PUBLISH_SECONDS)
+
+
+def register_cache_stats(name: str, stats):
+    """``stats`` returns a dict with ``hits``/``misses`` and optionally ``size``."""
+    _cache_stats.sources[name] = stats
+
+
+def setup_metrics(app: FastAPI, *engines: Engine):
+    """Installs the middleware, engine hooks and ``GET /metrics``; nothing is installed unless this is called."""
+    global enabled
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    _create_metrics()
+    enabled = True
+    for engine in engines:
+        instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(_scrape_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def _scrape_registry():
+    if not multiprocess_dir():
+        return registry
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    scrape = CollectorRegistry()
+    multiprocess.MultiProcessCollector(scrape)
+    return scrape
+
+
+def shutdown_metrics():
+    """Drops this worker's live gauges from the multiprocess files, so a stopped worker stops counting."""
+    if enabled and multiprocess_dir():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
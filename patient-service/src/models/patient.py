@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, Index
 from src.config.database import Base
 
 
@@ -6,8 +6,16 @@ class Patient(Base):
     __tablename__ = "patients"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
+    name = Column(String)
     birth_date = Column(Date)
     health_conditions = Column(String)
     gender = Column(String)
     address = Column(String)
+    # Bumped by every update; the ETag, and what If-Match compares against.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        Index("ix_patients_name_id", "name", "id"),
+        Index("ix_patients_birth_date_id", "birth_date", "id"),
+        Index("uq_patients_name_birth_date", "name", "birth_date", unique=True),
+    )
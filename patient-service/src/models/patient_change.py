@@ -0,0 +1,17 @@
+from sqlalchemy import Boolean, Column, Integer, Sequence
+from src.config.database import Base
+
+
+class PatientChange(Base):
+    """Latest change of each patient, ordered by ``seq``; ``deleted`` rows are tombstones.
+
+    Every write replaces the patient's row with one holding a new, higher ``seq``, so the table
+    keeps one row per patient ever written and a replica that synced up to ``seq`` N only needs
+    the rows above N. AUTOINCREMENT stops SQLite from reusing the ``seq`` of a replaced last row.
+    """
+    __tablename__ = "patient_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, Sequence("patient_changes_seq_seq"), primary_key=True)
+    patient_id = Column(Integer, nullable=False, unique=True)
+    deleted = Column(Boolean, nullable=False, default=False)
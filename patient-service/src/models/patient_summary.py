@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String
+from src.config.database import Base
+
+
+class PatientSummary(Base):
+    """Patient counts per (gender, birth year, health condition), kept in step by PatientRepository."""
+    __tablename__ = "patient_summary"
+
+    gender = Column(String, primary_key=True)
+    birth_year = Column(Integer, primary_key=True)
+    health_conditions = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,385 @@
+import hmac
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from inspect import iscoroutinefunction
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.config.settings import settings
+from src.metrics import StatementTimer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Prefix that asks each backend for a plan without running the statement.
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN", "postgresql": "EXPLAIN"}
+EXPLAINABLE = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE"}
+
+# Entries waiting for the writer; further profiles are dropped rather than held in memory.
+MAX_QUEUED_ENTRIES = 1000
+
+# cProfile cannot profile two requests at once; requests sampled meanwhile skip the function profile.
+_profiler_lock = threading.Lock()
+
+
+class RequestProfile:
+    """What one profiled request recorded: section times, SQL statements and the cProfile runs."""
+
+    def __init__(self):
+        self.sections = {}
+        self.statements = []
+        self.statements_dropped = 0
+        self.profilers = []
+
+    def add_section(self, section: str, seconds: float):
+        self.sections[section] = self.sections.get(section, 0.0) + seconds
+
+    def add_statement(self, conn, statement: str, parameters, seconds: float, executemany: bool):
+        if len(self.statements) >= settings.PROFILING_MAX_STATEMENTS:
+            self.statements_dropped += 1
+            return
+        if executemany:
+            parameters = parameters[0] if parameters else None
+        # Plans are fetched later over the sync engine, which only understands its own parameter style.
+        self.statements.append((statement, parameters, seconds, executemany, conn.dialect.paramstyle))
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def profiled_section(section: str):
+    """Adds the time spent inside to ``section`` of the current request's profile, if it is being profiled."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_section(section, time.perf_counter() - started)
+
+
+class _TimedProxy:
+    def __init__(self, target, section: str):
+        self._target = target
+        self._section = section
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+        section = self._section
+
+        if iscoroutinefunction(attribute):
+            async def timed(*args, **kwargs):
+                with profiled_section(section):
+                    return await attribute(*args, **kwargs)
+        else:
+            def timed(*args, **kwargs):
+                with profiled_section(section):
+                    return attribute(*args, **kwargs)
+
+        return timed
+
+
+def timed_proxy(target, section: str):
+    """``target`` whose method calls count towards ``section``; ``target`` itself unless this request is profiled."""
+    if _current.get() is None:
+        return target
+    return _TimedProxy(target, section)
+
+
+def call_profiled(function, *args, **kwargs):
+    """Runs ``function`` on a worker thread under its own cProfile while the request is function-profiled."""
+    profile = _current.get()
+    if profile is None or not profile.profilers:
+        return function(*args, **kwargs)
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one profiler per process, and the request's already covers every thread.
+        return function(*args, **kwargs)
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profiler.disable()
+        profile.profilers.append(profiler)
+
+
+_statement_timer = StatementTimer("profile")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        _statement_timer.start(context)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    elapsed = _statement_timer.elapsed(context)
+    if profile is not None and elapsed is not None:
+        profile.add_statement(conn, statement, parameters, elapsed, executemany)
+
+
+def _top_functions(profilers: list, limit: int) -> Optional[list]:
+    import pstats
+
+    stats = None
+    for profiler in profilers:
+        try:
+            if stats is None:
+                stats = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+        except TypeError:
+            # A profiler that saw no calls has nothing to add.
+            continue
+    if stats is None:
+        return None
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in functions
+    ]
+
+
+def _breakdown(profile: RequestProfile, total: float) -> dict:
+    """Milliseconds per layer; each layer excludes the ones nested in it (SQL runs inside repository calls)."""
+    sections = profile.sections
+    sql = sum(statement[2] for statement in profile.statements)
+    repository = sections.get("repository", 0.0)
+    service = sections.get("service", 0.0)
+    measured = sections.get("auth", 0.0) + service + sections.get("serialization", 0.0)
+    seconds = {
+        "auth": sections.get("auth", 0.0),
+        "service": max(service - repository, 0.0),
+        "repository": max(repository - sql, 0.0),
+        "sql": sql,
+        "serialization": sections.get("serialization", 0.0),
+        "other": max(total - measured, 0.0),
+    }
+    return {layer: round(value * 1000, 3) for layer, value in seconds.items()}
+
+
+class SlowRequestLog:
+    """Appends profiled requests to a rotating JSON Lines file.
+
+    A background thread fetches query plans and writes the entries, so the request that was
+    profiled does not wait for either. Parameter values are only used to fetch plans; they hold
+    patient data and are never written. ``dropped`` counts entries lost to a full queue.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, explain_engine: Engine):
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                            encoding="utf-8", delay=True)
+        self._engine = explain_engine
+        self._queue = queue.Queue(MAX_QUEUED_ENTRIES)
+        self._thread = None
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+
+    def submit(self, entry: dict, profile: RequestProfile):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="slow-request-log", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((entry, profile))
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Writes what is still queued and closes the file."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._handler.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self.write(*item)
+            except Exception:
+                logger.exception("Could not write the slow request log entry")
+
+    def write(self, entry: dict, profile: RequestProfile):
+        plans = self._query_plans(profile.statements)
+        entry["statements"] = [
+            {
+                "sql": statement,
+                "duration_ms": round(seconds * 1000, 3),
+                "executemany": executemany,
+                "plan": plans.get(statement),
+            }
+            for statement, _, seconds, executemany, _ in profile.statements
+        ]
+        entry["statements_dropped"] = profile.statements_dropped
+        entry["entries_dropped"] = self.dropped
+        entry["profile"] = _top_functions(profile.profilers, settings.PROFILING_TOP_FUNCTIONS)
+        self._handler.handle(logging.makeLogRecord({"msg": json.dumps(entry, default=str)}))
+
+    def _query_plans(self, statements: list) -> dict:
+        prefix = EXPLAIN_PREFIXES.get(self._engine.dialect.name)
+        pending = {}
+        for statement, parameters, _, _, paramstyle in statements:
+            keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+            if (prefix and keyword in EXPLAINABLE and paramstyle == self._engine.dialect.paramstyle
+                    and statement not in pending):
+                pending[statement] = parameters
+
+        plans = {}
+        if not pending:
+            return plans
+        with self._engine.connect() as connection:
+            for statement, parameters in pending.items():
+                try:
+                    rows = connection.exec_driver_sql(f"{prefix} {statement}", parameters or ()).fetchall()
+                    plans[statement] = [str(row[-1]) for row in rows]
+                except Exception as exc:
+                    plans[statement] = [f"unavailable: {exc.__class__.__name__}"]
+                connection.rollback()
+        return plans
+
+
+slow_request_log: Optional[SlowRequestLog] = None
+
+
+def _profile_reason(scope) -> Optional[str]:
+    token = settings.PROFILING_HEADER_TOKEN
+    if token:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                if hmac.compare_digest(value, token.encode()):
+                    return "header"
+                break
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles requests asking for it (``X-Profile``) or sampled at random.
+
+    Unprofiled requests only pay for the sampling decision. A profiled request gets an
+    ``X-Profile-Id`` response header, and its entry is written to the slow request log when it
+    asked for it or took longer than ``SLOW_REQUEST_THRESHOLD_MS``. cProfile runs on the event loop
+    thread, so work of other requests running at the same time shows up in the function profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        reason = _profile_reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile = RequestProfile()
+        profiler = self._start_profiler(profile)
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                _profiler_lock.release()
+
+            duration_ms = elapsed * 1000
+            if reason == "header" or duration_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                route = scope.get("route")
+                slow_request_log.submit({
+                    "id": profile_id,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "reason": reason,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route.path if route is not None else None,
+                    "status": status,
+                    "duration_ms": round(duration_ms, 3),
+                    "breakdown_ms": _breakdown(profile, elapsed),
+                }, profile)
+
+    @staticmethod
+    def _start_profiler(profile: RequestProfile):
+        if not _profiler_lock.acquire(blocking=False):
+            return None
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another tool (a debugger or coverage run) already owns the profiling hook.
+            _profiler_lock.release()
+            return None
+        profile.profilers.append(profiler)
+        return profiler
+
+
+def setup_profiling(app: FastAPI, explain_engine: Engine, *engines: Engine):
+    """Installs the middleware and statement hooks on ``explain_engine`` and ``engines``.
+
+    Query plans are fetched over ``explain_engine``, which must be a sync engine.
+    """
+    global slow_request_log
+    slow_request_log = SlowRequestLog(
+        settings.SLOW_REQUEST_LOG_PATH, settings.SLOW_REQUEST_LOG_MAX_BYTES,
+        settings.SLOW_REQUEST_LOG_BACKUP_COUNT, explain_engine,
+    )
+    for engine in (explain_engine, *engines):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_middleware(ProfilingMiddleware)
+
+
+def stop_profiling():
+    if slow_request_log is not None:
+        slow_request_log.stop()
@@ -0,0 +1,221 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import Optional
+
+from src.config.settings import settings
+from src.models.patient import Patient
+
+PATIENT_FIELDS = ("name", "birth_date", "health_conditions", "gender", "address", "id", "version")
+
+# Written over a patient's entry by every write. Reads only ``add``, which never replaces an entry,
+# so a read that loaded the row before the write committed cannot cache it afterwards. After
+# WRITE_TOMBSTONE_SECONDS, far longer than a primary-key read takes, reads cache the patient again.
+WRITE_TOMBSTONE = b"-"
+WRITE_TOMBSTONE_SECONDS = 5
+
+
+# Part of every key; bump it whenever PATIENT_FIELDS changes. Entries in the old format (such as
+# those written before ``version`` existed, which would load with version None and an ETag of
+# "None") are then never read again and expire on their TTL.
+PATIENT_CACHE_FORMAT = 2
+
+
+def patient_cache_key(patient_id: int) -> str:
+    return f"patient:v{PATIENT_CACHE_FORMAT}:{patient_id}"
+
+
+def dump_patient(patient: Patient) -> bytes:
+    data = {field: getattr(patient, field) for field in PATIENT_FIELDS}
+    return json.dumps(data, default=str, separators=(",", ":")).encode()
+
+
+def load_patient(raw: bytes) -> Patient:
+    """Rebuilds a detached Patient from ``dump_patient`` output; it is never added to a session."""
+    data = json.loads(raw)
+    if data["birth_date"] is not None:
+        data["birth_date"] = date.fromisoformat(data["birth_date"])
+    return Patient(**data)
+
+
+def patient_etag(patient: Patient) -> str:
+    # Derived from the version alone, so If-Match can be checked by the UPDATE itself, without a read.
+    return f'"{patient.version}"'
+
+
+def etag_version(etag: str) -> Optional[int]:
+    """The version a strong ETag from ``patient_etag`` names, or None if ``etag`` is not one of ours."""
+    etag = etag.strip()
+    if len(etag) < 3 or etag[0] != '"' or etag[-1] != '"' or not etag[1:-1].isdigit():
+        return None
+    return int(etag[1:-1])
+
+
+def none_match(if_none_match: str, etag: str) -> bool:
+    """Whether ``If-None-Match`` matches ``etag``: ``*`` matches any patient, and the weak comparison
+    it calls for lets ``W/"n"`` match ``"n"``."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MemoryCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = Lock()
+
+    def _live_entry(self, key: str) -> Optional[tuple[float, bytes]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        return entry
+
+    def _store(self, key: str, value: bytes, ttl_seconds: float):
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live_entry(key)
+            value = entry[1] if entry is not None and entry[1] != WRITE_TOMBSTONE else None
+            if value is not None:
+                self._entries.move_to_end(key)
+            self.stats.record(value is not None)
+            return value
+
+    def add(self, key: str, value: bytes):
+        """Caches ``value`` unless ``key`` already has an entry, a write's tombstone included."""
+        with self._lock:
+            if self._live_entry(key) is None:
+                self._store(key, value, self.ttl_seconds)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._store(key, WRITE_TOMBSTONE, WRITE_TOMBSTONE_SECONDS)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        return self.get(key)
+
+    async def aadd(self, key: str, value: bytes):
+        self.add(key, value)
+
+    async def ainvalidate(self, key: str):
+        self.invalidate(key)
+
+    def info(self) -> dict:
+        return {"backend": "memory", "size": len(self._entries), "max_size": self.max_size, **self.stats.as_dict()}
+
+
+class RedisCache:
+    """Cache on any Redis-protocol server; entries expire after ``ttl_seconds`` and the server's
+    ``maxmemory-policy`` (e.g. ``allkeys-lru``) handles size-based eviction."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        import redis
+        import redis.asyncio
+
+        self.stats = CacheStats()
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+
+    def _value(self, value: Optional[bytes]) -> Optional[bytes]:
+        if value == WRITE_TOMBSTONE:
+            value = None
+        self.stats.record(value is not None)
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._value(self._client.get(key))
+
+    def add(self, key: str, value: bytes):
+        """``SET NX``: never replaces an entry, a write's tombstone included."""
+        self._client.set(key, value, ex=self.ttl_seconds, nx=True)
+
+    def invalidate(self, key: str):
+        self._client.set(key, WRITE_TOMBSTONE, ex=WRITE_TOMBSTONE_SECONDS)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        return self._value(await self._async_client.get(key))
+
+    async def aadd(self, key: str, value: bytes):
+        await self._async_client.set(key, value, ex=self.ttl_seconds, nx=True)
+
+    async def ainvalidate(self, key: str):
+        await self._async_client.set(key, WRITE_TOMBSTONE, ex=WRITE_TOMBSTONE_SECONDS)
+
+    def info(self) -> dict:
+        return {"backend": "redis", **self.stats.as_dict()}
+
+
+class NullCache:
+    """Used when caching is disabled: every lookup misses and writes are dropped."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def add(self, key: str, value: bytes):
+        pass
+
+    def invalidate(self, key: str):
+        pass
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def aadd(self, key: str, value: bytes):
+        pass
+
+    async def ainvalidate(self, key: str):
+        pass
+
+    def info(self) -> dict:
+        return {"backend": "none"}
+
+
+def create_patient_cache(backend: str, max_size: int, ttl_seconds: int, redis_url: str):
+    if backend == "memory":
+        return MemoryCache(max_size, ttl_seconds)
+    if backend == "redis":
+        return RedisCache(redis_url, ttl_seconds)
+    return NullCache()
+
+
+patient_cache = create_patient_cache(
+    settings.PATIENT_CACHE_BACKEND,
+    settings.PATIENT_CACHE_SIZE,
+    settings.PATIENT_CACHE_TTL_SECONDS,
+    settings.REDIS_URL,
+)
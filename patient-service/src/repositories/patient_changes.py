@@ -0,0 +1,56 @@
+import importlib
+
+from sqlalchemy import func, select, text
+from src.models.patient import Patient
+from src.models.patient_change import PatientChange
+
+# Held until commit on PostgreSQL so change rows become visible in seq order; see change_log_writes.
+CHANGE_FEED_LOCK_KEY = 0x70617463  # "patc"
+_CHANGE_FEED_LOCK = text("SELECT pg_advisory_xact_lock(:key)")
+
+
+def _record_change(dialect_name: str):
+    if dialect_name == "sqlite":
+        # REPLACE deletes the patient's previous row and inserts a new one with the next seq.
+        return importlib.import_module("sqlalchemy.dialects.sqlite").insert(PatientChange).prefix_with("OR REPLACE")
+    if dialect_name == "postgresql":
+        insert = importlib.import_module("sqlalchemy.dialects.postgresql").insert(PatientChange)
+        return insert.on_conflict_do_update(
+            index_elements=[PatientChange.patient_id],
+            set_={"seq": func.nextval("patient_changes_seq_seq"), "deleted": insert.excluded.deleted},
+        )
+    raise KeyError(dialect_name)
+
+
+def change_log_writes(dialect_name: str, patient_ids: list, deleted: bool = False) -> list:
+    """Executemany statement moving each of ``patient_ids`` to the head of the change feed.
+
+    A reader that has seen seq N must never later find a row below N. SQLite runs one writer at a
+    time, so that holds there already. PostgreSQL writers take a transaction-level advisory lock
+    first, so their sequence values are handed out in commit order. Run these writes last in the
+    transaction, to keep that lock short.
+    """
+    if not patient_ids:
+        return []
+
+    writes = []
+    if dialect_name == "postgresql":
+        writes.append((_CHANGE_FEED_LOCK, {"key": CHANGE_FEED_LOCK_KEY}))
+    writes.append((_record_change(dialect_name), [
+        {"patient_id": patient_id, "deleted": deleted} for patient_id in patient_ids
+    ]))
+    return writes
+
+
+def changes_since_query(since: int, limit: int):
+    """Change rows after ``since`` in seq order, each with the patient's current columns (NULL for tombstones)."""
+    return (
+        select(
+            PatientChange.seq, PatientChange.patient_id, PatientChange.deleted,
+            Patient.name, Patient.birth_date, Patient.health_conditions, Patient.gender, Patient.address,
+        )
+        .outerjoin(Patient, Patient.id == PatientChange.patient_id)
+        .filter(PatientChange.seq > since)
+        .order_by(PatientChange.seq)
+        .limit(limit)
+    )
@@ -1,59 +1,412 @@
+from sqlalchemy import delete, insert, select, tuple_, update, Select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.models.patient import Patient
+from src.repositories.patient_changes import change_log_writes, changes_since_query
+from src.repositories.patient_cache import dump_patient, load_patient, patient_cache, patient_cache_key
+from src.repositories.patient_search import SEARCH_COLUMNS, apply_search, search_index_inserts, search_index_writes
+from src.repositories.patient_summary import (
+    SUMMARY_SOURCE_COLUMNS,
+    patient_stats_query,
+    summary_increments,
+    summary_move,
+)
 from src.schemas.patient import PatientCreate
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Iterator, Optional, Dict, Any
+
+
+def build_patients_query(
+        name: Optional[str] = None,
+        birth_date: Optional[str] = None,
+        health_conditions: Optional[str] = None,
+        address: Optional[str] = None
+) -> Select:
+    query = select(Patient)
+
+    if name:
+        query = query.filter(Patient.name.ilike(f"%{name}%"))
+    if birth_date:
+        query = query.filter(Patient.birth_date == birth_date)
+    if health_conditions:
+        query = query.filter(Patient.health_conditions.ilike(f"%{health_conditions}%"))
+    if address:
+        query = query.filter(Patient.address.ilike(f"%{address}%"))
+
+    return query
+
+
+PATIENT_SORT_KEYS = {
+    "id": (Patient.id,),
+    "name": (Patient.name, Patient.id),
+}
+
+
+def paginate_patients_query(
+        query: Select,
+        skip: int = 0,
+        limit: int = 10,
+        order_by: str = "id",
+        after: Optional[tuple] = None
+) -> Select:
+    """Orders on the sort key; with ``after`` it seeks past that key instead of using OFFSET."""
+    sort_key = PATIENT_SORT_KEYS[order_by]
+
+    if after is not None:
+        if len(sort_key) == 1:
+            query = query.filter(sort_key[0] > after[0])
+        else:
+            query = query.filter(tuple_(*sort_key) > tuple_(*after))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(*sort_key).limit(limit)
+
+
+def patients_page_query(
+        dialect_name: str,
+        skip: int = 0,
+        limit: int = 10,
+        name: Optional[str] = None,
+        birth_date: Optional[str] = None,
+        health_conditions: Optional[str] = None,
+        address: Optional[str] = None,
+        order_by: str = "id",
+        after: Optional[tuple] = None,
+        search: Optional[str] = None
+) -> Select:
+    query = build_patients_query(name, birth_date, health_conditions, address)
+    if search:
+        return apply_search(query, dialect_name, search).offset(skip).limit(limit)
+    return paginate_patients_query(query, skip, limit, order_by, after)
+
+
+# Column-only select for exports and list pages, in the same order as the Patient response schema.
+EXPORT_COLUMNS = (Patient.name, Patient.birth_date, Patient.health_conditions, Patient.gender, Patient.address, Patient.id)
+
+
+def export_patients_query(
+        dialect_name: str,
+        name: Optional[str] = None,
+        birth_date: Optional[str] = None,
+        health_conditions: Optional[str] = None,
+        address: Optional[str] = None,
+        search: Optional[str] = None,
+        batch_size: int = 1000
+) -> Select:
+    query = build_patients_query(name, birth_date, health_conditions, address)
+    query = apply_search(query, dialect_name, search) if search else query.order_by(Patient.id)
+    return query.with_only_columns(*EXPORT_COLUMNS).execution_options(yield_per=batch_size)
+
+
+# Keeps each IN list well under SQLite's bound-parameter limit.
+ID_LOOKUP_CHUNK_SIZE = 500
+
+
+def patients_by_ids_queries(ids: list[int]) -> Iterator[Select]:
+    unique_ids = list(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), ID_LOOKUP_CHUNK_SIZE):
+        yield select(Patient).filter(Patient.id.in_(unique_ids[start:start + ID_LOOKUP_CHUNK_SIZE]))
+
+
+def existing_patient_keys_query(keys: list[tuple]) -> Select:
+    return select(Patient.name, Patient.birth_date).filter(tuple_(Patient.name, Patient.birth_date).in_(keys))
+
+
+def insert_patients_statement():
+    return insert(Patient).returning(Patient.id, sort_by_parameter_order=True)
+
+
+# Single-statement writes: RETURNING hands back the row, so no SELECT before or after is needed.
+def insert_patient_statement():
+    return insert(Patient).returning(Patient)
+
+
+class PatientVersionConflict(Exception):
+    """The patient exists, but no longer has the version the caller expected."""
+
+
+def _matching_patient(patient_id: int, expected_version: Optional[int]):
+    condition = Patient.id == patient_id
+    if expected_version is not None:
+        condition &= Patient.version == expected_version
+    return condition
+
+
+def update_patient_statement(patient_id: int, values: Dict[str, Any], expected_version: Optional[int] = None):
+    """Writes ``values`` and bumps the version; with ``expected_version`` it only matches that version."""
+    return (
+        update(Patient).where(_matching_patient(patient_id, expected_version))
+        .values(**values, version=Patient.version + 1).returning(Patient)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_patient_statement(patient_id: int, expected_version: Optional[int] = None):
+    return (
+        delete(Patient).where(_matching_patient(patient_id, expected_version)).returning(Patient)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def patient_exists_query(patient_id: int) -> Select:
+    return select(Patient.id).where(Patient.id == patient_id)
 
 
 class PatientRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache=patient_cache):
         self.db = db
+        self.cache = cache
+        self.dialect_name = db.get_bind().dialect.name
+
+    def _execute_writes(self, writes: list):
+        for statement, params in writes:
+            self.db.execute(statement, params)
+
+    def _sync_search_index(self, patient_id: int, patient: Optional[Patient] = None):
+        self._execute_writes(search_index_writes(self.dialect_name, patient_id, patient))
 
     def get_patient_by_id(self, patient_id: int):
-        return self.db.query(Patient).filter(Patient.id == patient_id).first()
+        cached = self.cache.get(patient_cache_key(patient_id))
+        if cached is not None:
+            return load_patient(cached)
 
-    def create_patient(self, patient: PatientCreate):
-        db_patient = Patient(**patient.dict())
-        self.db.add(db_patient)
+        db_patient = self.db.get(Patient, patient_id)
+        if db_patient:
+            self.cache.add(patient_cache_key(patient_id), dump_patient(db_patient))
+        return db_patient
+
+    def _commit_detached(self, db_patient: Patient) -> Patient:
+        # Detached objects are not expired by the commit, so serializing them needs no reload.
+        self.db.expunge(db_patient)
         self.db.commit()
-        self.db.refresh(db_patient)
         return db_patient
 
-    def update_patient(self, patient_id: int, patient_data: PatientCreate):
-        db_patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
-        if db_patient:
-            for key, value in patient_data.dict().items():
-                setattr(db_patient, key, value)
-            self.db.commit()
-            self.db.refresh(db_patient)
-            return db_patient
+    def get_patients_by_ids(self, ids: list[int]) -> Dict[int, Patient]:
+        """Found patients keyed by id, one IN query per chunk of ``ids``."""
+        return {
+            patient.id: patient
+            for query in patients_by_ids_queries(ids)
+            for patient in self.db.scalars(query)
+        }
+
+    def create_patient(self, patient: PatientCreate):
+        values = patient.model_dump()
+        db_patient = self.db.scalars(insert_patient_statement(), [values]).one()
+        self._execute_writes(search_index_inserts(self.dialect_name, [{"id": db_patient.id, **values}]))
+        self._execute_writes(summary_increments(self.dialect_name, [values]))
+        self._execute_writes(change_log_writes(self.dialect_name, [db_patient.id]))
+        return self._commit_detached(db_patient)
+
+    def get_existing_patient_keys(self, keys: list[tuple]) -> set:
+        if not keys:
+            return set()
+        return {tuple(row) for row in self.db.execute(existing_patient_keys_query(keys))}
+
+    def create_patients(self, patients: list[PatientCreate]) -> int:
+        """Inserts the whole batch in one transaction with a single multi-row INSERT."""
+        values = [patient.model_dump() for patient in patients]
+        ids = self.db.scalars(insert_patients_statement(), values).all()
+        self._execute_writes(search_index_inserts(
+            self.dialect_name, [{"id": patient_id, **row} for patient_id, row in zip(ids, values)]))
+        self._execute_writes(summary_increments(self.dialect_name, values))
+        self._execute_writes(change_log_writes(self.dialect_name, ids))
+        self.db.commit()
+        return len(ids)
+
+    def _missed_write(self, patient_id: int, expected_version: Optional[int]):
+        """None when a conditional write matched no row because the patient is gone; a conflict otherwise."""
+        self.db.rollback()
+        if expected_version is not None and self.db.scalar(patient_exists_query(patient_id)) is not None:
+            raise PatientVersionConflict(patient_id)
         return None
 
-    def delete_patient_by_id(self, patient_id: int):
-        db_patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
+    def update_patient(self, patient_id: int, values: Dict[str, Any], expected_version: Optional[int] = None):
+        """Writes only the columns in ``values``; returns None when the patient does not exist.
+
+        With ``expected_version`` the write is one conditional UPDATE, and PatientVersionConflict is
+        raised when another writer got there first.
+        """
+        if values.keys() & set(SUMMARY_SOURCE_COLUMNS):
+            self._execute_writes(summary_move(self.dialect_name, patient_id, values))
+        db_patient = self.db.scalars(update_patient_statement(patient_id, values, expected_version)).one_or_none()
+        if db_patient is None:
+            return self._missed_write(patient_id, expected_version)
+        if values.keys() & set(SEARCH_COLUMNS):
+            self._sync_search_index(patient_id, db_patient)
+        self._execute_writes(change_log_writes(self.dialect_name, [patient_id]))
+        self._commit_detached(db_patient)
+        self.cache.invalidate(patient_cache_key(patient_id))
+        return db_patient
+
+    def delete_patient_by_id(self, patient_id: int, expected_version: Optional[int] = None):
+        db_patient = self.db.scalars(delete_patient_statement(patient_id, expected_version)).one_or_none()
+        if db_patient is None:
+            return self._missed_write(patient_id, expected_version)
+        self._sync_search_index(patient_id)
+        self._execute_writes(summary_increments(self.dialect_name, [db_patient], sign=-1))
+        self._execute_writes(change_log_writes(self.dialect_name, [patient_id], deleted=True))
+        self._commit_detached(db_patient)
+        self.cache.invalidate(patient_cache_key(patient_id))
+        return db_patient
+
+    def get_patients(
+            self,
+            skip: int = 0,
+            limit: int = 10,
+            name: Optional[str] = None,
+            birth_date: Optional[str] = None,
+            health_conditions: Optional[str] = None,
+            address: Optional[str] = None,
+            order_by: str = "id",
+            after: Optional[tuple] = None,
+            search: Optional[str] = None
+    ):
+        query = patients_page_query(
+            self.dialect_name, skip, limit, name, birth_date, health_conditions, address, order_by, after, search
+        )
+        return self.db.scalars(query).all()
+
+    def get_patient_rows(self, **page) -> list:
+        """``get_patients`` as plain EXPORT_COLUMNS rows, skipping ORM object construction."""
+        query = patients_page_query(self.dialect_name, **page).with_only_columns(*EXPORT_COLUMNS)
+        return self.db.execute(query).all()
+
+    def get_patient_stats(self) -> list:
+        return self.db.execute(patient_stats_query()).all()
+
+    def get_changes(self, since: int, limit: int) -> list:
+        return self.db.execute(changes_since_query(since, limit)).all()
+
+    def stream_patients(self, batch_size: int = 1000, **filters) -> Iterator[list]:
+        """Yields plain row tuples ``batch_size`` at a time from a streaming cursor, never building ORM objects."""
+        result = self.db.execute(export_patients_query(self.dialect_name, batch_size=batch_size, **filters))
+        yield from result.partitions()
+
+
+
+class AsyncPatientRepository:
+    def __init__(self, db: AsyncSession, cache=patient_cache):
+        self.db = db
+        self.cache = cache
+        self.dialect_name = db.get_bind().dialect.name
+
+    async def _execute_writes(self, writes: list):
+        for statement, params in writes:
+            await self.db.execute(statement, params)
+
+    async def _sync_search_index(self, patient_id: int, patient: Optional[Patient] = None):
+        await self._execute_writes(search_index_writes(self.dialect_name, patient_id, patient))
+
+    async def get_patient_by_id(self, patient_id: int):
+        cached = await self.cache.aget(patient_cache_key(patient_id))
+        if cached is not None:
+            return load_patient(cached)
+
+        db_patient = await self.db.get(Patient, patient_id)
         if db_patient:
-            self.db.delete(db_patient)
-            self.db.commit()
-            return db_patient
+            await self.cache.aadd(patient_cache_key(patient_id), dump_patient(db_patient))
+        return db_patient
+
+    async def _commit_detached(self, db_patient: Patient) -> Patient:
+        self.db.expunge(db_patient)
+        await self.db.commit()
+        return db_patient
+
+    async def get_patients_by_ids(self, ids: list[int]) -> Dict[int, Patient]:
+        """Found patients keyed by id, one IN query per chunk of ``ids``."""
+        found = {}
+        for query in patients_by_ids_queries(ids):
+            for patient in await self.db.scalars(query):
+                found[patient.id] = patient
+        return found
+
+    async def create_patient(self, patient: PatientCreate):
+        values = patient.model_dump()
+        db_patient = (await self.db.scalars(insert_patient_statement(), [values])).one()
+        await self._execute_writes(search_index_inserts(self.dialect_name, [{"id": db_patient.id, **values}]))
+        await self._execute_writes(summary_increments(self.dialect_name, [values]))
+        await self._execute_writes(change_log_writes(self.dialect_name, [db_patient.id]))
+        return await self._commit_detached(db_patient)
+
+    async def get_existing_patient_keys(self, keys: list[tuple]) -> set:
+        if not keys:
+            return set()
+        return {tuple(row) for row in await self.db.execute(existing_patient_keys_query(keys))}
+
+    async def create_patients(self, patients: list[PatientCreate]) -> int:
+        """Inserts the whole batch in one transaction with a single multi-row INSERT."""
+        values = [patient.model_dump() for patient in patients]
+        ids = (await self.db.scalars(insert_patients_statement(), values)).all()
+        await self._execute_writes(search_index_inserts(
+            self.dialect_name, [{"id": patient_id, **row} for patient_id, row in zip(ids, values)]))
+        await self._execute_writes(summary_increments(self.dialect_name, values))
+        await self._execute_writes(change_log_writes(self.dialect_name, ids))
+        await self.db.commit()
+        return len(ids)
+
+    async def _missed_write(self, patient_id: int, expected_version: Optional[int]):
+        await self.db.rollback()
+        if expected_version is not None and await self.db.scalar(patient_exists_query(patient_id)) is not None:
+            raise PatientVersionConflict(patient_id)
         return None
 
-    def get_patients(
+    async def update_patient(self, patient_id: int, values: Dict[str, Any], expected_version: Optional[int] = None):
+        """Writes only the columns in ``values``; returns None when the patient does not exist."""
+        if values.keys() & set(SUMMARY_SOURCE_COLUMNS):
+            await self._execute_writes(summary_move(self.dialect_name, patient_id, values))
+        db_patient = (await self.db.scalars(
+            update_patient_statement(patient_id, values, expected_version))).one_or_none()
+        if db_patient is None:
+            return await self._missed_write(patient_id, expected_version)
+        if values.keys() & set(SEARCH_COLUMNS):
+            await self._sync_search_index(patient_id, db_patient)
+        await self._execute_writes(change_log_writes(self.dialect_name, [patient_id]))
+        await self._commit_detached(db_patient)
+        await self.cache.ainvalidate(patient_cache_key(patient_id))
+        return db_patient
+
+    async def delete_patient_by_id(self, patient_id: int, expected_version: Optional[int] = None):
+        db_patient = (await self.db.scalars(delete_patient_statement(patient_id, expected_version))).one_or_none()
+        if db_patient is None:
+            return await self._missed_write(patient_id, expected_version)
+        await self._sync_search_index(patient_id)
+        await self._execute_writes(summary_increments(self.dialect_name, [db_patient], sign=-1))
+        await self._execute_writes(change_log_writes(self.dialect_name, [patient_id], deleted=True))
+        await self._commit_detached(db_patient)
+        await self.cache.ainvalidate(patient_cache_key(patient_id))
+        return db_patient
+
+    async def get_patients(
             self,
             skip: int = 0,
             limit: int = 10,
             name: Optional[str] = None,
             birth_date: Optional[str] = None,
             health_conditions: Optional[str] = None,
-            address: Optional[str] = None
+            address: Optional[str] = None,
+            order_by: str = "id",
+            after: Optional[tuple] = None,
+            search: Optional[str] = None
     ):
-        query = self.db.query(Patient)
-
-        if name:
-            query = query.filter(Patient.name.ilike(f"%{name}%"))
-        if birth_date:
-            query = query.filter(Patient.birth_date == birth_date)
-        if health_conditions:
-            query = query.filter(Patient.health_conditions.ilike(f"%{health_conditions}%"))
-        if address:
-            query = query.filter(Patient.address.ilike(f"%{address}%"))
-
-        return query.offset(skip).limit(limit).all()
+        query = patients_page_query(
+            self.dialect_name, skip, limit, name, birth_date, health_conditions, address, order_by, after, search
+        )
+        result = await self.db.scalars(query)
+        return result.all()
+
+    async def get_patient_rows(self, **page) -> list:
+        """``get_patients`` as plain EXPORT_COLUMNS rows, skipping ORM object construction."""
+        query = patients_page_query(self.dialect_name, **page).with_only_columns(*EXPORT_COLUMNS)
+        return (await self.db.execute(query)).all()
+
+    async def get_patient_stats(self) -> list:
+        return (await self.db.execute(patient_stats_query())).all()
+
+    async def get_changes(self, since: int, limit: int) -> list:
+        return (await self.db.execute(changes_since_query(since, limit))).all()
+
+    async def stream_patients(self, batch_size: int = 1000, **filters) -> AsyncIterator[list]:
+        """Yields plain row tuples ``batch_size`` at a time from a streaming cursor, never building ORM objects."""
+        result = await self.db.stream(export_patients_query(self.dialect_name, batch_size=batch_size, **filters))
+        async for partition in result.partitions():
+            yield partition
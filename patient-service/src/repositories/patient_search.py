@@ -0,0 +1,111 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Select, func, literal, literal_column, or_, text, table, column
+from sqlalchemy.engine import Engine
+from src.models.patient import Patient
+
+PATIENTS_FTS = "patients_fts"
+SEARCH_COLUMNS = ("name", "address", "health_conditions")
+
+_patients_fts = table(PATIENTS_FTS, column("rowid"))
+
+_FTS_DELETE = text(f"DELETE FROM {PATIENTS_FTS} WHERE rowid = :id")
+_FTS_INSERT = text(
+    f"INSERT INTO {PATIENTS_FTS} (rowid, name, address, health_conditions) "
+    "VALUES (:id, :name, :address, :health_conditions)"
+)
+# FTS5 resolves the rowid conflict itself, so an updated patient's row is rewritten in one statement.
+_FTS_REPLACE = text(
+    f"INSERT OR REPLACE INTO {PATIENTS_FTS} (rowid, name, address, health_conditions) "
+    "VALUES (:id, :name, :address, :health_conditions)"
+)
+
+# Concatenation the pg_trgm GIN index is built on; queries must use the identical expression.
+_PG_SEARCH_EXPRESSION = "(coalesce(name, '') || ' ' || coalesce(address, '') || ' ' || coalesce(health_conditions, ''))"
+
+
+def create_search_index(engine: Engine):
+    """Creates the dialect's search index: an FTS5 table on SQLite, a pg_trgm GIN index on PostgreSQL."""
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": PATIENTS_FTS}
+            ).first()
+            if exists:
+                return
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE {PATIENTS_FTS} USING fts5("
+                f"{', '.join(SEARCH_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            connection.execute(text(
+                f"INSERT INTO {PATIENTS_FTS} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                f"SELECT id, {', '.join(SEARCH_COLUMNS)} FROM patients"
+            ))
+        elif engine.dialect.name == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_patients_search_trgm ON patients "
+                f"USING gin ({_PG_SEARCH_EXPRESSION} gin_trgm_ops)"
+            ))
+
+
+def search_index_writes(dialect_name: str, patient_id: int, patient: Optional[Patient] = None) -> list:
+    """Statements that bring the FTS5 row for ``patient_id`` in line with ``patient`` (None removes it).
+
+    Only SQLite keeps a separate table; the PostgreSQL GIN index is maintained by the database.
+    """
+    if dialect_name != "sqlite":
+        return []
+
+    if patient is None:
+        return [(_FTS_DELETE, {"id": patient_id})]
+    return [(_FTS_REPLACE, {
+        "id": patient_id,
+        "name": patient.name,
+        "address": patient.address,
+        "health_conditions": patient.health_conditions,
+    })]
+
+
+def search_index_inserts(dialect_name: str, patients: list) -> list:
+    """Executemany form of ``search_index_writes`` for freshly inserted patients (dicts that carry their ``id``)."""
+    if dialect_name != "sqlite" or not patients:
+        return []
+
+    return [(_FTS_INSERT, [
+        {"id": patient["id"], **{field: patient[field] for field in SEARCH_COLUMNS}}
+        for patient in patients
+    ])]
+
+
+def _fts_match_expression(search: str) -> str:
+    # Every word must match as a prefix; quoting keeps FTS5 operators in user input literal.
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search))
+
+
+def apply_search(query: Select, dialect_name: str, search: str) -> Select:
+    """Restricts ``query`` to patients matching ``search`` and orders them by relevance."""
+    if dialect_name == "sqlite":
+        match = _fts_match_expression(search)
+        if not match:
+            return query.filter(literal(False))
+        return (
+            query.join(_patients_fts, _patients_fts.c.rowid == Patient.id)
+            .filter(literal_column(PATIENTS_FTS).op("MATCH")(match))
+            .order_by(func.bm25(literal_column(PATIENTS_FTS)), Patient.id)
+        )
+
+    if dialect_name == "postgresql":
+        document = literal_column(_PG_SEARCH_EXPRESSION)
+        return (
+            query.filter(literal(search).op("<%")(document))
+            .order_by(func.word_similarity(search, document).desc(), Patient.id)
+        )
+
+    pattern = f"%{search}%"
+    return query.filter(or_(
+        Patient.name.ilike(pattern),
+        Patient.address.ilike(pattern),
+        Patient.health_conditions.ilike(pattern),
+    )).order_by(Patient.id)
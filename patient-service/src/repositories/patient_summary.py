@@ -0,0 +1,95 @@
+import importlib
+from collections import Counter
+
+from sqlalchemy import Select, String, case, cast, extract, func, literal, select, union_all
+from sqlalchemy.engine import Engine
+from src.models.patient import Patient
+from src.models.patient_summary import PatientSummary
+
+SUMMARY_KEYS = ("gender", "birth_year", "health_conditions")
+# Patient columns a summary row is derived from; writes touching none of them leave the summary alone.
+SUMMARY_SOURCE_COLUMNS = ("gender", "birth_date", "health_conditions")
+
+_UPSERT_DIALECTS = ("sqlite", "postgresql")
+
+
+def _upsert(dialect_name: str, source: Select = None):
+    if dialect_name not in _UPSERT_DIALECTS:
+        raise KeyError(dialect_name)
+    # Looked up by name so a SQLite deployment never imports the PostgreSQL dialect, and vice versa.
+    insert = importlib.import_module(f"sqlalchemy.dialects.{dialect_name}").insert(PatientSummary)
+    if source is not None:
+        insert = insert.from_select([*SUMMARY_KEYS, "count"], source)
+    return insert.on_conflict_do_update(
+        index_elements=list(SUMMARY_KEYS),
+        set_={"count": PatientSummary.count + insert.excluded.count},
+    )
+
+
+def summary_increments(dialect_name: str, patients: list, sign: int = 1) -> list:
+    """Executemany upsert adding ``sign`` per patient to its summary row; ``patients`` are dicts or Patients."""
+    if not patients:
+        return []
+
+    counts = Counter()
+    for patient in patients:
+        values = patient if isinstance(patient, dict) else {key: getattr(patient, key) for key in SUMMARY_SOURCE_COLUMNS}
+        counts[(values["gender"], values["birth_date"].year, values["health_conditions"])] += sign
+    return [(_upsert(dialect_name), [dict(zip(SUMMARY_KEYS, key), count=count) for key, count in counts.items()])]
+
+
+def summary_move(dialect_name: str, patient_id: int, values: dict) -> list:
+    """One upsert moving ``patient_id`` from its stored summary row to the row ``values`` puts it in.
+
+    Run it before the patient is updated. Both sides come from the stored row, read inside the
+    upsert (and locked on PostgreSQL), so a concurrent update of the same patient cannot move the
+    old values twice. The -1 and +1 are summed per key, so a write that keeps the key adds 0.
+    """
+    stored = select(
+        Patient.gender, extract("year", Patient.birth_date).label("birth_year"), Patient.health_conditions
+    ).filter(Patient.id == patient_id).with_for_update().subquery()
+    delta = union_all(select(literal(-1).label("delta")), select(literal(1))).subquery()
+    updated = {
+        "gender": values.get("gender"),
+        "birth_year": values["birth_date"].year if "birth_date" in values else None,
+        "health_conditions": values.get("health_conditions"),
+    }
+    keys = [
+        case((delta.c.delta > 0, literal(updated[key])), else_=stored.c[key]).label(key)
+        if updated[key] is not None else stored.c[key]
+        for key in SUMMARY_KEYS
+    ]
+    moves = select(*keys, delta.c.delta).select_from(stored.join(delta, literal(True))).subquery()
+    source = select(
+        *(moves.c[key] for key in SUMMARY_KEYS), func.sum(moves.c.delta)
+    ).group_by(*(moves.c[key] for key in SUMMARY_KEYS))
+    return [(_upsert(dialect_name, source), {})]
+
+
+def backfill_patient_summary(engine: Engine):
+    """Fills an empty summary from the patients table, for databases created before it existed."""
+    with engine.begin() as connection:
+        if connection.scalar(select(PatientSummary.count).limit(1)) is not None:
+            return
+        birth_year = extract("year", Patient.birth_date)
+        source = select(Patient.gender, birth_year, Patient.health_conditions, func.count()).group_by(
+            Patient.gender, birth_year, Patient.health_conditions
+        )
+        connection.execute(PatientSummary.__table__.insert().from_select([*SUMMARY_KEYS, "count"], source))
+
+
+def patient_stats_query():
+    """(dimension, value, count) per gender, birth year and health condition, in one round trip."""
+    def by(dimension: str, column):
+        total = func.sum(PatientSummary.count)
+        return (
+            select(literal(dimension), cast(column, String), total)
+            .group_by(column)
+            .having(total > 0)
+        )
+
+    return union_all(
+        by("gender", PatientSummary.gender),
+        by("birth_year", PatientSummary.birth_year),
+        by("health_conditions", PatientSummary.health_conditions),
+    )
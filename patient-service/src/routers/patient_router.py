@@ -1,15 +1,44 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 
 from typing import Optional
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from src.auth_dependencies import oauth2_scheme
-from src.services.patient_service import PatientService
-from src.schemas.patient import PatientCreate, Patient
-from src.services.auth import validate_user
-from src.services.patient_service import get_patient_service
+from src.config.settings import settings
+from src.profiling import profiled_section
+from src.repositories.patient_cache import etag_version, none_match, patient_cache, patient_etag
+from src.schemas.patient import (
+    PatientBatchGet, PatientChanges, PatientCreate, PatientLookup, PatientStats, PatientUpdate, Patient,
+)
+from src.services.auth import token_cache, validate_user
+from src.services.patient_export import MEDIA_TYPES, ExportFormat, stream_patient_export
+from src.services.patient_import import import_patient_stream
+from src.services.pagination import PatientOrder, next_cursor
+from src.services.patient_serialization import patient_rows_json
+from src.services.patient_service import patient_read_flight, patient_service_provider
 
 router = APIRouter()
 
+PRECONDITION_FAILED_RESPONSE = {
+    "description": "Precondition failed - the patient changed since the **If-Match** ETag was read.",
+    "content": {"application/json": {"example": {
+        "detail": "The patient was changed by another request; fetch it again and retry."
+    }}},
+}
+
+
+def if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """The version an If-Match header requires; None when there is no header or it is ``*``.
+
+    If-Match compares strongly, so a weak ``W/`` tag can never match and gets the 412.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    version = etag_version(if_match)
+    if version is None:
+        raise HTTPException(status_code=412, detail="If-Match must be a single ETag returned by this API.")
+    return version
+
 
 @router.post(
     "/patients/",
@@ -18,11 +47,12 @@ router = APIRouter()
     description=(
             "This endpoint allows adding a new patient to the system. "
             "The following fields are required in the request body:\n\n"
-            "- **name**: Full name of the patient (e.g., 'John Doe').\n"
-            "- **birth_date**: Date of birth in ISO format (e.g., '1990-01-01'). Must be earlier than the current date.\n"
+            "- **name**: Full name of the patient, at least two words (e.g., 'John Doe').\n"
+            "- **birth_date**: Date of birth in ISO format (e.g., '1990-01-01'). Must not be later than today.\n"
             "- **health_conditions**: Description of the patient's health conditions (e.g., 'Hypertension').\n"
-            "- **gender**: Patient's gender ('Male' or 'Female').\n"
+            "- **gender**: Patient's gender ('Masculine' or 'Feminine', in any letter case).\n"
             "- **address**: Full address of the patient.\n\n"
+            "A field that breaks these rules is rejected with 422.\n\n"
             "A valid JWT token must be provided in the Authorization header to access this endpoint."
     ),
     responses={
@@ -36,13 +66,86 @@ router = APIRouter()
         },
     },
 )
-def add_patient(patient: PatientCreate, token: str = Depends(oauth2_scheme),
-                patient_service: PatientService = Depends(get_patient_service)):
+async def add_patient(patient: PatientCreate, token: str = Depends(oauth2_scheme),
+                      patient_service=Depends(patient_service_provider)):
     validate_user(token)
-    patient_new = patient_service.add_patient(patient)
+    patient_new = await patient_service.add_patient(patient)
     return patient_new
 
 
+@router.post(
+    "/patients/bulk",
+    summary="Import patients in bulk",
+    description=(
+            "This endpoint imports many patients from a streamed request body, one patient per line:\n\n"
+            "- **application/x-ndjson**: one JSON object per line with the same fields as *Add a new patient*.\n"
+            "- **text/csv**: a header line naming those fields, then one patient per line.\n\n"
+            "Rows are validated with the same rules as single creation and inserted in batches of **batch_size**, "
+            "each batch in its own transaction. Rows that fail validation or duplicate an existing name and date "
+            "of birth are reported by line number and skipped; the rest of the import continues.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    responses={
+        200: {
+            "description": "Import finished; failed rows are listed in **errors**.",
+            "content": {"application/json": {"example": {
+                "inserted": 2,
+                "failed": 1,
+                "errors": [{"row": 3, "detail": "The name must contain at least two words."}],
+            }}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+        415: {
+            "description": "The body is neither NDJSON nor CSV.",
+            "content": {"application/json": {"example": {
+                "detail": "Send patients as NDJSON (application/x-ndjson) or CSV (text/csv)."
+            }}},
+        },
+    },
+)
+async def bulk_import_patients(request: Request,
+                               batch_size: int = Query(settings.BULK_IMPORT_BATCH_SIZE, ge=1, le=10000),
+                               token: str = Depends(oauth2_scheme),
+                               patient_service=Depends(patient_service_provider)):
+    validate_user(token)
+    return await import_patient_stream(
+        request.stream(), request.headers.get("content-type", ""), patient_service, batch_size
+    )
+
+
+@router.post(
+    "/patients/batch-get",
+    response_model=list[PatientLookup],
+    summary="Get many patients by ID",
+    description=(
+            "Resolves up to 1000 patient IDs in one request instead of one *Get patient details* call per ID. "
+            "The response has one entry per requested ID, in the order given (repeated IDs are repeated). "
+            "Each entry carries the patient, or a null **patient** when no patient has that ID.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    responses={
+        200: {
+            "description": "Lookup results in request order.",
+            "content": {"application/json": {"example": [
+                {"id": 1, "patient": {"id": 1, "name": "John Doe"}},
+                {"id": 42, "patient": None},
+            ]}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+    },
+)
+async def batch_get_patients(request: PatientBatchGet, token: str = Depends(oauth2_scheme),
+                             patient_service=Depends(patient_service_provider)):
+    validate_user(token)
+    return await patient_service.get_patients_by_ids(request.ids)
+
+
 @router.put(
     "/patients/{patient_id}",
     response_model=Patient,
@@ -53,14 +156,23 @@ def add_patient(patient: PatientCreate, token: str = Depends(oauth2_scheme),
             "- **name**: Full name of the patient.\n"
             "- **birth_date**: Date of birth (must be earlier than the current date).\n"
             "- **health_conditions**: Patient's health conditions.\n"
-            "- **gender**: Gender ('Male' or 'Female').\n"
+            "- **gender**: Gender ('Masculine' or 'Feminine').\n"
             "- **address**: Address.\n\n"
+            "Send the patient's **ETag** in **If-Match** to update it only if nobody changed it since you read "
+            "it; otherwise the request fails with 412 and nothing is written. The response carries the new ETag.\n\n"
             "A valid JWT token must be provided in the Authorization header."
     ),
     responses={
         200: {
             "description": "Patient successfully updated.",
             "content": {"application/json": {"example": {"id": 1, "name": "John Doe"}}},
+            "headers": {"ETag": {"description": "Entity tag of the updated patient."}},
+        },
+        400: {
+            "description": "The change duplicates another patient's name and date of birth.",
+            "content": {"application/json": {"example": {
+                "detail": "There is already a patient with that name and date of birth."
+            }}},
         },
         401: {
             "description": "Unauthorized - Invalid or missing token.",
@@ -72,17 +184,70 @@ def add_patient(patient: PatientCreate, token: str = Depends(oauth2_scheme),
                 "application/json": {"example": {"detail": "Patient with id '1' not found."}}
             },
         },
+        412: PRECONDITION_FAILED_RESPONSE,
     },
 )
-def edit_patient(patient_id: int, updated_data: PatientCreate, token: str = Depends(oauth2_scheme),
-                 patient_service: PatientService = Depends(get_patient_service)):
+async def edit_patient(patient_id: int, updated_data: PatientCreate, response: Response,
+                       token: str = Depends(oauth2_scheme), if_match: Optional[str] = Header(None),
+                       patient_service=Depends(patient_service_provider)):
     validate_user(token)
-    patient_updated = patient_service.update_patient(patient_id, updated_data)
+    patient_updated = await patient_service.update_patient(patient_id, updated_data, if_match_version(if_match))
     if patient_updated is None:
         raise HTTPException(
             status_code=404,
             detail=f"Patient not found with ID {patient_id}. "
         )
+    response.headers["ETag"] = patient_etag(patient_updated)
+    return patient_updated
+
+
+@router.patch(
+    "/patients/{patient_id}",
+    response_model=Patient,
+    summary="Partially update a patient",
+    description=(
+            "This endpoint updates only the fields sent in the request body, leaving the others unchanged. "
+            "Any of **name**, **birth_date**, **health_conditions**, **gender** and **address** may be sent, "
+            "with the same rules as *Edit patient information*; the update is a single statement. "
+            "**If-Match** works as for *Edit patient information*.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    responses={
+        200: {
+            "description": "Patient successfully updated.",
+            "content": {"application/json": {"example": {"id": 1, "name": "John Doe"}}},
+            "headers": {"ETag": {"description": "Entity tag of the updated patient."}},
+        },
+        400: {
+            "description": "The change duplicates another patient's name and date of birth.",
+            "content": {"application/json": {"example": {
+                "detail": "There is already a patient with that name and date of birth."
+            }}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+        404: {
+            "description": "Patient not found.",
+            "content": {
+                "application/json": {"example": {"detail": "Patient with id '1' not found."}}
+            },
+        },
+        412: PRECONDITION_FAILED_RESPONSE,
+    },
+)
+async def patch_patient(patient_id: int, changes: PatientUpdate, response: Response,
+                        token: str = Depends(oauth2_scheme), if_match: Optional[str] = Header(None),
+                        patient_service=Depends(patient_service_provider)):
+    validate_user(token)
+    patient_updated = await patient_service.patch_patient(patient_id, changes, if_match_version(if_match))
+    if patient_updated is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Patient with id '{patient_id}' not found."
+        )
+    response.headers["ETag"] = patient_etag(patient_updated)
     return patient_updated
 
 
@@ -92,6 +257,7 @@ def edit_patient(patient_id: int, updated_data: PatientCreate, token: str = Depe
     description=(
             "This endpoint allows deleting a patient from the system. "
             "The patient is identified by the **ID** provided in the URL. "
+            "With **If-Match**, the patient is only deleted if its ETag still matches; otherwise the response is 412. "
             "Ensure that a valid JWT token is included in the Authorization header."
     ),
     responses={
@@ -109,13 +275,14 @@ def edit_patient(patient_id: int, updated_data: PatientCreate, token: str = Depe
                 "application/json": {"example": {"detail": "Patient with id '1' not found."}}
             },
         },
+        412: PRECONDITION_FAILED_RESPONSE,
     },
 )
-def remove_patient(patient_id: int, token: str = Depends(oauth2_scheme),
-                   patient_service: PatientService = Depends(get_patient_service)):
+async def remove_patient(patient_id: int, token: str = Depends(oauth2_scheme), if_match: Optional[str] = Header(None),
+                         patient_service=Depends(patient_service_provider)):
     validate_user(token)
 
-    if patient_service.delete_patient_by_id(patient_id) is None:
+    if await patient_service.delete_patient_by_id(patient_id, if_match_version(if_match)) is None:
         raise HTTPException(
             status_code=404,
             detail=f"Patient not found."
@@ -131,13 +298,23 @@ def remove_patient(patient_id: int, token: str = Depends(oauth2_scheme),
             "Retrieve a list of patients with optional filters:\n\n"
             "- **name**: Filter by patient name (case-insensitive).\n"
             "- **health_conditions**: Filter by health conditions (case-insensitive).\n"
-            "- **patient_id**: Filter by patient ID.\n\n"
-            "Supports pagination using **skip** and **limit** parameters."
+            "- **patient_id**: Filter by patient ID.\n"
+            "- **search**: Full-text search over name, address and health conditions; "
+            "results are ordered by relevance and paged with **skip** and **limit**.\n\n"
+            "Supports keyset pagination: every full page returns an opaque cursor in the **X-Next-Cursor** "
+            "header; pass it back as **cursor** (with the same **order_by**, `id` or `name`) to fetch the next page. "
+            "The legacy **skip** parameter still works but deep offsets get slower, and it is ignored when a "
+            "**cursor** is given. **limit** is between 1 and **MAX_PAGE_SIZE** (1000 by default)."
     ),
     responses={
         200: {
             "description": "List of patients retrieved successfully.",
             "content": {"application/json": {"example": [{"id": 1, "name": "John Doe"}]}},
+            "headers": {"X-Next-Cursor": {"description": "Cursor for the next page, absent on the last page."}},
+        },
+        400: {
+            "description": "The cursor is malformed or was issued for another ordering.",
+            "content": {"application/json": {"example": {"detail": "Invalid cursor for the requested ordering."}}},
         },
         401: {
             "description": "Unauthorized - Invalid or missing token.",
@@ -145,23 +322,161 @@ def remove_patient(patient_id: int, token: str = Depends(oauth2_scheme),
         },
     },
 )
-def list_patients(
-        skip: int = 0,
-        limit: int = 10,
+async def list_patients(
+        skip: int = Query(0, ge=0),
+        limit: int = Query(10, ge=1, le=settings.MAX_PAGE_SIZE),
         name: Optional[str] = None,
         birth_date: Optional[str] = None,
         health_conditions: Optional[str] = None,
         address: Optional[str] = None,
+        cursor: Optional[str] = None,
+        order_by: PatientOrder = "id",
+        search: Optional[str] = None,
         token: str = Depends(oauth2_scheme),
-        patient_service: PatientService = Depends(get_patient_service)):
+        patient_service=Depends(patient_service_provider)):
     validate_user(token)
-    return patient_service.get_patients(
+    patients = await patient_service.get_patients(
         skip=skip,
         limit=limit,
         name=name,
         birth_date=birth_date,
         health_conditions=health_conditions,
         address=address,
+        cursor=cursor,
+        order_by=order_by,
+        search=search,
+    )
+    cursor_for_next_page = None if search else next_cursor(patients, limit, order_by)
+    headers = {"X-Next-Cursor": cursor_for_next_page} if cursor_for_next_page else None
+    # Rendered here rather than through response_model, which would validate every row again.
+    with profiled_section("serialization"):
+        body = patient_rows_json(patients)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/patients/stats",
+    response_model=PatientStats,
+    summary="Patient statistics",
+    description=(
+            "Counts of patients by **gender**, **age_bands** and **health_conditions**, plus the **total**. "
+            "Age bands use the age each patient reaches in the current year.\n\n"
+            "The counts come from a summary table updated on every create, update and delete, so the cost of "
+            "this endpoint does not grow with the number of patients.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    responses={
+        200: {
+            "description": "Current statistics.",
+            "content": {"application/json": {"example": {
+                "total": 3,
+                "gender": {"Feminine": 2, "Masculine": 1},
+                "age_bands": {"0-17": 0, "18-29": 1, "30-44": 2, "45-59": 0, "60-74": 0, "75+": 0},
+                "health_conditions": {"Asthma": 1, "None": 2},
+            }}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+    },
+)
+async def patient_stats(token: str = Depends(oauth2_scheme), patient_service=Depends(patient_service_provider)):
+    validate_user(token)
+    return await patient_service.get_stats()
+
+
+@router.get(
+    "/patients/changes",
+    response_model=PatientChanges,
+    summary="Patient changes since a sequence number",
+    description=(
+            "Patients created, updated or deleted after **since**, oldest first, for keeping a copy in sync "
+            "without downloading every patient again.\n\n"
+            "Each entry carries its **seq**, the patient **id**, and either the current **patient** or "
+            "**deleted** `true` (a tombstone). A patient changed several times appears once, at its latest "
+            "**seq**. Start from `since=0`, then pass the returned **next_since** back; while **has_more** is "
+            "`true` there are more entries to fetch. At most **limit** entries are returned, capped at "
+            f"{settings.CHANGES_BATCH_SIZE}.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    responses={
+        200: {
+            "description": "The next batch of changes.",
+            "content": {"application/json": {"example": {
+                "changes": [
+                    {"seq": 41, "id": 7, "deleted": True, "patient": None},
+                    {"seq": 42, "id": 3, "deleted": False, "patient": {
+                        "id": 3, "name": "John Doe", "birth_date": "1990-01-01", "health_conditions": "None",
+                        "gender": "Masculine", "address": "Rua do Sol, 1",
+                    }},
+                ],
+                "next_since": 42,
+                "has_more": False,
+            }}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+    },
+)
+async def patient_changes(
+        since: int = Query(0, ge=0),
+        limit: int = Query(settings.CHANGES_BATCH_SIZE, ge=1),
+        token: str = Depends(oauth2_scheme),
+        patient_service=Depends(patient_service_provider)):
+    validate_user(token)
+    return await patient_service.get_changes(since, min(limit, settings.CHANGES_BATCH_SIZE))
+
+
+@router.get(
+    "/patients/export",
+    summary="Export patients",
+    description=(
+            "Streams every patient matching the filters as **ndjson** (one JSON object per line) or **csv** "
+            "(with a header line), chosen with **format**. Accepts the same **name**, **birth_date**, "
+            "**health_conditions**, **address** and **search** filters as *List patients*.\n\n"
+            "Rows are read from the database in batches while the response is being sent, so exports of any "
+            "size use the same memory.\n\n"
+            "A valid JWT token must be provided in the Authorization header."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "The export, streamed.",
+            "content": {
+                "application/x-ndjson": {"example": '{"name":"John Doe","birth_date":"1990-01-01","id":1}\n'},
+                "text/csv": {"example": "name,birth_date,health_conditions,gender,address,id\n"},
+            },
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+    },
+)
+async def export_patients(
+        export_format: ExportFormat = Query("ndjson", alias="format"),
+        name: Optional[str] = None,
+        birth_date: Optional[str] = None,
+        health_conditions: Optional[str] = None,
+        address: Optional[str] = None,
+        search: Optional[str] = None,
+        token: str = Depends(oauth2_scheme)):
+    validate_user(token)
+    return StreamingResponse(
+        stream_patient_export(
+            export_format,
+            settings.EXPORT_BATCH_SIZE,
+            name=name,
+            birth_date=birth_date,
+            health_conditions=health_conditions,
+            address=address,
+            search=search,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="patients.{export_format}"'},
     )
 
 
@@ -171,12 +486,18 @@ def list_patients(
     summary="Get patient details",
     description=(
             "This endpoint retrieves the details of a specific patient, identified by the **ID** provided in the URL. "
+            "Responses carry an **ETag**; send it back in **If-None-Match** to get an empty 304 when the patient "
+            "has not changed. "
             "A valid JWT token must be provided in the Authorization header."
     ),
     responses={
         200: {
             "description": "Patient details retrieved successfully.",
             "content": {"application/json": {"example": {"id": 1, "name": "John Doe"}}},
+            "headers": {"ETag": {"description": "Entity tag of this representation of the patient."}},
+        },
+        304: {
+            "description": "Not modified - the **If-None-Match** header matches the current ETag.",
         },
         401: {
             "description": "Unauthorized - Invalid or missing token.",
@@ -190,13 +511,50 @@ def list_patients(
         },
     },
 )
-def get_patient(patient_id: int, token: str = Depends(oauth2_scheme),
-                patient_service: PatientService = Depends(get_patient_service)):
+async def get_patient(patient_id: int, response: Response, token: str = Depends(oauth2_scheme),
+                      if_none_match: Optional[str] = Header(None),
+                      patient_service=Depends(patient_service_provider)):
     validate_user(token)
-    patient = patient_service.get_patient_by_id(patient_id)
+    patient = await patient_service.get_patient_by_id(patient_id)
     if patient is None:
         raise HTTPException(
             status_code=404,
             detail=f"Patient with id '{patient_id}' not found."
         )
+    etag = patient_etag(patient)
+    if if_none_match and none_match(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return patient
+
+
+@router.get(
+    "/cache/stats",
+    summary="Cache statistics",
+    description=(
+            "Hit/miss counters and hit ratio of the patient record cache and the JWT verification cache, and how "
+            "many patient reads were answered by an identical read already in flight (**single_flight**)."
+    ),
+    responses={
+        200: {
+            "description": "Current cache statistics.",
+            "content": {"application/json": {"example": {
+                "patients": {"backend": "memory", "size": 120, "max_size": 10000, "hits": 900, "misses": 120,
+                             "hit_ratio": 0.88},
+                "tokens": {"size": 3, "max_size": 10000, "hits": 1017, "misses": 3, "hit_ratio": 0.99},
+                "single_flight": {"executions": 40, "coalesced": 960, "coalescing_ratio": 0.96, "in_flight": 0},
+            }}},
+        },
+        401: {
+            "description": "Unauthorized - Invalid or missing token.",
+            "content": {"application/json": {"example": {"detail": "Not authenticated"}}},
+        },
+    },
+)
+async def cache_stats(token: str = Depends(oauth2_scheme)):
+    validate_user(token)
+    return {
+        "patients": patient_cache.info(),
+        "tokens": token_cache.stats(),
+        "single_flight": patient_read_flight.stats(),
+    }
@@ -1,5 +1,34 @@
-from pydantic import BaseModel
+from enum import Enum
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, StringConstraints
+from pydantic_core import PydanticCustomError
 from datetime import date
+from typing import Annotated, Dict, List, Optional
+
+
+class Gender(str, Enum):
+    MASCULINE = "Masculine"
+    FEMININE = "Feminine"
+
+    @classmethod
+    def _missing_(cls, value):
+        # Only reached when the exact lookup in pydantic-core misses: accept any letter case.
+        if isinstance(value, str):
+            return cls._value2member_map_.get(value.capitalize())
+        return None
+
+
+def _not_in_future(value: date) -> date:
+    if value > date.today():
+        raise PydanticCustomError("future_birth_date", "The date of birth cannot be a future date.")
+    return value
+
+
+# Checked by pydantic-core while parsing, so a request never reaches the service with an invalid field.
+PatientName = Annotated[
+    str, StringConstraints(pattern=r"\S\s+\S"), Field(description="Full name, at least two words."),
+]
+BirthDate = Annotated[date, AfterValidator(_not_in_future), Field(description="Not later than today.")]
 
 
 class PatientBase(BaseModel):
@@ -11,11 +40,53 @@ class PatientBase(BaseModel):
 
 
 class PatientCreate(PatientBase):
-    pass
+    model_config = ConfigDict(use_enum_values=True)
+
+    name: PatientName
+    birth_date: BirthDate
+    gender: Gender
+
+
+class PatientUpdate(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
+    name: Optional[PatientName] = None
+    birth_date: Optional[BirthDate] = None
+    health_conditions: Optional[str] = None
+    gender: Optional[Gender] = None
+    address: Optional[str] = None
 
 
 class Patient(PatientBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+
+
+class PatientBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class PatientLookup(BaseModel):
     id: int
+    patient: Optional[Patient] = None
+
+
+class PatientStats(BaseModel):
+    total: int
+    gender: Dict[str, int]
+    age_bands: Dict[str, int]
+    health_conditions: Dict[str, int]
+
+
+class PatientChangeEntry(BaseModel):
+    seq: int
+    id: int
+    deleted: bool
+    patient: Optional[Patient] = None
+
 
-    class Config:
-        orm_mode = True
+class PatientChanges(BaseModel):
+    changes: List[PatientChangeEntry]
+    next_since: int
+    has_more: bool
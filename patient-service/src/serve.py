@@ -0,0 +1,83 @@
+"""Production entry point: applies migrations once, then serves the app on one or more worker processes.
+
+    python -m src.serve --host 0.0.0.0 --port 8001 --workers 4
+
+Each worker is a fresh process that imports the app, and with it its own engines, caches and
+background threads, so no worker runs DDL. Workers default to ``WEB_CONCURRENCY``, or to one per
+CPU when no setting keeps state that several workers would disagree on, and to 1 otherwise.
+Asking for several workers with such a setting is refused. With **METRICS_ENABLED**, the workers
+share a prometheus_client multiprocess directory, so ``/metrics`` covers all of them.
+"""
+import argparse
+import glob
+import os
+import tempfile
+
+import uvicorn
+from alembic import command
+from alembic.config import Config
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def per_process_state() -> list[str]:
+    """Settings whose state lives in each worker and would go stale or diverge across several of them."""
+    from src.config.settings import settings
+
+    problems = []
+    if settings.PATIENT_CACHE_BACKEND == "memory":
+        problems.append(
+            "PATIENT_CACHE_BACKEND=memory: after a write on one worker the others keep serving the old "
+            "patient and ETag for up to PATIENT_CACHE_TTL_SECONDS; use redis or none"
+        )
+    return problems
+
+
+def default_workers() -> int:
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    return 1 if per_process_state() else os.cpu_count() or 1
+
+
+def prepare_metrics_dir():
+    """Points every worker at one empty prometheus_client multiprocess directory."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        # Files left by a previous run would be summed with this one's.
+        for stale in glob.glob(os.path.join(path, "*.db")):
+            os.remove(stale)
+    else:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="patient-service-metrics-")
+
+
+def migrate():
+    command.upgrade(Config(os.path.join(SERVICE_DIR, "alembic.ini")), "head")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--skip-migrations", action="store_true", help="the schema is managed separately")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        problems = per_process_state()
+        if problems:
+            parser.error(f"--workers {args.workers} needs state shared between workers:\n  " + "\n  ".join(problems))
+        from src.config.settings import settings
+
+        if settings.METRICS_ENABLED:
+            prepare_metrics_dir()
+    # Inherited by the workers, which size per-worker pools from it.
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    if not args.skip_migrations:
+        migrate()
+    uvicorn.run("src.main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,69 @@
-from jose import jwt, JWTError
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from src.config.settings import settings
+from src.metrics import timed_section
+from src.profiling import profiled_section
+from src.services.jwks_cache import JwksCache
+from src.services.token_cache import TokenCache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+token_cache = TokenCache(settings.JWT_CACHE_SIZE, settings.JWT_CACHE_TTL_SECONDS)
+
+# With JWKS_URL set, tokens are verified against auth-service's published public keys;
+# otherwise with the shared secret. Either way the key object is built once, not per token.
+jwks_cache = JwksCache(settings.JWKS_URL, settings.JWKS_REFRESH_SECONDS) if settings.JWKS_URL else None
+_secret_key = None
+
+
+def warm_up():
+    """Loads python-jose and its crypto backend and builds the HS key, so the first request does not."""
+    global _secret_key
+    from jose import jwk
+
+    if _secret_key is None and ALGORITHM.startswith("HS"):
+        _secret_key = jwk.construct(SECRET_KEY, ALGORITHM)
+
+
+def _verification_key(token: str):
+    from jose import JWTError, jwt
+
+    if jwks_cache is None:
+        if _secret_key is None:
+            warm_up()
+        return _secret_key, ALGORITHM
+    kid = jwt.get_unverified_header(token).get("kid")
+    entry = jwks_cache.get(kid) if kid else None
+    if entry is None:
+        raise JWTError("Unknown signing key.")
+    return entry
+
 
 def decode_access_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
+
+    # Imported here rather than at module level to keep python-jose off the startup path.
+    from jose import JWTError, jwt
+
+    try:
+        with timed_section("jwt_decode"):
+            key, algorithm = _verification_key(token)
+            payload = jwt.decode(token, key, algorithms=[algorithm])
     except JWTError:
         return None
 
+    token_cache.put(token, payload)
+    return payload
+
 
 def validate_user(token: str):
-    payload = decode_access_token(token)
+    with profiled_section("auth"):
+        payload = decode_access_token(token)
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token.")
 
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JwksCache:
+    """Public keys from auth-service's ``/.well-known/jwks.json``, keyed by ``kid``.
+
+    Keys are parsed into jose key objects once per fetch, so verifying a token never touches
+    PEM/JWK material. Only the background thread fetches: it refreshes every ``refresh_seconds``,
+    and a token signed with an unknown kid is rejected and wakes it early, at most once per
+    ``min_refresh_interval``. Request handlers therefore never wait on auth-service, however
+    many unknown kids clients send. A failed fetch keeps the keys already loaded.
+    """
+
+    def __init__(self, url: str, refresh_seconds: int, min_refresh_interval: float = 10.0,
+                 timeout: float = 5.0):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: dict[str, tuple[object, str]] = {}
+        self._last_fetch = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, kid: str) -> Optional[tuple[object, str]]:
+        """``(key, algorithm)`` for ``kid``, or None if auth-service does not publish it."""
+        entry = self._keys.get(kid)
+        if entry is None and time.monotonic() - self._last_fetch >= self.min_refresh_interval:
+            # Picked up by the refresh thread; a key rotated in moments ago is accepted once it has run.
+            self._wake.set()
+        return entry
+
+    def refresh(self) -> bool:
+        with self._refresh_lock:
+            self._last_fetch = time.monotonic()
+            try:
+                import httpx
+                from jose import jwk
+
+                response = httpx.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                keys = {}
+                for key in response.json()["keys"]:
+                    algorithm = key.get("alg")
+                    if "kid" not in key or not algorithm or algorithm.startswith("HS"):
+                        continue
+                    keys[key["kid"]] = (jwk.construct(key, algorithm), algorithm)
+            except Exception:
+                logger.exception("Could not refresh JWKS from %s; keeping %d cached keys.", self.url, len(self._keys))
+                return False
+            # Readers never lock: they see either the old dict or the new one.
+            self._keys = keys
+            return True
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.refresh_seconds)
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            self.refresh()
+
+    def start(self):
+        """Starts the refresh thread and fetches the keys; raises if that first fetch failed."""
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+        if not self.refresh():
+            # The thread keeps retrying; the warm-up reports the step as failed meanwhile.
+            raise RuntimeError(f"Could not fetch JWKS from {self.url}.")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
@@ -0,0 +1,61 @@
+import base64
+import json
+from typing import Literal, Optional, Sequence
+
+from fastapi import HTTPException
+
+PatientOrder = Literal["id", "name"]
+
+# Columns each ordering is keyed on; must match PATIENT_SORT_KEYS in the repository.
+SORT_FIELDS = {
+    "id": ("id",),
+    "name": ("name", "id"),
+}
+# JSON type of each sort column in a cursor key; anything else is a forged or corrupted cursor.
+FIELD_TYPES = {"id": int, "name": str}
+
+
+def encode_cursor(order_by: PatientOrder, patient) -> str:
+    key = [getattr(patient, field) for field in SORT_FIELDS[order_by]]
+    raw = json.dumps({"o": order_by, "k": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: PatientOrder) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        key = tuple(data["k"])
+        fields = SORT_FIELDS[order_by]
+        valid = (
+            data["o"] == order_by
+            and len(key) == len(fields)
+            # type(), not isinstance(): JSON true would otherwise pass as an int id.
+            and all(type(value) is FIELD_TYPES[field] for field, value in zip(fields, key))
+        )
+    except (ValueError, KeyError, TypeError):
+        valid = False
+
+    if not valid:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid cursor for the requested ordering."
+        )
+    return key
+
+
+def decode_patients_cursor(cursor: Optional[str], order_by: PatientOrder, search: Optional[str]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    if search:
+        raise HTTPException(
+            status_code=400,
+            detail="Search results are ranked by relevance and can only be paged with skip and limit."
+        )
+    return decode_cursor(cursor, order_by)
+
+
+def next_cursor(patients: Sequence, limit: int, order_by: PatientOrder) -> Optional[str]:
+    if not patients or len(patients) < limit:
+        return None
+    return encode_cursor(order_by, patients[-1])
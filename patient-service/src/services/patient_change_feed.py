@@ -0,0 +1,19 @@
+PATIENT_FIELDS = ("name", "birth_date", "health_conditions", "gender", "address")
+
+
+def build_patient_changes(rows: list, since: int, limit: int) -> dict:
+    """Shapes the (seq, patient_id, deleted, *PATIENT_FIELDS) rows of the change query into the feed response."""
+    changes = [
+        {
+            "seq": seq,
+            "id": patient_id,
+            "deleted": deleted,
+            "patient": None if deleted else {"id": patient_id, **dict(zip(PATIENT_FIELDS, values))},
+        }
+        for seq, patient_id, deleted, *values in rows
+    ]
+    return {
+        "changes": changes,
+        "next_since": changes[-1]["seq"] if changes else since,
+        "has_more": len(changes) == limit,
+    }
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterator, Literal
+
+from src.config.database import SessionLocal, AsyncSessionLocal
+from src.config.settings import settings
+from src.repositories.patient_repository import EXPORT_COLUMNS, PatientRepository, AsyncPatientRepository
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def ndjson_chunk(rows: list) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), default=str, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def csv_chunk(rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def _serializer(export_format: ExportFormat):
+    return csv_chunk if export_format == "csv" else ndjson_chunk
+
+
+def _export(export_format: ExportFormat, batch_size: int, filters: dict) -> Iterator[str]:
+    serialize = _serializer(export_format)
+    if export_format == "csv":
+        yield csv_chunk([EXPORT_FIELDS])
+    # The export outlives the request-scoped session, so it owns its own.
+    with SessionLocal() as db:
+        for rows in PatientRepository(db).stream_patients(batch_size=batch_size, **filters):
+            yield serialize(rows)
+
+
+async def _export_async(export_format: ExportFormat, batch_size: int, filters: dict) -> AsyncIterator[str]:
+    serialize = _serializer(export_format)
+    if export_format == "csv":
+        yield csv_chunk([EXPORT_FIELDS])
+    async with AsyncSessionLocal() as db:
+        async for rows in AsyncPatientRepository(db).stream_patients(batch_size=batch_size, **filters):
+            yield serialize(rows)
+
+
+def stream_patient_export(export_format: ExportFormat, batch_size: int, **filters):
+    """Chunks of the serialized export, one per fetched batch, from whichever stack DATABASE_ASYNC selects."""
+    export = _export_async if settings.DATABASE_ASYNC else _export
+    return export(export_format, batch_size, filters)
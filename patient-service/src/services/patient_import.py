@@ -0,0 +1,145 @@
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_MEDIA_TYPES = ("text/csv",)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Splits a byte stream into numbered text lines without buffering more than one partial line."""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line.decode("utf-8", errors="replace").rstrip("\r")
+    if buffer:
+        yield number + 1, buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def parse_ndjson(lines: AsyncIterator[tuple[int, str]]):
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield number, None, "Line is not valid JSON."
+            continue
+        if isinstance(data, dict):
+            yield number, data, None
+        else:
+            yield number, None, "Each line must be a JSON object."
+
+
+class _PendingLines:
+    """Input of the one csv.reader ``parse_csv`` uses: the lines of the next record, handed over whole."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+def _inside_quotes(line: str, quoted: bool) -> bool:
+    """Whether a record is still inside a quoted field after ``line``, as the default csv dialect reads it."""
+    field_start, just_closed = not quoted, False
+    for char in line:
+        if quoted:
+            if char == '"':
+                quoted, just_closed = False, True
+            continue
+        # A quote opens a field only at its start; right after a closing quote it is an escaped quote.
+        if char == '"' and (field_start or just_closed):
+            quoted = True
+        field_start, just_closed = char == ",", False
+    return quoted
+
+
+async def _csv_records(lines: AsyncIterator[tuple[int, str]]):
+    """Numbered records of one csv.reader; a quoted field may span lines, and the record takes its first line's number."""
+    pending = _PendingLines()
+    reader = csv.reader(pending)
+    first = None
+    quoted = False
+    async for number, line in lines:
+        if not quoted and not line.strip():
+            continue
+        if first is None:
+            first = number
+        pending.lines.append(line + "\n")
+        quoted = _inside_quotes(line, quoted)
+        if not quoted:
+            yield first, next(reader)
+            first = None
+    if pending.lines:
+        # A quoted field left open runs to the end of the body, as csv.reader reads it.
+        yield first, next(reader)
+
+
+async def parse_csv(lines: AsyncIterator[tuple[int, str]]):
+    header = None
+    async for number, values in _csv_records(lines):
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        if len(values) != len(header):
+            yield number, None, f"Expected {len(header)} columns, found {len(values)}."
+            continue
+        yield number, dict(zip(header, values)), None
+
+
+def parser_for(content_type: str):
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        return parse_ndjson
+    if media_type in CSV_MEDIA_TYPES:
+        return parse_csv
+    raise HTTPException(
+        status_code=415,
+        detail=f"Send patients as NDJSON ({NDJSON_MEDIA_TYPES[0]}) or CSV ({CSV_MEDIA_TYPES[0]})."
+    )
+
+
+async def import_patient_stream(chunks: AsyncIterator[bytes], content_type: str, patient_service, batch_size: int) -> dict:
+    """Feeds the parsed rows to ``patient_service.import_patients`` in batches of ``batch_size``.
+
+    Rows are numbered by their line in the request body; a bad row is reported and skipped,
+    it never aborts the rest of the load.
+    """
+    parse = parser_for(content_type)
+    inserted = 0
+    errors = []
+    batch = []
+
+    async def flush():
+        nonlocal inserted
+        result = await patient_service.import_patients(batch)
+        inserted += result["inserted"]
+        errors.extend(result["errors"])
+
+    async for number, data, error in parse(iter_lines(chunks)):
+        if error:
+            errors.append({"row": number, "detail": error})
+            continue
+        batch.append((number, data))
+        if len(batch) >= batch_size:
+            await flush()
+            batch = []
+    if batch:
+        await flush()
+
+    errors.sort(key=lambda error: error["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
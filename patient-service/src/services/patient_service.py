@@ -1,31 +1,136 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.schemas.patient import PatientCreate
-from src.services.patient_validations import validate_patient_creating, validate_patient
-from src.config.database import get_db
+from starlette.concurrency import run_in_threadpool
+from src.schemas.patient import PatientCreate, PatientUpdate
+from src.services.patient_validations import (
+    check_expected_version,
+    drop_duplicate_patients,
+    duplicate_patient_guard,
+    duplicate_row_error,
+    validate_patient_rows,
+    version_conflict_guard,
+)
+from src.config.database import get_db, get_async_db
+from src.config.settings import settings
+from src.profiling import call_profiled, timed_proxy
+from src.services.pagination import PatientOrder, decode_patients_cursor
+from src.services.patient_change_feed import build_patient_changes
+from src.services.patient_stats import build_patient_stats
+from src.services.single_flight import async_patient_reads, patient_reads
 from fastapi import Depends
-from typing import Optional, List
+from typing import Awaitable, Callable, Optional, List
 
-from src.repositories.patient_repository import PatientRepository
+from src.repositories.patient_repository import PatientRepository, AsyncPatientRepository
+
+
+def patient_changes(patient_data: PatientUpdate) -> dict:
+    """Fields the client actually sent; an explicit null leaves the column unchanged."""
+    return {key: value for key, value in patient_data.model_dump(exclude_unset=True).items() if value is not None}
+
+
+def patients_page_key(
+        skip: int,
+        limit: int,
+        name: Optional[str],
+        birth_date: Optional[str],
+        health_conditions: Optional[str],
+        address: Optional[str],
+        order_by: PatientOrder,
+        after: Optional[tuple],
+        search: Optional[str]
+) -> tuple:
+    """Single-flight key of a page; parameters the query ignores (empty filters, skip with a cursor) are dropped."""
+    return (
+        "patients", 0 if after is not None else skip, limit, name or None, birth_date or None,
+        health_conditions or None, address or None, order_by, after, search or None,
+    )
+
+
+def lookup_results(ids: list[int], found: dict) -> list[dict]:
+    """One entry per requested id, in request order; ``patient`` is None for ids that do not exist."""
+    return [{"id": patient_id, "patient": found.get(patient_id)} for patient_id in ids]
 
 
 class PatientService:
     def __init__(self, db: Session):
         self.db = db
-        self.patient_repo = PatientRepository(db)
+        self.patient_repo = timed_proxy(PatientRepository(db), "repository")
+
+    def _read(self, key: tuple, load: Callable):
+        """``load()``, shared with identical reads already running in this process (see SingleFlight)."""
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return load()
+        return patient_reads.do(key, load)
 
     def add_patient(self, patient: PatientCreate):
-        validate_patient_creating(self.db, patient)
-        return self.patient_repo.create_patient(patient)
+        with patient_reads.writing(), duplicate_patient_guard():
+            return self.patient_repo.create_patient(patient)
 
-    def delete_patient_by_id(self, patient_id: int):
-        return self.patient_repo.delete_patient_by_id(patient_id)
+    def import_patients(self, rows: list[tuple[int, dict]]) -> dict:
+        patients, errors = validate_patient_rows(rows)
+        existing_keys = self.patient_repo.get_existing_patient_keys(
+            [(patient.name, patient.birth_date) for _, patient in patients]
+        )
+        patients, duplicate_errors = drop_duplicate_patients(patients, existing_keys)
+        with patient_reads.writing():
+            inserted, insert_errors = self._insert_patients(patients) if patients else (0, [])
+        return {"inserted": inserted, "errors": errors + duplicate_errors + insert_errors}
+
+    def _insert_patients(self, patients: list[tuple[int, PatientCreate]]) -> tuple[int, list[dict]]:
+        try:
+            return self.patient_repo.create_patients([patient for _, patient in patients]), []
+        except IntegrityError:
+            self.db.rollback()
+        # Another request inserted one of these patients after the keys were checked: insert the
+        # batch row by row, so only the rows that clash fail.
+        inserted, errors = 0, []
+        for row, patient in patients:
+            try:
+                self.patient_repo.create_patient(patient)
+                inserted += 1
+            except IntegrityError:
+                self.db.rollback()
+                errors.append(duplicate_row_error(row))
+        return inserted, errors
+
+    def delete_patient_by_id(self, patient_id: int, expected_version: Optional[int] = None):
+        with patient_reads.writing(), version_conflict_guard():
+            return self.patient_repo.delete_patient_by_id(patient_id, expected_version)
+
+    def update_patient(self, patient_id: int, patient_data: PatientCreate,
+                       expected_version: Optional[int] = None):
+        with patient_reads.writing(), duplicate_patient_guard(), version_conflict_guard():
+            return self.patient_repo.update_patient(patient_id, patient_data.model_dump(), expected_version)
 
-    def update_patient(self, patient_id: int, patient_data: PatientCreate):
-        validate_patient(patient_data)
-        return self.patient_repo.update_patient(patient_id, patient_data)
+    def patch_patient(self, patient_id: int, patient_data: PatientUpdate,
+                      expected_version: Optional[int] = None):
+        changes = patient_changes(patient_data)
+        with patient_reads.writing(), duplicate_patient_guard(), version_conflict_guard():
+            if not changes:
+                patient = self.patient_repo.get_patient_by_id(patient_id)
+                check_expected_version(patient, expected_version)
+                return patient
+            return self.patient_repo.update_patient(patient_id, changes, expected_version)
+
+    def _shareable_patient(self, patient_id: int):
+        # Detached, so requests other than the one that loaded it can serialize it.
+        patient = self.patient_repo.get_patient_by_id(patient_id)
+        if patient is not None and patient in self.db:
+            self.db.expunge(patient)
+        return patient
 
     def get_patient_by_id(self, patient_id: int):
-        return self.patient_repo.get_patient_by_id(patient_id)
+        return self._read(("patient", patient_id), lambda: self._shareable_patient(patient_id))
+
+    def get_patients_by_ids(self, ids: list[int]) -> list[dict]:
+        return lookup_results(ids, self.patient_repo.get_patients_by_ids(ids))
+
+    def get_stats(self) -> dict:
+        return build_patient_stats(self.patient_repo.get_patient_stats())
+
+    def get_changes(self, since: int, limit: int) -> dict:
+        return build_patient_changes(self.patient_repo.get_changes(since, limit), since, limit)
 
     def get_patients(
             self,
@@ -34,19 +139,157 @@ class PatientService:
             name: Optional[str] = None,
             birth_date: Optional[str] = None,
             health_conditions: Optional[str] = None,
-            address: Optional[str] = None
+            address: Optional[str] = None,
+            cursor: Optional[str] = None,
+            order_by: PatientOrder = "id",
+            search: Optional[str] = None
     ) -> List:
+        after = decode_patients_cursor(cursor, order_by, search)
+        page = dict(
+            skip=skip,
+            limit=limit,
+            name=name,
+            birth_date=birth_date,
+            health_conditions=health_conditions,
+            address=address,
+            order_by=order_by,
+            after=after,
+            search=search
+        )
+        return self._read(patients_page_key(**page), lambda: self.patient_repo.get_patient_rows(**page))
 
-        return self.patient_repo.get_patients(
+
+class AsyncPatientService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.patient_repo = timed_proxy(AsyncPatientRepository(db), "repository")
+
+    async def _read(self, key: tuple, load: Callable[[], Awaitable]):
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await load()
+        return await async_patient_reads.do(key, load)
+
+    async def add_patient(self, patient: PatientCreate):
+        with async_patient_reads.writing(), duplicate_patient_guard():
+            return await self.patient_repo.create_patient(patient)
+
+    async def import_patients(self, rows: list[tuple[int, dict]]) -> dict:
+        patients, errors = validate_patient_rows(rows)
+        existing_keys = await self.patient_repo.get_existing_patient_keys(
+            [(patient.name, patient.birth_date) for _, patient in patients]
+        )
+        patients, duplicate_errors = drop_duplicate_patients(patients, existing_keys)
+        with async_patient_reads.writing():
+            inserted, insert_errors = await self._insert_patients(patients) if patients else (0, [])
+        return {"inserted": inserted, "errors": errors + duplicate_errors + insert_errors}
+
+    async def _insert_patients(self, patients: list[tuple[int, PatientCreate]]) -> tuple[int, list[dict]]:
+        try:
+            return await self.patient_repo.create_patients([patient for _, patient in patients]), []
+        except IntegrityError:
+            await self.db.rollback()
+        # See PatientService._insert_patients.
+        inserted, errors = 0, []
+        for row, patient in patients:
+            try:
+                await self.patient_repo.create_patient(patient)
+                inserted += 1
+            except IntegrityError:
+                await self.db.rollback()
+                errors.append(duplicate_row_error(row))
+        return inserted, errors
+
+    async def delete_patient_by_id(self, patient_id: int, expected_version: Optional[int] = None):
+        with async_patient_reads.writing(), version_conflict_guard():
+            return await self.patient_repo.delete_patient_by_id(patient_id, expected_version)
+
+    async def update_patient(self, patient_id: int, patient_data: PatientCreate,
+                             expected_version: Optional[int] = None):
+        with async_patient_reads.writing(), duplicate_patient_guard(), version_conflict_guard():
+            return await self.patient_repo.update_patient(patient_id, patient_data.model_dump(), expected_version)
+
+    async def patch_patient(self, patient_id: int, patient_data: PatientUpdate,
+                            expected_version: Optional[int] = None):
+        changes = patient_changes(patient_data)
+        with async_patient_reads.writing(), duplicate_patient_guard(), version_conflict_guard():
+            if not changes:
+                patient = await self.patient_repo.get_patient_by_id(patient_id)
+                check_expected_version(patient, expected_version)
+                return patient
+            return await self.patient_repo.update_patient(patient_id, changes, expected_version)
+
+    async def _shareable_patient(self, patient_id: int):
+        # Detached, so requests other than the one that loaded it can serialize it.
+        patient = await self.patient_repo.get_patient_by_id(patient_id)
+        if patient is not None and patient in self.db:
+            self.db.expunge(patient)
+        return patient
+
+    async def get_patient_by_id(self, patient_id: int):
+        return await self._read(("patient", patient_id), lambda: self._shareable_patient(patient_id))
+
+    async def get_patients_by_ids(self, ids: list[int]) -> list[dict]:
+        return lookup_results(ids, await self.patient_repo.get_patients_by_ids(ids))
+
+    async def get_stats(self) -> dict:
+        return build_patient_stats(await self.patient_repo.get_patient_stats())
+
+    async def get_changes(self, since: int, limit: int) -> dict:
+        return build_patient_changes(await self.patient_repo.get_changes(since, limit), since, limit)
+
+    async def get_patients(
+            self,
+            skip: int = 0,
+            limit: int = 10,
+            name: Optional[str] = None,
+            birth_date: Optional[str] = None,
+            health_conditions: Optional[str] = None,
+            address: Optional[str] = None,
+            cursor: Optional[str] = None,
+            order_by: PatientOrder = "id",
+            search: Optional[str] = None
+    ) -> List:
+        after = decode_patients_cursor(cursor, order_by, search)
+        page = dict(
             skip=skip,
             limit=limit,
             name=name,
             birth_date=birth_date,
             health_conditions=health_conditions,
-            address=address
+            address=address,
+            order_by=order_by,
+            after=after,
+            search=search
         )
+        return await self._read(patients_page_key(**page), lambda: self.patient_repo.get_patient_rows(**page))
+
+
+class ThreadpoolPatientService:
+    """Awaitable view of a sync PatientService: every method call runs on Starlette's threadpool."""
+
+    def __init__(self, service: PatientService):
+        self._service = service
+
+    def __getattr__(self, name):
+        method = getattr(self._service, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(call_profiled, method, *args, **kwargs)
+
+        return call
+
+
+def get_patient_service(db: Session = Depends(get_db)) -> ThreadpoolPatientService:
+    return timed_proxy(ThreadpoolPatientService(PatientService(db)), "service")
+
 
+async def get_async_patient_service(db: AsyncSession = Depends(get_async_db)) -> AsyncPatientService:
+    return timed_proxy(AsyncPatientService(db), "service")
 
-def get_patient_service(db: Session = Depends(get_db)) -> PatientService:
-    return PatientService(db)
 
+# Routers depend on this so DATABASE_ASYNC picks the stack without touching handlers.
+patient_service_provider = get_async_patient_service if settings.DATABASE_ASYNC else get_patient_service
+# The single-flight group that stack coalesces its reads through.
+patient_read_flight = async_patient_reads if settings.DATABASE_ASYNC else patient_reads
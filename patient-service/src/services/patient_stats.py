@@ -0,0 +1,38 @@
+from datetime import date
+from typing import Optional
+
+# (label, lowest age, highest age); ages come from birth years, i.e. the age reached this calendar year.
+AGE_BANDS = (
+    ("0-17", 0, 17),
+    ("18-29", 18, 29),
+    ("30-44", 30, 44),
+    ("45-59", 45, 59),
+    ("60-74", 60, 74),
+    ("75+", 75, None),
+)
+
+
+def age_band(age: int) -> str:
+    for label, lowest, highest in AGE_BANDS:
+        if highest is None or age <= highest:
+            return label
+
+
+def build_patient_stats(rows: list, today: Optional[date] = None) -> dict:
+    """Shapes the (dimension, value, count) rows of the summary query into the stats response."""
+    today = today or date.today()
+    stats = {
+        "total": 0,
+        "gender": {},
+        "age_bands": {label: 0 for label, _, _ in AGE_BANDS},
+        "health_conditions": {},
+    }
+    for dimension, value, count in rows:
+        if dimension == "gender":
+            stats["gender"][value] = count
+            stats["total"] += count
+        elif dimension == "birth_year":
+            stats["age_bands"][age_band(today.year - int(value))] += count
+        else:
+            stats["health_conditions"][value] = count
+    return stats
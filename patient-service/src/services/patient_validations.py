@@ -1,40 +1,89 @@
+from contextlib import contextmanager
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from datetime import date
-from src.models.patient import Patient
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+from typing import Annotated, Optional, Union
+from src.repositories.patient_repository import PatientVersionConflict
 from src.schemas.patient import PatientCreate
 
 
-def validate_patient(patient: PatientCreate):
-    if patient.birth_date > date.today():
-        raise HTTPException(
-            status_code=400,
-            detail="The date of birth cannot be a future date."
-        )
+DUPLICATE_PATIENT_DETAIL = "There is already a patient with that name and date of birth."
 
-    if len(patient.name.split()) < 2:
-        raise HTTPException(
-            status_code=400,
-            detail="The name must contain at least two words."
-        )
 
-    valid_genders = ["Masculine", "Feminine"]
-    if patient.gender.capitalize() not in valid_genders:
+@contextmanager
+def duplicate_patient_guard():
+    """Turns a violation of the unique (name, birth_date) index into the API's duplicate-patient error."""
+    try:
+        yield
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail=DUPLICATE_PATIENT_DETAIL)
+
+
+@contextmanager
+def version_conflict_guard():
+    """Turns a failed If-Match (the patient changed since the client read it) into a 412."""
+    try:
+        yield
+    except PatientVersionConflict:
         raise HTTPException(
-            status_code=400,
-            detail=f"The gender must be one of the following: {', '.join(valid_genders)}."
+            status_code=412,
+            detail="The patient was changed by another request; fetch it again and retry."
         )
 
 
-def validate_patient_creating(db: Session, patient: PatientCreate):
-    validate_patient(patient)
-    existing_patient = db.query(Patient).filter(
-        Patient.name == patient.name,
-        Patient.birth_date == patient.birth_date
-    ).first()
+def check_expected_version(patient, expected_version: Optional[int]):
+    if patient is not None and expected_version is not None and patient.version != expected_version:
+        raise PatientVersionConflict(patient.id)
 
-    if existing_patient:
-        raise HTTPException(
-            status_code=400,
-            detail="There is already a patient with that name and date of birth."
-        )
+
+def _row_error(row: int, detail: str) -> dict:
+    return {"row": row, "detail": detail}
+
+
+def duplicate_row_error(row: int) -> dict:
+    return _row_error(row, DUPLICATE_PATIENT_DETAIL)
+
+
+# Built once; a whole import batch is validated by a single pydantic-core call. A row that is not a
+# valid PatientCreate comes back as its input dict instead of failing the batch.
+_patient_rows_adapter = TypeAdapter(list[Annotated[Union[PatientCreate, dict], Field(union_mode="left_to_right")]])
+
+
+def _validation_detail(data: dict) -> str:
+    try:
+        PatientCreate.model_validate(data)
+    except ValidationError as exc:
+        return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+    return "Invalid patient."
+
+
+def validate_patient_rows(rows: list[tuple[int, dict]]) -> tuple[list[tuple[int, PatientCreate]], list[dict]]:
+    """Applies the PatientCreate schema to every row, collecting errors instead of raising.
+
+    Only the rows that failed are validated again, to report why.
+    """
+    patients, errors = [], []
+    validated = _patient_rows_adapter.validate_python([data for _, data in rows])
+    for (row, data), patient in zip(rows, validated):
+        if isinstance(patient, PatientCreate):
+            patients.append((row, patient))
+        else:
+            errors.append(_row_error(row, _validation_detail(data)))
+    return patients, errors
+
+
+def drop_duplicate_patients(
+        patients: list[tuple[int, PatientCreate]],
+        existing_keys: set
+) -> tuple[list[tuple[int, PatientCreate]], list[dict]]:
+    """Drops rows whose (name, birth_date) already exists in the database or earlier in the same batch."""
+    seen = set(existing_keys)
+    unique, errors = [], []
+    for row, patient in patients:
+        key = (patient.name, patient.birth_date)
+        if key in seen:
+            errors.append(duplicate_row_error(row))
+            continue
+        seen.add(key)
+        unique.append((row, patient))
+    return unique, errors
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Hashable
+
+
+class _FlightStats:
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        calls = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalescing_ratio": self.coalesced / calls if calls else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+    @contextmanager
+    def writing(self):
+        """Wraps a write: once it has finished, later reads no longer join calls that started before it."""
+        try:
+            yield
+        finally:
+            self.forget()
+
+    def forget(self):
+        """Detaches the calls in flight; their callers still get their results."""
+        with self._lock:
+            self._calls.clear()
+
+    def metrics(self) -> dict:
+        """``stats`` in the shape ``register_cache_stats`` exports: a coalesced call counts as a hit."""
+        stats = self.stats()
+        return {"hits": stats["coalesced"], "misses": stats["executions"], "size": stats["in_flight"]}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(_FlightStats):
+    """Collapses concurrent calls with the same key into one execution, for threadpool callers.
+
+    The first caller of a key runs ``function``; callers that arrive while it runs wait and get
+    the same result, or the same exception. ``forget`` detaches the calls in flight, so callers
+    arriving after a write start a fresh execution instead of reading what was fetched before it.
+    """
+
+    def do(self, key: Hashable, function: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight(_FlightStats):
+    """``SingleFlight`` for coroutines on one event loop.
+
+    Waiters are shielded from each other: a waiter that is cancelled leaves the execution running
+    for the rest, and when the leading request is cancelled, the next waiter runs ``function`` itself.
+    """
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable]):
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                self.coalesced -= 1
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self.executions += 1
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Marks the exception as retrieved, so a flight without waiters logs nothing.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+# One of each per process; the service stack in use (DATABASE_ASYNC) decides which one is fed.
+patient_reads = SingleFlight()
+async_patient_reads = AsyncSingleFlight()
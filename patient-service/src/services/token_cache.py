@@ -0,0 +1,73 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+
+class TokenCache:
+    """Bounded LRU of decoded JWT claims keyed by a SHA-256 of the token.
+
+    Entries expire at the token's own ``exp`` (or after ``ttl_seconds``, whichever
+    comes first), so an expired token is never served from the cache. A token whose
+    ``nbf`` is still ahead is not cached, and a hit checks ``nbf`` again, so the cache
+    never accepts a token the full decode would reject as not yet valid.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, float, dict]] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now or entry[1] > now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0 or "exp" not in claims:
+            return
+        now = time.time()
+        expires_at = min(float(claims["exp"]), now + self.ttl_seconds)
+        not_before = float(claims.get("nbf", 0))
+        if expires_at <= now or not_before > now:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, not_before, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
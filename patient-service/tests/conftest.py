@@ -0,0 +1,47 @@
+import os
+
+# The settings module requires these; the tests never issue or check real tokens.
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+import pytest  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from src.config.database import Base, create_database_engine  # noqa: E402
+from src.repositories.patient_cache import MemoryCache, RedisCache  # noqa: E402
+from src.repositories.patient_search import create_search_index  # noqa: E402
+from tests.fake_redis import FakeRedisServer  # noqa: E402
+
+CACHE_TTL_SECONDS = 60
+
+
+@pytest.fixture
+def database_path(tmp_path) -> str:
+    """A SQLite file with the full patient schema, the search index included."""
+    path = str(tmp_path / "patients.db")
+    engine = create_database_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session_factory(database_path):
+    engine = create_database_engine(f"sqlite:///{database_path}")
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def redis_server():
+    with FakeRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return MemoryCache(max_size=100, ttl_seconds=CACHE_TTL_SECONDS)
+    return RedisCache(request.getfixturevalue("redis_server").url, ttl_seconds=CACHE_TTL_SECONDS)
@@ -0,0 +1,81 @@
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.redis.command(args))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Just enough of the Redis protocol for the patient cache: GET, SET with EX/PX/NX/XX and DEL.
+
+    Runs on a free localhost port in a background thread; ``url`` is what redis-py connects to.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.redis = FakeRedis()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[bytes, tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            entry = None
+        return entry
+
+    def command(self, args: list[bytes]) -> bytes:
+        name = args[0].upper()
+        with self._lock:
+            if name == b"GET":
+                entry = self._live(args[1])
+                return b"$-1\r\n" if entry is None else b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+            if name == b"SET":
+                return self._set(args[1], args[2], [arg.upper() for arg in args[3:]])
+            if name == b"DEL":
+                return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args[1:])
+            if name in (b"CLIENT", b"PING"):
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    def _set(self, key: bytes, value: bytes, options: list[bytes]) -> bytes:
+        expires = float("inf")
+        if b"EX" in options:
+            expires = time.monotonic() + int(options[options.index(b"EX") + 1])
+        elif b"PX" in options:
+            expires = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+        exists = self._live(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return b"$-1\r\n"
+        self.data[key] = (value, expires)
+        return b"+OK\r\n"
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from src import metrics
+
+
+def sample(name: str, **labels) -> float:
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+def test_a_failed_statement_does_not_skew_the_next_ones_duration(engine):
+    metrics.setup_metrics(FastAPI(), engine)
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        time.sleep(0.2)
+        connection.execute(text("SELECT 1"))
+        # Nothing left behind on the pooled connection for later statements to pick up.
+        assert connection.info == {}
+
+    assert sample("db_query_duration_seconds_count") == 1
+    assert sample("db_query_duration_seconds_sum") < 0.1
+
+
+def test_per_request_db_histograms_are_split_by_method(engine):
+    app = FastAPI()
+
+    @app.api_route("/patients", methods=["GET", "POST"])
+    def patients():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return {}
+
+    metrics.setup_metrics(app, engine)
+    client = TestClient(app)
+    client.get("/patients")
+    client.post("/patients")
+    client.post("/patients")
+
+    for name in ("db_queries_per_request_count", "db_time_per_request_seconds_count"):
+        assert sample(name, method="GET", route="/patients") == 1
+        assert sample(name, method="POST", route="/patients") == 2
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from src.config.settings import settings
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+@pytest.fixture
+def legacy_database(tmp_path, monkeypatch):
+    """A patients table as the baseline's create_all left it: no unique (name, birth_date) index."""
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE patients (id INTEGER PRIMARY KEY, name VARCHAR, birth_date DATE, "
+            "health_conditions VARCHAR, gender VARCHAR, address VARCHAR)"
+        )
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+    return path
+
+
+def add_patients(path: str, *names: str):
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO patients (name, birth_date, health_conditions, gender, address) "
+            "VALUES (?, '1990-05-17', 'asthma', 'Feminine', 'Rua A')",
+            [(name,) for name in names],
+        )
+
+
+def test_upgrade_lists_duplicate_patients_instead_of_failing_on_the_index(legacy_database):
+    add_patients(legacy_database, "Maria Silva", "Joao Souza", "Maria Silva", "Maria Silva")
+
+    with pytest.raises(RuntimeError) as raised:
+        command.upgrade(Config(ALEMBIC_INI), "head")
+
+    assert "'Maria Silva' born 1990-05-17: ids 1, 3, 4" in str(raised.value)
+    assert "Joao Souza" not in str(raised.value)
+
+
+def test_upgrade_adopts_a_legacy_database_without_duplicates(legacy_database):
+    add_patients(legacy_database, "Maria Silva", "Joao Souza")
+
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
+    with sqlite3.connect(legacy_database) as connection:
+        indexes = [row[1] for row in connection.execute("PRAGMA index_list(patients)")]
+    assert "uq_patients_name_birth_date" in indexes
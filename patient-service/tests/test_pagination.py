@@ -0,0 +1,48 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.pagination import decode_cursor, encode_cursor
+
+
+class Row:
+    id = 42
+    name = "Maria Silva"
+
+
+def cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("order_by, key", [("id", (42,)), ("name", ("Maria Silva", 42))])
+def test_decode_returns_the_encoded_key(order_by, key):
+    assert decode_cursor(encode_cursor(order_by, Row()), order_by) == key
+
+
+@pytest.mark.parametrize("order_by, data", [
+    ("id", {"o": "id", "k": ["abc"]}),
+    ("id", {"o": "id", "k": [True]}),
+    ("id", {"o": "id", "k": [4.2]}),
+    ("id", {"o": "id", "k": [None]}),
+    ("name", {"o": "name", "k": [42, "Maria Silva"]}),
+    ("name", {"o": "name", "k": ["Maria Silva", "42"]}),
+    ("name", {"o": "name", "k": [["Maria Silva"], 42]}),
+    ("name", {"o": "id", "k": [42]}),
+    ("id", {"o": "id", "k": [1, 2]}),
+    ("id", {"o": "id", "k": "4"}),
+    ("id", ["id", [42]]),
+])
+def test_decode_rejects_malformed_keys(order_by, data):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor(data), order_by)
+
+    assert raised.value.status_code == 400
+
+
+def test_decode_rejects_garbage():
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor("not a cursor!", "id")
+
+    assert raised.value.status_code == 400
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config.database import create_async_database_engine
+from src.repositories import patient_cache as patient_cache_module
+from src.repositories.patient_cache import MemoryCache, none_match, patient_cache_key, patient_etag
+from src.repositories.patient_repository import AsyncPatientRepository, PatientRepository
+from src.schemas.patient import PatientCreate
+
+NEW_PATIENT = PatientCreate(
+    name="Maria Silva", birth_date=date(1990, 5, 17), health_conditions="asthma",
+    gender="Feminine", address="Rua A, 1",
+)
+
+
+@pytest.fixture
+def patient_id(session_factory) -> int:
+    with session_factory() as db:
+        return PatientRepository(db, cache=MemoryCache(10, 60)).create_patient(NEW_PATIENT).id
+
+
+def test_add_then_get(cache):
+    cache.add("patient:1", b"one")
+
+    assert cache.get("patient:1") == b"one"
+    assert cache.get("patient:2") is None
+
+
+def test_add_never_replaces_an_entry(cache):
+    cache.add("patient:1", b"one")
+    cache.add("patient:1", b"two")
+
+    assert cache.get("patient:1") == b"one"
+
+
+def test_invalidate_blocks_add_until_the_tombstone_expires(cache, monkeypatch):
+    monkeypatch.setattr(patient_cache_module, "WRITE_TOMBSTONE_SECONDS", 1)
+    cache.add("patient:1", b"old")
+    cache.invalidate("patient:1")
+
+    cache.add("patient:1", b"stale")
+    assert cache.get("patient:1") is None
+
+    time.sleep(1.1)
+    cache.add("patient:1", b"new")
+    assert cache.get("patient:1") == b"new"
+
+
+def test_memory_entries_expire_and_evict_least_recently_used():
+    cache = MemoryCache(max_size=2, ttl_seconds=60)
+    cache.add("patient:1", b"one")
+    cache.add("patient:2", b"two")
+    cache.get("patient:1")
+    cache.add("patient:3", b"three")
+
+    assert cache.get("patient:2") is None
+    assert cache.get("patient:1") == b"one"
+
+    short_lived = MemoryCache(max_size=2, ttl_seconds=0.05)
+    short_lived.add("patient:1", b"one")
+    time.sleep(0.1)
+    assert short_lived.get("patient:1") is None
+
+
+def test_get_caches_the_patient(session_factory, cache, patient_id):
+    with session_factory() as db:
+        PatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+
+    assert cache.get(patient_cache_key(patient_id)) is not None
+
+
+def test_update_invalidates_the_cached_patient(session_factory, cache, patient_id):
+    with session_factory() as db:
+        repository = PatientRepository(db, cache=cache)
+        repository.get_patient_by_id(patient_id)
+        repository.update_patient(patient_id, {"address": "Rua B, 2"})
+
+    with session_factory() as db:
+        patient = PatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+
+    assert patient.address == "Rua B, 2"
+    assert patient.version == 2
+
+
+def test_delete_invalidates_the_cached_patient(session_factory, cache, patient_id):
+    with session_factory() as db:
+        repository = PatientRepository(db, cache=cache)
+        repository.get_patient_by_id(patient_id)
+        repository.delete_patient_by_id(patient_id)
+
+    with session_factory() as db:
+        assert PatientRepository(db, cache=cache).get_patient_by_id(patient_id) is None
+
+
+def test_read_that_loaded_before_a_write_does_not_cache_the_old_row(session_factory, cache, patient_id):
+    """The reader loads the row, the writer commits and invalidates, then the reader fills the cache."""
+    with session_factory() as reader_db, session_factory() as writer_db:
+        load = reader_db.get
+
+        def load_then_lose_the_race(*args, **kwargs):
+            loaded = load(*args, **kwargs)
+            PatientRepository(writer_db, cache=cache).update_patient(patient_id, {"address": "Rua B, 2"})
+            return loaded
+
+        reader_db.get = load_then_lose_the_race
+        stale = PatientRepository(reader_db, cache=cache).get_patient_by_id(patient_id)
+
+    with session_factory() as db:
+        patient = PatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+
+    assert stale.address == "Rua A, 1"
+    assert patient.address == "Rua B, 2"
+
+
+def test_async_writes_invalidate_the_cached_patient(database_path, cache, patient_id):
+    async def scenario():
+        engine = create_async_database_engine(f"sqlite+aiosqlite:///{database_path}")
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with Session() as db:
+                repository = AsyncPatientRepository(db, cache=cache)
+                await repository.get_patient_by_id(patient_id)
+                await repository.update_patient(patient_id, {"address": "Rua B, 2"})
+            async with Session() as db:
+                updated = await AsyncPatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+            async with Session() as db:
+                await AsyncPatientRepository(db, cache=cache).delete_patient_by_id(patient_id)
+            async with Session() as db:
+                deleted = await AsyncPatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+        finally:
+            await engine.dispose()
+        return updated, deleted
+
+    updated, deleted = asyncio.run(scenario())
+
+    assert updated.address == "Rua B, 2"
+    assert deleted is None
+
+
+def test_entries_written_before_the_version_column_are_never_read(session_factory, cache, patient_id):
+    legacy = json.dumps({
+        "name": "Maria Silva", "birth_date": "1990-05-17", "health_conditions": "asthma",
+        "gender": "Feminine", "address": "Rua A, 1", "id": patient_id,
+    }).encode()
+    cache.add(f"patient:{patient_id}", legacy)
+
+    with session_factory() as db:
+        patient = PatientRepository(db, cache=cache).get_patient_by_id(patient_id)
+
+    assert patient_etag(patient) == '"1"'
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"3"', True),
+    ('"2", "3"', True),
+    ('W/"3"', True),
+    ("*", True),
+    ('"2"', False),
+    ('W/"2", "4"', False),
+])
+def test_none_match(if_none_match, matches):
+    assert none_match(if_none_match, '"3"') is matches
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config.database import create_async_database_engine
+from src.models.patient import Patient
+from src.repositories.patient_cache import NullCache
+from src.repositories.patient_repository import AsyncPatientRepository, PatientRepository
+from src.schemas.patient import PatientCreate
+from src.services.patient_import import import_patient_stream, parse_csv
+from src.services.patient_service import AsyncPatientService, PatientService
+from src.services.patient_validations import DUPLICATE_PATIENT_DETAIL
+
+
+def patient_row(name: str, address: str = "Rua A, 1") -> dict:
+    return {
+        "name": name, "birth_date": "1990-05-17", "health_conditions": "asthma",
+        "gender": "Feminine", "address": address,
+    }
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def numbered(lines: list[str]):
+    for number, line in enumerate(lines, 1):
+        yield number, line
+
+
+def parsed_csv(lines: list[str]) -> list:
+    async def collect():
+        return [row async for row in parse_csv(numbered(lines))]
+
+    return asyncio.run(collect())
+
+
+class RecordingService:
+    def __init__(self):
+        self.rows = []
+
+    async def import_patients(self, rows):
+        self.rows.extend(rows)
+        return {"inserted": len(rows), "errors": []}
+
+
+def test_csv_quoted_fields_may_span_lines():
+    rows = parsed_csv([
+        "name,address",
+        '"Maria Silva","Rua A, 1',
+        'Apto 2"',
+        "Joao Souza,Rua B",
+    ])
+
+    assert rows == [
+        (2, {"name": "Maria Silva", "address": "Rua A, 1\nApto 2"}, None),
+        (4, {"name": "Joao Souza", "address": "Rua B"}, None),
+    ]
+
+
+def test_csv_quotes_inside_fields():
+    rows = parsed_csv([
+        "name,address",
+        '"Maria ""Mia"" Silva",Rua 5" norte',
+        "",
+        "Joao Souza,Rua B,extra",
+    ])
+
+    assert rows == [
+        (2, {"name": 'Maria "Mia" Silva', "address": 'Rua 5" norte'}, None),
+        (4, None, "Expected 2 columns, found 3."),
+    ]
+
+
+def test_csv_stream_split_inside_a_quoted_newline():
+    service = RecordingService()
+    body = b'name,address\r\n"Maria Silva","Rua A\r\nApto 2"\r\nJoao Souza,Rua B\r\n'
+
+    result = asyncio.run(import_patient_stream(chunked(body, 7), "text/csv", service, batch_size=10))
+
+    assert result == {"inserted": 2, "failed": 0, "errors": []}
+    assert service.rows == [
+        (2, {"name": "Maria Silva", "address": "Rua A\nApto 2"}),
+        (4, {"name": "Joao Souza", "address": "Rua B"}),
+    ]
+
+
+@pytest.fixture
+def inserted_concurrently(session_factory, monkeypatch):
+    """Inserts Maria Silva as another request would, after the import checked which keys exist."""
+    def insert_after_the_check(self, keys):
+        with session_factory() as db:
+            PatientRepository(db, cache=NullCache()).create_patient(PatientCreate(**patient_row("Maria Silva")))
+        return set()
+
+    monkeypatch.setattr(PatientRepository, "get_existing_patient_keys", insert_after_the_check)
+
+    async def async_insert_after_the_check(self, keys):
+        return insert_after_the_check(self, keys)
+
+    monkeypatch.setattr(AsyncPatientRepository, "get_existing_patient_keys", async_insert_after_the_check)
+
+
+def import_rows() -> list:
+    return [(1, patient_row("Joao Souza")), (2, patient_row("Maria Silva")), (3, patient_row("Ana Lima"))]
+
+
+def count_patients(session_factory) -> int:
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(Patient))
+
+
+def test_import_reports_a_concurrently_inserted_patient_as_a_row_error(session_factory, inserted_concurrently):
+    with session_factory() as db:
+        result = PatientService(db).import_patients(import_rows())
+
+    assert result == {"inserted": 2, "errors": [{"row": 2, "detail": DUPLICATE_PATIENT_DETAIL}]}
+    assert count_patients(session_factory) == 3
+
+
+def test_async_import_reports_a_concurrently_inserted_patient_as_a_row_error(
+        database_path, session_factory, inserted_concurrently):
+    async def run():
+        engine = create_async_database_engine(f"sqlite+aiosqlite:///{database_path}")
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await AsyncPatientService(db).import_patients(import_rows())
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(run())
+
+    assert result == {"inserted": 2, "errors": [{"row": 2, "detail": DUPLICATE_PATIENT_DETAIL}]}
+    assert count_patients(session_factory) == 3
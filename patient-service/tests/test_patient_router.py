@@ -0,0 +1,15 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config.settings import settings
+from src.main import app
+
+
+@pytest.mark.parametrize("query", [
+    "limit=-1", "limit=0", f"limit={settings.MAX_PAGE_SIZE + 1}", "skip=-1",
+])
+def test_list_rejects_out_of_range_paging(query):
+    # Query parameters are validated before the handler, so the token is never checked.
+    response = TestClient(app).get(f"/api/patients/?{query}", headers={"Authorization": "Bearer unchecked"})
+
+    assert response.status_code == 422
@@ -0,0 +1,17 @@
+from datetime import date
+
+from src.models.patient import Patient as PatientModel
+from src.schemas.patient import Patient
+
+
+def test_patient_reads_an_orm_row():
+    row = PatientModel(
+        id=7, name="Maria Silva", birth_date=date(1990, 5, 17), health_conditions="asthma",
+        gender="Feminine", address="Rua A, 1",
+    )
+
+    patient = Patient.model_validate(row)
+
+    assert patient.id == 7
+    assert patient.name == "Maria Silva"
+    assert patient.birth_date == date(1990, 5, 17)
@@ -0,0 +1,94 @@
+from collections import Counter
+from datetime import date
+
+import pytest
+from sqlalchemy import event, select
+
+from src.models.patient import Patient
+from src.models.patient_summary import PatientSummary
+from src.repositories.patient_cache import NullCache
+from src.repositories.patient_repository import PatientRepository, build_patients_query
+from src.repositories.patient_search import apply_search
+from src.schemas.patient import PatientCreate
+
+MARIA = PatientCreate(
+    name="Maria Silva", birth_date=date(1990, 5, 17), health_conditions="asthma",
+    gender="Feminine", address="Rua A, 1",
+)
+JOAO = PatientCreate(
+    name="Joao Souza", birth_date=date(1985, 2, 3), health_conditions="asthma",
+    gender="Masculine", address="Rua B, 2",
+)
+
+
+def summary(db) -> Counter:
+    rows = db.execute(select(
+        PatientSummary.gender, PatientSummary.birth_year, PatientSummary.health_conditions, PatientSummary.count,
+    ))
+    return Counter({(gender, year, conditions): count for gender, year, conditions, count in rows if count})
+
+
+def recounted(db) -> Counter:
+    return Counter(
+        (patient.gender, patient.birth_date.year, patient.health_conditions)
+        for patient in db.scalars(select(Patient))
+    )
+
+
+def search(db, text: str) -> list[str]:
+    return [patient.name for patient in db.scalars(apply_search(build_patients_query(), "sqlite", text))]
+
+
+@pytest.fixture
+def repository(session_factory):
+    with session_factory() as db:
+        repository = PatientRepository(db, cache=NullCache())
+        repository.maria = repository.create_patient(MARIA).id
+        repository.create_patient(JOAO)
+        yield repository
+
+
+@pytest.mark.parametrize("values", [
+    {"gender": "Masculine"},
+    {"birth_date": date(2001, 1, 1), "health_conditions": "diabetes"},
+    {"health_conditions": "asthma"},
+    {"address": "Rua C, 3"},
+    MARIA.model_dump() | {"health_conditions": "none"},
+])
+def test_updates_keep_the_summary_equal_to_a_recount(repository, values):
+    repository.update_patient(repository.maria, values)
+
+    assert summary(repository.db) == recounted(repository.db)
+
+
+def test_update_of_a_missing_patient_leaves_the_summary_alone(repository):
+    before = summary(repository.db)
+
+    assert repository.update_patient(10_000, {"gender": "Masculine"}) is None
+    assert summary(repository.db) == before
+
+
+def test_delete_keeps_the_summary_equal_to_a_recount(repository):
+    repository.delete_patient_by_id(repository.maria)
+
+    assert summary(repository.db) == recounted(repository.db)
+    assert search(repository.db, "maria") == []
+
+
+def test_update_rewrites_the_search_row(repository):
+    repository.update_patient(repository.maria, {"name": "Mariana Costa", "address": "Rua Nova"})
+
+    assert search(repository.db, "silva") == []
+    assert search(repository.db, "mariana nova") == ["Mariana Costa"]
+
+
+def test_full_update_takes_five_round_trips(repository):
+    statements = []
+    engine = repository.db.get_bind()
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    event.listen(engine, "commit", lambda *args: statements.append("COMMIT"))
+
+    repository.update_patient(repository.maria, MARIA.model_dump() | {"gender": "Masculine"})
+
+    # Summary move, UPDATE, search row, change log, COMMIT.
+    assert len(statements) == 5
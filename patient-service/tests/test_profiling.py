@@ -0,0 +1,31 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from src import profiling
+from src.profiling import RequestProfile
+
+
+def test_a_failed_statement_does_not_skew_the_next_ones_time():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "before_cursor_execute", profiling._before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", profiling._after_cursor_execute)
+    profile = RequestProfile()
+    token = profiling._current.set(profile)
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            time.sleep(0.2)
+            connection.execute(text("SELECT 1"))
+            assert connection.info == {}
+    finally:
+        profiling._current.reset(token)
+        engine.dispose()
+
+    [(statement, _, seconds, _, _)] = profile.statements
+    assert statement == "SELECT 1"
+    assert seconds < 0.1
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+from src.services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_a_call_after_forget_runs_again():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow_read():
+        started.set()
+        release.wait()
+        return "before the write"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", slow_read)))
+    leader.start()
+    started.wait()
+    with flight.writing():
+        pass
+
+    assert flight.do("key", lambda: "after the write") == "after the write"
+    release.set()
+    leader.join()
+    assert results == ["before the write"]
+    assert flight.stats()["executions"] == 2
+
+
+def test_an_async_call_after_forget_runs_again():
+    flight = AsyncSingleFlight()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_read():
+            await release.wait()
+            return "before the write"
+
+        leader = asyncio.create_task(flight.do("key", slow_read))
+        await asyncio.sleep(0)
+        with flight.writing():
+            pass
+
+        async def fresh_read():
+            return "after the write"
+
+        after = await flight.do("key", fresh_read)
+        release.set()
+        return await leader, after
+
+    assert asyncio.run(scenario()) == ("before the write", "after the write")
+    assert flight.stats()["executions"] == 2
@@ -0,0 +1,37 @@
+import time
+
+from jose import jwt
+
+from src.config.settings import settings
+from src.services import auth, token_cache as token_cache_module
+from src.services.token_cache import TokenCache
+
+
+def test_a_token_that_is_not_yet_valid_is_not_cached():
+    cache = TokenCache(max_size=10, ttl_seconds=60)
+    now = time.time()
+
+    cache.put("token", {"sub": "user@example.com", "exp": now + 300, "nbf": now + 60})
+
+    assert cache.get("token") is None
+
+
+def test_a_hit_checks_nbf_again(monkeypatch):
+    cache = TokenCache(max_size=10, ttl_seconds=60)
+    now = time.time()
+    cache.put("token", {"sub": "user@example.com", "exp": now + 300, "nbf": now})
+    assert cache.get("token") is not None
+
+    # A clock stepped back (NTP, another host's view) puts the token before its nbf again.
+    monkeypatch.setattr(token_cache_module.time, "time", lambda: now - 30)
+    assert cache.get("token") is None
+
+
+def test_decode_keeps_rejecting_a_not_yet_valid_token():
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "user@example.com", "exp": now + 300, "nbf": now + 60}, settings.SECRET_KEY, settings.ALGORITHM,
+    )
+
+    assert auth.decode_access_token(token) is None
+    assert auth.decode_access_token(token) is None
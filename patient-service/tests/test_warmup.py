@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+from src.warmup import Warmup
+
+
+def status(warmup: Warmup) -> tuple[int, dict]:
+    response = warmup.response()
+    return response.status_code, json.loads(response.body)
+
+
+def test_ready_answers_503_until_a_failed_step_succeeds_on_retry(monkeypatch):
+    monkeypatch.setattr(Warmup, "RETRY_FIRST_SECONDS", 0.01)
+    attempts = []
+
+    def fetch_jwks():
+        attempts.append(None)
+        if len(attempts) < 3:
+            raise ConnectionError("JWKS unreachable")
+
+    async def scenario():
+        warmup = Warmup()
+        assert status(warmup)[0] == 503
+        warmup.start({"jwks": fetch_jwks, "database": lambda: None})
+        while warmup.seconds is None:
+            await asyncio.sleep(0)
+        failing = status(warmup)
+        for _ in range(200):
+            if not warmup.failed_steps:
+                break
+            await asyncio.sleep(0.01)
+        ready = status(warmup)
+        await warmup.stop()
+        return failing, ready
+
+    failing, ready = asyncio.run(scenario())
+
+    assert failing == (503, {"status": "retrying", "failed_steps": ["jwks"]})
+    assert ready[0] == 200
+    assert ready[1]["status"] == "ready"
+    assert len(attempts) == 3